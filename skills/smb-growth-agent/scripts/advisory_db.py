@@ -0,0 +1,544 @@
+#!/usr/bin/env python3
+"""Advisory DB - Offline vulnerability index built from OSV advisory dumps.
+
+Imports advisories in the OSV format (https://ossf.github.io/osv-schema/),
+such as the per-ecosystem exports at
+https://osv-vulnerabilities.storage.googleapis.com/<ecosystem>/all.zip,
+into a local SQLite database, so dependency audits become local lookups
+that need neither network access nor npm audit or pip-audit.
+
+Every affected range is stored pre-parsed: the OSV events of a range are
+turned into intervals whose bounds are encoded version keys, byte strings
+that sort like the versions they encode, so the check "is this version
+inside this range" is a plain BLOB comparison in an index lookup on
+(ecosystem, package). Each advisory's severity is taken from its
+database-specific rating (GitHub advisories) or computed from its CVSS v3
+vector.
+
+Usage:
+    python advisory_db.py import npm-all.zip PyPI-all.zip
+    python advisory_db.py import ./osv-advisories/ --db /path/to/advisories.sqlite
+    python advisory_db.py info
+
+    from advisory_db import AdvisoryIndex
+
+    index = AdvisoryIndex.open(ADVISORY_DB_PATH)
+    results = index.audit(dependencies)
+"""
+
+import argparse
+import json
+import math
+import sqlite3
+import struct
+import sys
+import time
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from lockfiles import Dependency, normalize_name, version_key
+from project_archive import ARCHIVE_ERRORS, ProjectArchive, is_archive
+from scan_cache import CACHE_DIR
+
+
+ADVISORY_DB_PATH = CACHE_DIR / "advisories.sqlite"
+SCHEMA_VERSION = 1
+
+SEVERITIES = ("critical", "high", "moderate", "low")
+
+# Severity for advisories with neither a rating nor a CVSS v3 vector (the
+# GitHub advisory database's default rating)
+UNRATED_SEVERITY = "moderate"
+
+# Database-specific ratings (GitHub, and ecosystem databases that copy them)
+_RATINGS = {"critical": "critical", "high": "high", "moderate": "moderate", "medium": "moderate", "low": "low"}
+
+# Range event types, in the order events at the same version apply
+_EVENT_ORDER = {"introduced": 0, "last_affected": 1, "fixed": 2, "limit": 3}
+
+# CVSS v3 base metric weights
+_CVSS_WEIGHTS = {
+    "AV": {"N": 0.85, "A": 0.62, "L": 0.55, "P": 0.2},
+    "AC": {"L": 0.77, "H": 0.44},
+    "UI": {"N": 0.85, "R": 0.62},
+    "C": {"H": 0.56, "L": 0.22, "N": 0.0},
+    "I": {"H": 0.56, "L": 0.22, "N": 0.0},
+    "A": {"H": 0.56, "L": 0.22, "N": 0.0},
+}
+_CVSS_PRIVILEGES = {"U": {"N": 0.85, "L": 0.62, "H": 0.27}, "C": {"N": 0.85, "L": 0.68, "H": 0.5}}
+
+_MAX_COMPONENT = 2 ** 64 - 1
+
+
+def encode_version(version: str) -> bytes:
+    """Encode a version as bytes that sort like its version_key.
+
+    Release components and pre-release numbers are each written as a 0x01
+    marker plus 8 big-endian bytes, and each sequence ends with 0x00, so a
+    shorter sequence sorts before any longer one it is a prefix of, just
+    as tuples compare.
+    """
+    epoch, release, phase, numbers = version_key(version)
+
+    def sequence(values: Iterable[int]) -> bytes:
+        return b"".join(b"\x01" + struct.pack(">Q", min(value, _MAX_COMPONENT)) for value in values) + b"\x00"
+
+    return struct.pack(">Q", min(epoch, _MAX_COMPONENT)) + sequence(release) + bytes([phase]) + sequence(numbers)
+
+
+# Lower bound of a range introduced at "0" (every version)
+MIN_VERSION = b""
+
+
+def cvss3_base_score(vector: str) -> Optional[float]:
+    """Return the base score of a CVSS v3.x vector, or None if it is not one."""
+    if not vector.startswith("CVSS:3."):
+        return None
+    metrics = dict(part.split(":", 1) for part in vector.split("/")[1:] if ":" in part)
+    try:
+        scope = metrics["S"]
+        weights = {name: table[metrics[name]] for name, table in _CVSS_WEIGHTS.items()}
+        privileges = _CVSS_PRIVILEGES[scope][metrics["PR"]]
+    except KeyError:
+        return None
+
+    impact_share = 1 - (1 - weights["C"]) * (1 - weights["I"]) * (1 - weights["A"])
+    if scope == "U":
+        impact = 6.42 * impact_share
+    else:
+        impact = 7.52 * (impact_share - 0.029) - 3.25 * (impact_share - 0.02) ** 15
+    if impact <= 0:
+        return 0.0
+    exploitability = 8.22 * weights["AV"] * weights["AC"] * privileges * weights["UI"]
+    score = impact + exploitability if scope == "U" else 1.08 * (impact + exploitability)
+    # CVSS rounds up to one decimal
+    return math.ceil(min(score, 10) * 10 - 1e-9) / 10
+
+
+def score_severity(score: float) -> str:
+    """Map a CVSS score to the audit severity levels."""
+    if score >= 9.0:
+        return "critical"
+    if score >= 7.0:
+        return "high"
+    if score >= 4.0:
+        return "moderate"
+    return "low"
+
+
+def advisory_severity(advisory: Dict) -> str:
+    """Return an OSV advisory's severity: its rating, else its CVSS v3 score."""
+    ratings = [advisory.get("database_specific") or {}]
+    ratings += [affected.get("database_specific") or {} for affected in advisory.get("affected") or []]
+    ratings += [affected.get("ecosystem_specific") or {} for affected in advisory.get("affected") or []]
+    for rating in ratings:
+        severity = _RATINGS.get(str(rating.get("severity", "")).lower())
+        if severity:
+            return severity
+
+    scores = [
+        cvss3_base_score(entry.get("score", ""))
+        for entry in advisory.get("severity") or []
+        if entry.get("type") == "CVSS_V3"
+    ]
+    scores = [score for score in scores if score is not None]
+    return score_severity(max(scores)) if scores else UNRATED_SEVERITY
+
+
+def range_intervals(events: List[Dict]) -> List[Tuple[bytes, Optional[bytes], Optional[bytes], Optional[str]]]:
+    """Turn the events of one OSV range into affected intervals.
+
+    Returns:
+        (introduced, fixed, last_affected, fixed version) per interval;
+        fixed is exclusive, last_affected inclusive, and both are None for
+        an interval that is still open
+    """
+    points = []
+    for event in events:
+        for kind, version in event.items():
+            if kind in _EVENT_ORDER and isinstance(version, str):
+                bound = MIN_VERSION if kind == "introduced" and version == "0" else encode_version(version)
+                points.append((bound, _EVENT_ORDER[kind], kind, version))
+    points.sort()
+
+    intervals = []
+    start = None
+    for bound, _, kind, version in points:
+        if kind == "introduced":
+            if start is None:
+                start = bound
+        elif start is not None:
+            if kind == "last_affected":
+                intervals.append((start, None, bound, None))
+            else:
+                intervals.append((start, bound, None, version if kind == "fixed" else None))
+            start = None
+    if start is not None:
+        intervals.append((start, None, None, None))
+    return intervals
+
+
+def advisory_rows(advisory: Dict) -> List[Tuple[str, str, bytes, Optional[bytes], Optional[bytes], Optional[str]]]:
+    """Return (ecosystem, package, introduced, fixed, last_affected, fixed version) rows.
+
+    SEMVER and ECOSYSTEM ranges are used; an affected package listed only
+    by explicit versions gets one single-version interval per version. Git
+    commit ranges cannot be matched against lockfile versions and are skipped.
+    """
+    rows = []
+    for affected in advisory.get("affected") or []:
+        package = affected.get("package") or {}
+        ecosystem, name = package.get("ecosystem"), package.get("name")
+        if not ecosystem or not name:
+            continue
+        # "PyPI", but also suffixed ecosystems such as "Debian:12"
+        name = normalize_name(ecosystem, name)
+        intervals = []
+        for version_range in affected.get("ranges") or []:
+            if version_range.get("type") in ("SEMVER", "ECOSYSTEM"):
+                intervals.extend(range_intervals(version_range.get("events") or []))
+        if not intervals:
+            intervals = [
+                (encode_version(version), None, encode_version(version), None)
+                for version in affected.get("versions") or []
+                if isinstance(version, str)
+            ]
+        rows.extend((ecosystem, name, *interval) for interval in intervals)
+    return rows
+
+
+def read_advisories(source: Path) -> Iterator[Dict]:
+    """Yield the OSV advisories in a JSON file, directory tree or archive.
+
+    A JSON file may hold one advisory or a list of them; files that are
+    not advisories (no "id") are skipped.
+
+    Raises:
+        ValueError: If the source does not exist or a file is not valid JSON
+    """
+    def parse(name: str, data: bytes) -> List[Dict]:
+        try:
+            loaded = json.loads(data)
+        except ValueError as e:
+            raise ValueError(f"Invalid advisory JSON in {name}: {e}")
+        items = loaded if isinstance(loaded, list) else [loaded]
+        return [item for item in items if isinstance(item, dict) and item.get("id")]
+
+    if is_archive(source):
+        for name, _, stream in ProjectArchive(source).members():
+            if name.endswith(".json"):
+                try:
+                    data = stream.read()
+                except ARCHIVE_ERRORS as e:
+                    raise ValueError(f"Could not read {name} from {source}: {e}")
+                yield from parse(name, data)
+    elif source.is_dir():
+        for path in sorted(source.rglob("*.json")):
+            yield from parse(str(path), path.read_bytes())
+    elif source.is_file():
+        yield from parse(str(source), source.read_bytes())
+    else:
+        raise ValueError(f"Advisory source does not exist: {source}")
+
+
+class AdvisoryIndex:
+    """SQLite index of OSV advisories by (ecosystem, package).
+
+    The database's version changes with every import that adds, updates
+    or withdraws an advisory, so results derived from it can be cached
+    against that version.
+    """
+
+    def __init__(self, connection: sqlite3.Connection, path: Path):
+        self._db = connection
+        self.path = path
+        self.lookups = 0
+
+    @classmethod
+    def create(cls, path: Path) -> "AdvisoryIndex":
+        """Open the index for importing, creating the database if needed.
+
+        Raises:
+            ValueError: If the database cannot be created or opened
+        """
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            connection = sqlite3.connect(str(path), timeout=30)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.executescript(
+                "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);"
+                "CREATE TABLE IF NOT EXISTS advisories ("
+                "id TEXT PRIMARY KEY, modified TEXT NOT NULL, severity TEXT NOT NULL, "
+                "summary TEXT NOT NULL, aliases TEXT NOT NULL);"
+                "CREATE TABLE IF NOT EXISTS ranges ("
+                "advisory_id TEXT NOT NULL, ecosystem TEXT NOT NULL, package TEXT NOT NULL, "
+                "introduced BLOB NOT NULL, fixed BLOB, last_affected BLOB, fixed_version TEXT);"
+                "CREATE INDEX IF NOT EXISTS ranges_package ON ranges (ecosystem, package);"
+                "CREATE INDEX IF NOT EXISTS ranges_advisory ON ranges (advisory_id);"
+            )
+            stored = connection.execute("SELECT value FROM meta WHERE key = 'schema'").fetchone()
+            if stored is not None and int(stored[0]) != SCHEMA_VERSION:
+                raise ValueError(f"Advisory database {path} has schema {stored[0]}, expected {SCHEMA_VERSION}; "
+                                 "delete it and re-import")
+            connection.execute("INSERT OR REPLACE INTO meta VALUES ('schema', ?)", (str(SCHEMA_VERSION),))
+            connection.commit()
+        except (OSError, sqlite3.Error) as e:
+            raise ValueError(f"Could not open advisory database {path}: {e}")
+        return cls(connection, path)
+
+    @classmethod
+    def open(cls, path: Path = ADVISORY_DB_PATH) -> Optional["AdvisoryIndex"]:
+        """Open an existing index read-only.
+
+        Returns:
+            The index, or None if it does not exist, cannot be read or is
+            from another schema version - audits then use the online tools
+        """
+        if not path.is_file():
+            return None
+        try:
+            connection = sqlite3.connect(f"file:{path}?mode=ro", uri=True, timeout=30)
+            stored = connection.execute("SELECT value FROM meta WHERE key = 'schema'").fetchone()
+        except sqlite3.Error:
+            return None
+        if stored is None or stored[0] != str(SCHEMA_VERSION):
+            connection.close()
+            return None
+        return cls(connection, path)
+
+    def import_advisories(self, advisories: Iterable[Dict]) -> Dict:
+        """Add or update advisories; withdrawn ones are removed.
+
+        An advisory already stored with the same modified time is left as
+        it is. Everything is written in one transaction.
+
+        Returns:
+            Counts of advisories added, updated, unchanged and withdrawn,
+            plus the ranges written
+        """
+        counts = {"added": 0, "updated": 0, "unchanged": 0, "withdrawn": 0, "ranges": 0}
+        try:
+            with self._db:
+                stored = dict(self._db.execute("SELECT id, modified FROM advisories"))
+                for advisory in advisories:
+                    advisory_id = advisory["id"]
+                    modified = str(advisory.get("modified", ""))
+                    previous = stored.get(advisory_id)
+                    if advisory.get("withdrawn"):
+                        if previous is not None:
+                            self._delete(advisory_id)
+                            del stored[advisory_id]
+                            counts["withdrawn"] += 1
+                        continue
+                    if previous == modified:
+                        counts["unchanged"] += 1
+                        continue
+                    if previous is not None:
+                        self._delete(advisory_id)
+                    rows = advisory_rows(advisory)
+                    self._db.execute(
+                        "INSERT INTO advisories VALUES (?, ?, ?, ?, ?)",
+                        (advisory_id, modified, advisory_severity(advisory),
+                         advisory.get("summary") or (advisory.get("details") or "")[:200],
+                         json.dumps(advisory.get("aliases") or []))
+                    )
+                    self._db.executemany(
+                        "INSERT INTO ranges VALUES (?, ?, ?, ?, ?, ?, ?)",
+                        [(advisory_id, *row) for row in rows]
+                    )
+                    stored[advisory_id] = modified
+                    counts["added" if previous is None else "updated"] += 1
+                    counts["ranges"] += len(rows)
+                if counts["added"] or counts["updated"] or counts["withdrawn"]:
+                    self._db.execute("INSERT OR REPLACE INTO meta VALUES ('version', ?)", (str(time.time_ns()),))
+        except sqlite3.Error as e:
+            raise ValueError(f"Could not write advisory database {self.path}: {e}")
+        return counts
+
+    def _delete(self, advisory_id: str) -> None:
+        self._db.execute("DELETE FROM ranges WHERE advisory_id = ?", (advisory_id,))
+        self._db.execute("DELETE FROM advisories WHERE id = ?", (advisory_id,))
+
+    @property
+    def version(self) -> Optional[str]:
+        """Identifier of the index's current contents (changes on every effective import)."""
+        try:
+            row = self._db.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()
+        except sqlite3.Error:
+            return None
+        return row[0] if row else None
+
+    def covers(self, ecosystem: str) -> bool:
+        """Return True if any advisory for the ecosystem has been imported."""
+        try:
+            return self._db.execute("SELECT 1 FROM ranges WHERE ecosystem = ? LIMIT 1", (ecosystem,)).fetchone() is not None
+        except sqlite3.Error:
+            return False
+
+    def affecting(self, ecosystem: str, name: str, version: str) -> List[Dict]:
+        """Return the advisories affecting one package version, most severe first.
+
+        Advisories that are aliases of one another (a PyPA advisory and the
+        GitHub advisory for the same issue) are reported once, under the
+        most severe rating.
+        """
+        self.lookups += 1
+        ranges = self._db.execute(
+            "SELECT advisory_id, introduced, fixed, last_affected, fixed_version FROM ranges "
+            "WHERE ecosystem = ? AND package = ?",
+            (ecosystem, normalize_name(ecosystem, name))
+        ).fetchall()
+        if not ranges:
+            # Most packages have no advisories at all; skip parsing their version
+            return []
+        key = encode_version(version)
+        fixed_in = {}
+        for advisory_id, introduced, fixed, last_affected, fixed_version in ranges:
+            if introduced <= key and (fixed is None or key < fixed) and (last_affected is None or key <= last_affected):
+                fixed_in.setdefault(advisory_id, fixed_version)
+        if not fixed_in:
+            return []
+
+        advisories = []
+        for advisory_id, severity, summary, aliases in self._db.execute(
+            f"SELECT id, severity, summary, aliases FROM advisories WHERE id IN ({','.join('?' * len(fixed_in))})",
+            list(fixed_in)
+        ):
+            advisories.append((SEVERITIES.index(severity), advisory_id, severity, summary, json.loads(aliases)))
+
+        found, seen = [], set()
+        for _, advisory_id, severity, summary, aliases in sorted(advisories):
+            if advisory_id in seen or seen.intersection(aliases):
+                continue
+            seen.add(advisory_id)
+            seen.update(aliases)
+            found.append({
+                "vulnerability_id": advisory_id,
+                "aliases": aliases,
+                "severity": severity,
+                "summary": summary,
+                "fixed_in": fixed_in[advisory_id],
+            })
+        return found
+
+    def severity_of(self, advisory_ids: Iterable[str]) -> Optional[str]:
+        """Return the most severe rating among advisories with any of these ids.
+
+        Lets results from tools that name advisories without rating them
+        (pip-audit) be rated the way the offline audit rates them; pass an
+        advisory's id together with its aliases.
+
+        Returns:
+            The severity, or None if no advisory with those ids is imported
+        """
+        advisory_ids = list(dict.fromkeys(advisory_ids))
+        if not advisory_ids:
+            return None
+        try:
+            rows = self._db.execute(
+                f"SELECT severity FROM advisories WHERE id IN ({','.join('?' * len(advisory_ids))})",
+                advisory_ids
+            ).fetchall()
+            if not rows:
+                # An advisory imported under another id may list these as aliases
+                rows = self._db.execute(
+                    f"SELECT severity FROM advisories WHERE {' OR '.join(['instr(aliases, ?)'] * len(advisory_ids))}",
+                    [json.dumps(advisory_id) for advisory_id in advisory_ids]
+                ).fetchall()
+        except sqlite3.Error:
+            return None
+        return min((severity for severity, in rows), key=SEVERITIES.index, default=None)
+
+    def audit(self, dependencies: Iterable[Dependency]) -> Dict:
+        """Audit a resolved dependency set.
+
+        Returns:
+            Audit results in the shape of the npm audit and pip-audit
+            results, with one detail per vulnerable package version and
+            advisory
+        """
+        result = {
+            "tool": "osv (offline)",
+            "success": True,
+            "vulnerabilities": {severity: 0 for severity in SEVERITIES},
+            "details": [],
+            "advisory_db": str(self.path),
+            "advisory_db_version": self.version,
+        }
+        try:
+            # One read transaction for all lookups instead of one per query
+            with self._db:
+                self._db.execute("BEGIN")
+                for ecosystem, name, version in sorted(dependencies):
+                    for advisory in self.affecting(ecosystem, name, version):
+                        result["vulnerabilities"][advisory["severity"]] += 1
+                        result["details"].append({"package": name, "version": version, **advisory})
+        except sqlite3.Error as e:
+            result["success"] = False
+            result["error"] = f"Could not read advisory database {self.path}: {e}"
+        return result
+
+    def close(self) -> None:
+        """Close the database connection."""
+        self._db.close()
+
+    def stats(self) -> Dict:
+        """Return the advisory and range counts per ecosystem."""
+        ecosystems = {}
+        for ecosystem, advisories, ranges in self._db.execute(
+            "SELECT ecosystem, COUNT(DISTINCT advisory_id), COUNT(*) FROM ranges GROUP BY ecosystem"
+        ):
+            ecosystems[ecosystem] = {"advisories": advisories, "ranges": ranges}
+        return {
+            "path": str(self.path),
+            "version": self.version,
+            "advisories": self._db.execute("SELECT COUNT(*) FROM advisories").fetchone()[0],
+            "ecosystems": ecosystems,
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline OSV advisory database")
+    parser.add_argument("--db", type=Path, default=ADVISORY_DB_PATH,
+                        help="Advisory database path (default ~/.smb-growth-agent/advisories.sqlite)")
+    subparsers = parser.add_subparsers(dest="command", help="Commands")
+
+    import_parser = subparsers.add_parser("import", help="Import OSV advisories")
+    import_parser.add_argument("sources", type=Path, nargs="+",
+                               help="OSV JSON files, directories or zip/tar archives (e.g. all.zip)")
+
+    subparsers.add_parser("info", help="Show what the database holds")
+
+    args = parser.parse_args()
+
+    if not args.command:
+        parser.print_help()
+        sys.exit(1)
+
+    if args.command == "import":
+        try:
+            index = AdvisoryIndex.create(args.db)
+            for source in args.sources:
+                start = time.monotonic()
+                counts = index.import_advisories(read_advisories(source))
+                print(f"{source}: {counts['added']} added, {counts['updated']} updated, "
+                      f"{counts['unchanged']} unchanged, {counts['withdrawn']} withdrawn "
+                      f"({counts['ranges']} ranges, {time.monotonic() - start:.1f}s)")
+        except ValueError as e:
+            print(f"Error: {e}")
+            sys.exit(1)
+        index.close()
+
+    elif args.command == "info":
+        index = AdvisoryIndex.open(args.db)
+        if index is None:
+            print(f"Error: No advisory database at {args.db}")
+            sys.exit(1)
+        print(json.dumps(index.stats(), indent=2))
+        index.close()
+
+
+if __name__ == "__main__":
+    main()
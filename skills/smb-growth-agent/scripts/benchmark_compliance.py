@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""Benchmark Compliance - Microbenchmarks for the compliance scanner.
+
+Compares the single-pass rule engine against the per-pattern re.search
+loops it replaced, and measures the throughput of the entropy-based secret
+detector (NumPy and pure-Python paths) against the rule engine's, on
+synthetic in-memory corpora so only matching cost is measured (no disk
+I/O).
+
+Usage:
+    python benchmark_compliance.py
+    python benchmark_compliance.py --files 200 --lines 2000 --repeat 5
+    python benchmark_compliance.py --benchmark secrets --secret-ratio 0.01
+    python benchmark_compliance.py --output json
+"""
+
+import argparse
+import json
+import random
+import re
+import string
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, List
+
+# Import sibling modules
+script_dir = Path(__file__).parent
+sys.path.insert(0, str(script_dir))
+
+from compliance_scan import active_rules
+from rule_engine import RuleEngine
+from secret_detector import SecretDetector, entropy_backend
+
+
+WORDS = (
+    "const let var function return import from this value data user item list "
+    "map filter reduce async await if else for while result error response request "
+    "config options record visit provider appointment status total amount"
+).split()
+
+# Lines that trigger rules, sprinkled into a small share of files
+HIT_LINES = [
+    'console.log("loaded patient", patient)',
+    'logger.info("ssn lookup", ssn)',
+    'const password = "changeme"',
+    'api_key = "sk_test_123"',
+    'cardNumber = form.card',
+    'const stripe = require("stripe")',
+    'test_card = "4111 1111 1111 1111"',
+]
+
+
+def build_corpus(files: int, lines: int, hit_ratio: float, seed: int) -> List[str]:
+    """Generate code-like file contents; hit_ratio of files contain a rule hit."""
+    rng = random.Random(seed)
+    corpus = []
+    for _ in range(files):
+        body = [
+            "    " + " ".join(rng.choice(WORDS) for _ in range(8)) + f" = {rng.randint(0, 999)};"
+            for _ in range(lines)
+        ]
+        if rng.random() < hit_ratio:
+            body[rng.randrange(lines)] = rng.choice(HIT_LINES)
+        corpus.append("\n".join(body))
+    return corpus
+
+
+# String literals that are not secrets: words, identifiers, paths, versions
+LITERALS = [
+    "loading", "patient_record_id", "/api/v1/appointments", "2.14.0-beta.3",
+    "application/json", "Content-Security-Policy", "btn btn-primary btn-lg",
+    "UserProfileSettingsPanel2", "X-Request-Id", "https://example.com/docs",
+]
+
+TOKEN_ALPHABET = string.ascii_letters + string.digits + "_-"
+
+
+def build_literal_corpus(files: int, lines: int, secret_ratio: float, seed: int) -> List[bytes]:
+    """Generate code with a string literal on most lines; secret_ratio of lines hold a random token."""
+    rng = random.Random(seed)
+    corpus = []
+    for _ in range(files):
+        body = []
+        for _ in range(lines):
+            words = " ".join(rng.choice(WORDS) for _ in range(4))
+            if rng.random() < secret_ratio:
+                token = "".join(rng.choice(TOKEN_ALPHABET) for _ in range(rng.randint(24, 48)))
+                body.append(f'    const {rng.choice(WORDS)} = "{token}";')
+            else:
+                body.append(f'    {words}("{rng.choice(LITERALS)}", {rng.randint(0, 999)});')
+        corpus.append("\n".join(body).encode("utf-8"))
+    return corpus
+
+
+# Requirements whose rules existed as hardcoded check_* loops
+LEGACY_REQUIREMENTS = ["HIPAA", "PCI-DSS"]
+
+
+def legacy_matched_ids(content: str, rules: List[Dict]) -> List[str]:
+    """Match rules the way the original check_* loops did, one re.search each."""
+    matched = []
+    lowered = content.lower()
+    for rule in rules:
+        if rule["requirement"] == "HIPAA" and rule["level"] == "issue":
+            # PHI patterns ran over a lowercased copy
+            if re.search(rule["pattern"], lowered, re.IGNORECASE):
+                matched.append(rule["id"])
+        elif rule.get("scope") == "project":
+            # Processor detection was a substring test per processor name
+            if any(proc in lowered for proc in rule["pattern"].split("|")):
+                matched.append(rule["id"])
+        elif re.search(rule["pattern"], content, re.IGNORECASE):
+            matched.append(rule["id"])
+    return matched
+
+
+def time_it(fn: Callable[[], None], repeat: int) -> float:
+    """Return the best wall time of repeat runs, in seconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def benchmark_rules(corpus: List[str], repeat: int) -> Dict:
+    """Time legacy per-pattern loops against the compiled rule engine."""
+    rules = active_rules(LEGACY_REQUIREMENTS)
+    engine = RuleEngine(rules)
+
+    # The legacy loops decoded text; the engine runs on raw bytes
+    raw_corpus = [content.encode("utf-8") for content in corpus]
+
+    # Both approaches must agree before their timings mean anything
+    for content, raw in zip(corpus, raw_corpus):
+        expected = legacy_matched_ids(content, rules)
+        actual = [rule["id"] for rule in engine.matched_rules(raw)]
+        if expected != actual:
+            raise AssertionError(f"Rule engine mismatch: {expected} != {actual}")
+
+    legacy = time_it(lambda: [legacy_matched_ids(c, rules) for c in corpus], repeat)
+    compiled = time_it(lambda: [engine.matched_rules(c) for c in raw_corpus], repeat)
+    total_bytes = sum(len(c) for c in corpus)
+
+    return {
+        "benchmark": "rule_engine",
+        "files": len(corpus),
+        "megabytes": round(total_bytes / 1_000_000, 2),
+        "rules": len(rules),
+        "legacy_seconds": round(legacy, 4),
+        "engine_seconds": round(compiled, 4),
+        "legacy_mb_per_second": round(total_bytes / 1_000_000 / legacy, 1),
+        "engine_mb_per_second": round(total_bytes / 1_000_000 / compiled, 1),
+        "speedup": round(legacy / compiled, 2),
+    }
+
+
+def benchmark_secrets(corpus: List[bytes], repeat: int) -> Dict:
+    """Time the secret detector's NumPy and pure-Python paths against the rule engine."""
+    engine = RuleEngine(active_rules(["HIPAA"]))
+    python_detector = SecretDetector(use_numpy=False)
+    numpy_detector = SecretDetector(use_numpy=True) if entropy_backend() == "numpy" else None
+
+    # Both entropy paths must flag the same tokens
+    candidates = sum(len(python_detector.candidates(content)) for content in corpus)
+    flagged = sum(len(python_detector.find(content)) for content in corpus)
+    if numpy_detector is not None:
+        for content in corpus:
+            expected = python_detector.find(content)
+            actual = numpy_detector.find(content)
+            if expected != actual:
+                raise AssertionError(f"Secret detector mismatch: {expected} != {actual}")
+
+    rules = time_it(lambda: [engine.occurrences(c) for c in corpus], repeat)
+    python_time = time_it(lambda: [python_detector.find(c) for c in corpus], repeat)
+    numpy_time = time_it(lambda: [numpy_detector.find(c) for c in corpus], repeat) if numpy_detector else None
+    megabytes = sum(len(c) for c in corpus) / 1_000_000
+    best = numpy_time if numpy_time is not None else python_time
+
+    return {
+        "benchmark": "secret_detector",
+        "files": len(corpus),
+        "megabytes": round(megabytes, 2),
+        "candidates": candidates,
+        "flagged": flagged,
+        "backend": entropy_backend(),
+        "rule_engine_mb_per_second": round(megabytes / rules, 1),
+        "python_mb_per_second": round(megabytes / python_time, 1),
+        "numpy_mb_per_second": round(megabytes / numpy_time, 1) if numpy_time else None,
+        "numpy_speedup": round(python_time / numpy_time, 2) if numpy_time else None,
+        # Share of the rule engine's speed the detector keeps up with
+        "relative_to_rule_engine": round(rules / best, 2),
+    }
+
+
+def format_text_report(result: Dict) -> str:
+    """Format a benchmark result as text."""
+    lines = [
+        "=" * 60,
+        f"BENCHMARK: {result['benchmark']}",
+        "=" * 60,
+    ]
+    for key, value in result.items():
+        if key != "benchmark":
+            lines.append(f"  {key}: {value}")
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compliance Scanner Benchmarks")
+    parser.add_argument("--files", type=int, default=100, help="Number of synthetic files")
+    parser.add_argument("--lines", type=int, default=1000, help="Lines per synthetic file")
+    parser.add_argument("--benchmark", choices=["rules", "secrets", "all"], default="all",
+                       help="Which benchmark to run")
+    parser.add_argument("--hit-ratio", type=float, default=0.05,
+                       help="Share of files containing a rule hit")
+    parser.add_argument("--secret-ratio", type=float, default=0.002,
+                       help="Share of lines holding a random token (secrets benchmark)")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per measurement (best is kept)")
+    parser.add_argument("--seed", type=int, default=1, help="Corpus random seed")
+    parser.add_argument("--output", choices=["text", "json"], default="text",
+                       help="Output format")
+
+    args = parser.parse_args()
+
+    results = []
+    if args.benchmark in ("rules", "all"):
+        corpus = build_corpus(args.files, args.lines, args.hit_ratio, args.seed)
+        results.append(benchmark_rules(corpus, args.repeat))
+    if args.benchmark in ("secrets", "all"):
+        corpus = build_literal_corpus(args.files, args.lines, args.secret_ratio, args.seed)
+        results.append(benchmark_secrets(corpus, args.repeat))
+
+    if args.output == "json":
+        print(json.dumps(results[0] if len(results) == 1 else results, indent=2))
+    else:
+        print("\n\n".join(format_text_report(result) for result in results))
+
+
+if __name__ == "__main__":
+    main()
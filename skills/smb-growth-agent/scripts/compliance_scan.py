@@ -2,19 +2,65 @@
 """Compliance Scan - Verify compliance requirements are maintained.
 
 This script scans project files for common compliance issues related to
-HIPAA, PCI-DSS, and accessibility requirements.
+HIPAA, PCI-DSS, and accessibility requirements. The project can be a
+directory, a git revision of one (--rev) or a .tar.gz/.zip export, which is
+read without extracting it. Content rules come from the
+YAML rule packs in references/compliance/rules (see rule_packs.py), so
+further requirements such as CCPA can be added without code changes.
 
 Usage:
     python compliance_scan.py /path/to/project --requirements HIPAA PCI-DSS
     python compliance_scan.py /path/to/project --requirements ADA --output json
+    python compliance_scan.py /path/to/project --requirements HIPAA CCPA --rules-dir ./state-rules
+    python compliance_scan.py /path/to/project --output jsonl
+    python compliance_scan.py /path/to/project --workers 8
+    python compliance_scan.py /path/to/project --fail-fast critical
+    python compliance_scan.py /path/to/project --watch
+    python compliance_scan.py /path/to/project --incremental
+    python compliance_scan.py /path/to/project --blob-store-mb 512
+    python compliance_scan.py /path/to/project --since origin/main
+    python compliance_scan.py /path/to/project --rev v1.2.0
+    python compliance_scan.py /path/to/release-1.2.0.tar.gz
+    python compliance_scan.py /path/to/project --max-map-mb 64
+    python compliance_scan.py /path/to/project --skip binary minified --max-file-mb 4
+    python compliance_scan.py /path/to/project --no-gitignore
 """
 
 import argparse
+import codecs
+import fnmatch
+import hashlib
+import io
+import itertools
 import json
+import mmap
+import multiprocessing
+import os
 import re
+import subprocess
 import sys
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import contextmanager
+from html.parser import HTMLParser
 from pathlib import Path
-from typing import Dict, List, Set
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+# Import sibling modules
+script_dir = Path(__file__).parent
+sys.path.insert(0, str(script_dir))
+
+from file_watcher import DEFAULT_DEBOUNCE, InotifyWatcher, open_watcher, wait_for_changes
+from git_objects import GitRevision
+from ignore_rules import EXCLUDE_DIRS, IGNORE_FILE, ProjectIgnore, project_ignore
+from project_archive import ARCHIVE_ERRORS, ProjectArchive, is_archive
+from rule_engine import LineIndex, RuleEngine
+from rule_packs import load_rule_packs
+from secret_detector import GENERIC_KIND, SecretDetector
+from scan_cache import (
+    BLOB_STORE_PATH, DEFAULT_BLOB_STORE_BYTES, BlobStore, ScanManifest, content_digest, default_manifest_path
+)
 
 
 # File patterns to scan
@@ -22,255 +68,1885 @@ CODE_PATTERNS = ["*.py", "*.js", "*.ts", "*.tsx", "*.jsx", "*.java", "*.cs", "*.
 HTML_PATTERNS = ["*.html", "*.htm", "*.jsx", "*.tsx", "*.vue"]
 CONFIG_PATTERNS = ["*.json", "*.yaml", "*.yml", "*.env*"]
 
+# Machine-generated files that match the scan patterns but never hold
+# hand-written code worth checking
+GENERATED_PATTERNS = [
+    "*.min.js", "*.bundle.js", "*.chunk.js",
+    "package-lock.json", "npm-shrinkwrap.json", "pnpm-lock.yaml",
+]
 
-def get_files(project_path: Path, patterns: List[str]) -> List[Path]:
-    """Get all files matching patterns, excluding common directories."""
-    exclude_dirs = {"node_modules", "venv", ".venv", "__pycache__", ".git", "dist", "build"}
-    files = []
+# Kinds of files the skip policy can leave out of a scan
+SKIP_KINDS = ["binary", "minified", "generated", "oversized"]
 
-    for pattern in patterns:
-        for f in project_path.rglob(pattern):
-            if not any(excl in f.parts for excl in exclude_dirs):
-                files.append(f)
+# Files larger than this are skipped as oversized (0 = no limit)
+DEFAULT_MAX_FILE_BYTES = 16 * 1024 * 1024
 
-    return files
+# Bytes sampled from the start of a file to detect binary/minified content
+SAMPLE_BYTES = 8 * 1024
 
+# Average line length in the sample above which a file counts as minified
+MINIFIED_LINE_LENGTH = 400
 
-def check_hipaa_compliance(project_path: Path) -> Dict:
-    """Check for common HIPAA violations in code.
+# Memory budget for the per-scan file content cache
+DEFAULT_CACHE_BYTES = 64 * 1024 * 1024
+
+# Files at least this large are memory-mapped instead of read into memory
+MMAP_BYTES = 1024 * 1024
+
+# Files larger than this are streamed in chunks instead of memory-mapped
+DEFAULT_STREAM_BYTES = 256 * 1024 * 1024
+
+# Chunk size for streamed files, and the overlap kept when a single line
+# is longer than a chunk
+CHUNK_BYTES = 8 * 1024 * 1024
+CHUNK_OVERLAP = 4096
+
+# Upper bound on the bytes of file content handed to a worker per task
+BATCH_BYTES = 4 * 1024 * 1024
+
+# Bump when per-file analysis logic changes so cached results are discarded
+ANALYZER_VERSION = 6
+
+# Match locations reported per rule per file (0 = all)
+DEFAULT_MAX_MATCHES = 10
+
+# Canonical names for requirements checked in code rather than by a rule
+# pack; rule packs declare their own aliases
+REQUIREMENT_ALIASES = {
+    "ADA": "ADA/WCAG",
+    "WCAG": "ADA/WCAG",
+    "ACCESSIBILITY": "ADA/WCAG",
+    "ADA/WCAG": "ADA/WCAG",
+}
+
+# Finding severities, lowest first
+SEVERITIES = ["low", "medium", "high", "critical"]
+
+# Content rules matched by the rule engine, loaded from the rule packs by
+# load_rules(). "bucket" selects the inventory files a rule runs on,
+# "level" routes hits to issues or warnings, and "project" scoped rules
+# report once for the whole project.
+COMPLIANCE_RULES: List[Dict] = []
+
+# Loaded rule packs by canonical requirement name
+RULE_PACKS: Dict[str, Dict] = {}
+
+# Extra rule pack directories currently loaded (None until first load)
+_rule_dirs: Optional[List[Path]] = None
+
+
+def _compile_patterns(patterns: List[str]) -> "re.Pattern":
+    """Combine filename globs into one case-sensitive regex (rglob semantics)."""
+    return re.compile("|".join(fnmatch.translate(p) for p in patterns))
+
+
+class FileInventory:
+    """Typed file buckets built from a single pruned walk of a project tree.
+
+    Every check run by scan_for_compliance_issues shares one inventory, so
+    the tree is walked once per scan regardless of how many requirements
+    are requested.
+    """
+
+    BUCKETS = {
+        "code": CODE_PATTERNS,
+        "html": HTML_PATTERNS,
+        "config": CONFIG_PATTERNS,
+    }
+
+    def __init__(self, root: Path):
+        self.root = root
+        self.code: List[Path] = []
+        self.html: List[Path] = []
+        self.config: List[Path] = []
+        self.sizes: Dict[Path, int] = {}
+        self.mtimes: Dict[Path, int] = {}
+        self._buckets: Dict[Path, List[str]] = {}
+        # Git blob SHA per path, for inventories read from a revision
+        self.blob_ids: Dict[Path, str] = {}
+
+    def add(self, path: Path, bucket: str, size: int, mtime_ns: int = 0) -> None:
+        """Record path in a bucket along with its size and mtime."""
+        self.bucket(bucket).append(path)
+        self.sizes[path] = size
+        self.mtimes[path] = mtime_ns
+        self._buckets.setdefault(path, []).append(bucket)
+
+    def insert(self, path: Path, bucket: str, size: int, mtime_ns: int = 0) -> None:
+        """Record a file that appeared after the walk, at its place in walk order."""
+        files = self.bucket(bucket)
+        key = self._walk_key(path)
+        low, high = 0, len(files)
+        while low < high:
+            middle = (low + high) // 2
+            if self._walk_key(files[middle]) < key:
+                low = middle + 1
+            else:
+                high = middle
+        files.insert(low, path)
+        self.sizes[path] = size
+        self.mtimes[path] = mtime_ns
+        self._buckets.setdefault(path, []).append(bucket)
+
+    def discard(self, path: Path) -> None:
+        """Drop path from every bucket it is in."""
+        for name in self._buckets.pop(path, []):
+            self.bucket(name).remove(path)
+        self.sizes.pop(path, None)
+        self.mtimes.pop(path, None)
+
+    def _walk_key(self, path: Path) -> List[Tuple[int, str]]:
+        # walk_project yields a directory's files before its subdirectories' files
+        parts = path.relative_to(self.root).parts
+        return [(1, part) for part in parts[:-1]] + [(0, parts[-1])]
+
+    def bucket(self, name: str) -> List[Path]:
+        """Return the file list for a bucket name ('code', 'html', 'config')."""
+        return getattr(self, name)
+
+    def buckets_for(self, path: Path) -> List[str]:
+        """Return the names of the buckets path belongs to."""
+        return self._buckets.get(path, [])
+
+    def all_files(self) -> List[Path]:
+        """Return every inventoried file once, sorted by path."""
+        seen = set()
+        files = []
+        for name in self.BUCKETS:
+            for f in self.bucket(name):
+                if f not in seen:
+                    seen.add(f)
+                    files.append(f)
+        return sorted(files)
+
+
+def walk_project(
+    project_path: Path,
+    exclude_dirs: Set[str] = EXCLUDE_DIRS,
+    ignore: Optional[ProjectIgnore] = None,
+    include_dirs: bool = False
+) -> Iterator[os.DirEntry]:
+    """Yield file entries under project_path with excluded directories pruned.
+
+    Excluded directories are dropped before they are opened, so large trees
+    such as node_modules are never read. With an ignore cache, directories
+    and files matched by the project's .gitignore files are dropped the same
+    way. Entries are visited in sorted order so results are stable across
+    runs and platforms. Symlinked directories are not followed. With
+    include_dirs, the entries of the directories descended into are
+    yielded too.
+    """
+    chain = ignore.root_chain() if ignore is not None else None
+    stack = [(str(project_path), ignore.prefix if ignore is not None else "", chain)]
+    while stack:
+        current, rel_prefix, chain = stack.pop()
+        try:
+            with os.scandir(current) as it:
+                entries = sorted(it, key=lambda e: e.name)
+        except OSError:
+            continue
+
+        if chain is not None and any(entry.name == IGNORE_FILE for entry in entries):
+            chain = ignore.extend(chain, current, rel_prefix)
+
+        subdirs = []
+        for entry in entries:
+            try:
+                is_dir = entry.is_dir(follow_symlinks=False)
+                if is_dir and entry.name in exclude_dirs:
+                    continue
+                if chain and ignore.ignored(chain, rel_prefix + entry.name, is_dir):
+                    continue
+                if is_dir:
+                    subdirs.append((entry.path, f"{rel_prefix}{entry.name}/", chain))
+                    if include_dirs:
+                        yield entry
+                elif entry.is_file():
+                    yield entry
+            except OSError:
+                continue
+
+        # Reverse so the stack pops subdirectories in sorted order
+        stack.extend(reversed(subdirs))
+
+
+def list_project_files(
+    project_path: Path,
+    rel_paths: List[str],
+    ignore: Optional[ProjectIgnore] = None
+) -> Iterator[os.DirEntry]:
+    """Yield entries for an explicit list of project-relative paths.
+
+    Applies the same exclusions as walk_project, so a scan limited to a
+    list of paths sees exactly the files a full walk would have seen.
+    Paths that no longer exist or are not regular files are skipped.
+    """
+    wanted = {}
+    for rel_path in rel_paths:
+        parts = Path(rel_path).parts
+        if any(part in EXCLUDE_DIRS for part in parts[:-1]):
+            continue
+        if ignore is not None and ignore.is_ignored(rel_path):
+            continue
+        full_path = project_path / rel_path
+        wanted.setdefault(str(full_path.parent), set()).add(full_path.name)
+
+    # Scan each parent directory once to get DirEntry objects with cached stat
+    for directory in sorted(wanted):
+        try:
+            with os.scandir(directory) as it:
+                entries = sorted((e for e in it if e.name in wanted[directory]), key=lambda e: e.name)
+        except OSError:
+            continue
+        for entry in entries:
+            try:
+                if entry.is_file(follow_symlinks=False):
+                    yield entry
+            except OSError:
+                continue
+
+
+def build_file_inventory(
+    project_path: Path,
+    rel_paths: Optional[List[str]] = None,
+    use_gitignore: bool = True
+) -> FileInventory:
+    """Walk project_path once and sort files into code/html/config buckets.
 
     Args:
         project_path: Path to the project
+        rel_paths: Limit the inventory to these project-relative paths
+            instead of walking the whole tree
+        use_gitignore: Leave out paths the project's .gitignore files
+            (and the repository's .git/info/exclude) ignore
 
     Returns:
-        Dict with HIPAA compliance findings
+        FileInventory shared by all compliance checks
     """
-    issues = []
-    warnings = []
-
-    code_files = get_files(project_path, CODE_PATTERNS)
-    config_files = get_files(project_path, CONFIG_PATTERNS)
-
-    # Patterns that might indicate PHI logging
-    phi_log_patterns = [
-        (r'console\.log\(.*patient', "Potential PHI in console.log"),
-        (r'print\(.*patient', "Potential PHI in print statement"),
-        (r'logger\.(info|debug|warn)\(.*ssn', "Potential SSN in logs"),
-        (r'logger\.(info|debug|warn)\(.*social.*security', "Potential SSN in logs"),
-        (r'console\.log\(.*ssn', "Potential SSN in console.log"),
-        (r'print\(.*ssn', "Potential SSN in print"),
-    ]
+    inventory = FileInventory(project_path)
+    matchers = {name: _compile_patterns(patterns) for name, patterns in FileInventory.BUCKETS.items()}
+    ignore = project_ignore(project_path) if use_gitignore else None
 
-    # Check for logging of sensitive data
-    for f in code_files:
-        try:
-            content = f.read_text(errors='ignore').lower()
-            for pattern, message in phi_log_patterns:
-                if re.search(pattern, content, re.IGNORECASE):
-                    issues.append({
-                        "file": str(f.relative_to(project_path)),
-                        "issue": message,
-                        "severity": "high"
-                    })
-        except Exception:
+    if rel_paths is None:
+        entries = walk_project(project_path, ignore=ignore)
+    else:
+        entries = list_project_files(project_path, rel_paths, ignore)
+
+    for entry in entries:
+        path = None
+        for name, matcher in matchers.items():
+            if matcher.match(entry.name):
+                if path is None:
+                    path = Path(entry.path)
+                    try:
+                        stat = entry.stat()
+                        size, mtime_ns = stat.st_size, stat.st_mtime_ns
+                    except OSError:
+                        size, mtime_ns = 0, 0
+                inventory.add(path, name, size, mtime_ns)
+
+    return inventory
+
+
+def build_revision_inventory(project_path: Path, revision: GitRevision) -> FileInventory:
+    """Sort the files of a git revision into code/html/config buckets.
+
+    Applies the same directory exclusions as walk_project. Ignore rules are
+    not applied: every file in the tree was committed. Paths are placed
+    under project_path only to name them; nothing is read from disk.
+
+    Returns:
+        FileInventory with blob_ids filled in
+    """
+    inventory = FileInventory(project_path)
+    matchers = {name: _compile_patterns(patterns) for name, patterns in FileInventory.BUCKETS.items()}
+
+    # Sort by path components to visit files in walk_project's order
+    for rel_path, (blob_id, size) in sorted(revision.files.items(), key=lambda item: item[0].split("/")):
+        parts = rel_path.split("/")
+        if any(part in EXCLUDE_DIRS for part in parts[:-1]):
             continue
+        path = None
+        for name, matcher in matchers.items():
+            if matcher.match(parts[-1]):
+                if path is None:
+                    path = project_path / rel_path
+                    inventory.blob_ids[path] = blob_id
+                inventory.add(path, name, size)
+
+    return inventory
+
+
+def git_changed_paths(project_path: Path, rev: str) -> List[str]:
+    """List files changed or added since rev, relative to project_path.
+
+    Covers committed, staged and unstaged changes against rev plus
+    untracked files that are not ignored. Deleted files are left out.
+
+    Args:
+        project_path: Path to the project (anywhere inside a git work tree)
+        rev: Base revision, e.g. 'origin/main' or a commit SHA
+
+    Returns:
+        Sorted list of project-relative paths
 
-    # Check for unencrypted storage patterns
-    encryption_warnings = [
-        (r'password.*=.*["\']', "Hardcoded password detected"),
-        (r'api_key.*=.*["\']', "Hardcoded API key detected"),
-        (r'secret.*=.*["\']', "Hardcoded secret detected"),
+    Raises:
+        ValueError: If git is unavailable or rev cannot be resolved
+    """
+    commands = [
+        ["git", "diff", "--name-only", "-z", "--relative", "--diff-filter=ACMRT", rev, "--"],
+        ["git", "ls-files", "--others", "--exclude-standard", "-z"],
     ]
 
-    for f in code_files:
+    paths = set()
+    for cmd in commands:
         try:
-            content = f.read_text(errors='ignore')
-            for pattern, message in encryption_warnings:
-                if re.search(pattern, content, re.IGNORECASE):
-                    warnings.append({
-                        "file": str(f.relative_to(project_path)),
-                        "issue": message,
-                        "severity": "medium"
-                    })
-        except Exception:
-            continue
+            result = subprocess.run(cmd, cwd=project_path, capture_output=True, text=True, timeout=120)
+        except FileNotFoundError:
+            raise ValueError("git not found - --since requires git")
+        except subprocess.TimeoutExpired:
+            raise ValueError(f"Command timed out: {' '.join(cmd)}")
+        if result.returncode != 0:
+            raise ValueError(result.stderr.strip() or f"git failed: {' '.join(cmd)}")
+        paths.update(p for p in result.stdout.split("\0") if p)
+
+    return sorted(paths)
+
+
+class ContentCache:
+    """Read-once byte content layer shared by every check in a scan.
+
+    Files smaller than mmap_bytes are read into memory and kept in an LRU
+    bounded by max_bytes, so a file that several checks look at is read
+    from disk once while memory stays flat on huge repos. Larger files are
+    memory-mapped and matched in place, with no read copy, no decode and
+    nothing retained afterwards. Files above stream_bytes are not mapped at
+    all; iter_chunks streams them instead.
+
+    Content is raw bytes: rule patterns are compiled as bytes, so nothing
+    is decoded or lowercased before matching.
+    """
 
-    # Check for .env file with secrets
-    env_file = project_path / ".env"
-    if env_file.exists():
-        warnings.append({
-            "file": ".env",
-            "issue": "Environment file exists - ensure not committed to repository",
-            "severity": "medium"
-        })
+    def __init__(
+        self,
+        max_bytes: int = DEFAULT_CACHE_BYTES,
+        mmap_bytes: int = MMAP_BYTES,
+        stream_bytes: int = DEFAULT_STREAM_BYTES
+    ):
+        self.max_bytes = max_bytes
+        self.mmap_bytes = mmap_bytes
+        self.stream_bytes = stream_bytes
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.mapped = 0
+        self.streamed = 0
+        self._entries: "OrderedDict[Path, bytes]" = OrderedDict()
+
+    @contextmanager
+    def open(self, path: Path) -> Iterator[Optional[bytes]]:
+        """Yield the file's content as bytes or a read-only mmap.
+
+        The content is only valid inside the with block; mappings are
+        closed on exit. Yields None if the file cannot be read.
+        """
+        content = self._entries.get(path)
+        if content is not None:
+            self._entries.move_to_end(path)
+            self.hits += 1
+            yield content
+            return
+
+        self.misses += 1
+        try:
+            f = open(path, "rb")
+        except OSError:
+            yield None
+            return
+
+        with f:
+            try:
+                size = os.fstat(f.fileno()).st_size
+            except OSError:
+                size = 0
+
+            mapped = None
+            if size >= self.mmap_bytes:
+                try:
+                    mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                except (OSError, ValueError):
+                    mapped = None
+
+            if mapped is not None:
+                self.mapped += 1
+                try:
+                    yield mapped
+                finally:
+                    mapped.close()
+                return
+
+            try:
+                content = f.read()
+            except OSError:
+                content = None
+
+        if content is not None:
+            self._remember(path, content)
+        yield content
+
+    def _remember(self, path: Path, content: bytes) -> None:
+        size = len(content)
+        if size > self.max_bytes:
+            return
+        self._entries[path] = content
+        self.current_bytes += size
+        while self.current_bytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self.current_bytes -= len(evicted)
+            self.evictions += 1
+
+    def discard(self, path: Path) -> None:
+        """Forget a file's cached content (e.g. after it changed on disk)."""
+        content = self._entries.pop(path, None)
+        if content is not None:
+            self.current_bytes -= len(content)
+
+    def iter_chunks(self, path: Path, hasher=None) -> Iterator[Tuple[int, bytes]]:
+        """Stream a file as line-aligned chunks of about CHUNK_BYTES.
+
+        Rules never match across a newline, so cutting on line boundaries
+        loses nothing. A single line longer than a chunk is cut anyway, with
+        CHUNK_OVERLAP bytes repeated at the start of the next chunk.
+
+        Args:
+            path: File to stream
+            hasher: Optional hashlib object updated with the raw file bytes
+
+        Yields:
+            (file offset of the chunk, chunk bytes)
+        """
+        self.streamed += 1
+        try:
+            with open(path, "rb") as f:
+                yield from line_chunks(iter(lambda: f.read(CHUNK_BYTES), b""), hasher)
+        except OSError:
+            return
+
+    def stats(self) -> Dict:
+        """Return hit/miss counters and current memory usage."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "mapped": self.mapped,
+            "streamed": self.streamed,
+            "entries": len(self._entries),
+            "bytes": self.current_bytes,
+            "max_bytes": self.max_bytes,
+        }
+
+
+def line_chunks(blocks: Iterable[bytes], hasher=None) -> Iterator[Tuple[int, bytes]]:
+    """Re-cut raw blocks of a stream into line-aligned chunks.
+
+    Used for streamed files and for large blobs read from git; see
+    ContentCache.iter_chunks for the cutting rules.
+
+    Yields:
+        (stream offset of the chunk, chunk bytes)
+    """
+    carry = b""
+    start = 0
+    for block in blocks:
+        if hasher is not None:
+            hasher.update(block)
+        data = carry + block
+        cut = data.rfind(b"\n") + 1
+        if cut:
+            yield start, data[:cut]
+            carry = data[cut:]
+            start += cut
+        else:
+            yield start, data
+            carry = data[-CHUNK_OVERLAP:]
+            start += len(data) - len(carry)
+    if carry:
+        yield start, carry
+
+
+class SkipPolicy:
+    """Decides which inventoried files are not worth matching rules against.
+
+    Name and size checks cost nothing beyond the walk's stat; the binary and
+    minified checks only look at the first SAMPLE_BYTES of a file, so a
+    skipped file is never read in full.
+    """
 
-    # Check gitignore for .env
-    gitignore = project_path / ".gitignore"
-    if gitignore.exists():
-        content = gitignore.read_text()
-        if ".env" not in content:
-            issues.append({
-                "file": ".gitignore",
-                "issue": ".env not in .gitignore - secrets may be committed",
-                "severity": "high"
+    def __init__(
+        self,
+        kinds: Optional[List[str]] = None,
+        max_file_bytes: int = DEFAULT_MAX_FILE_BYTES,
+        generated_patterns: List[str] = GENERATED_PATTERNS
+    ):
+        self.kinds = set(SKIP_KINDS if kinds is None else kinds)
+        self.max_file_bytes = max_file_bytes
+        self.generated_patterns = list(generated_patterns)
+        self._generated = _compile_patterns(self.generated_patterns) if self.generated_patterns else None
+
+    def classify(self, path: Path, size: int) -> Optional[str]:
+        """Return the skip reason known from name and size alone, or None."""
+        if "oversized" in self.kinds and self.max_file_bytes and size > self.max_file_bytes:
+            return "oversized"
+        if "generated" in self.kinds and self._generated and self._generated.match(path.name):
+            return "generated"
+        return None
+
+    def classify_sample(self, sample: bytes) -> Optional[str]:
+        """Return the skip reason for a file from its leading bytes, or None."""
+        if "binary" in self.kinds and b"\0" in sample:
+            return "binary"
+        if "minified" in self.kinds and len(sample) > MINIFIED_LINE_LENGTH:
+            if len(sample) / (sample.count(b"\n") + 1) > MINIFIED_LINE_LENGTH:
+                return "minified"
+        return None
+
+    def key(self) -> Dict:
+        """Return the settings that affect analysis, for rules_version."""
+        return {
+            "kinds": sorted(self.kinds),
+            "max_file_bytes": self.max_file_bytes,
+            "generated": self.generated_patterns,
+            "minified_line_length": MINIFIED_LINE_LENGTH,
+        }
+
+
+def get_files(project_path: Path, patterns: List[str]) -> List[Path]:
+    """Get all files matching patterns, excluding common directories."""
+    matcher = _compile_patterns(patterns)
+    return [Path(entry.path) for entry in walk_project(project_path) if matcher.match(entry.name)]
+
+
+def load_rules(rule_dirs: Optional[List[Path]] = None) -> List[Dict]:
+    """Load the built-in rule packs plus any packs in rule_dirs.
+
+    Fills COMPLIANCE_RULES and RULE_PACKS in place. Called without
+    rule_dirs, keeps whatever is already loaded (the built-in packs if
+    nothing is yet).
+
+    Raises:
+        ValueError: If a pack directory is missing or a pack is malformed
+    """
+    global _rule_dirs
+    if _rule_dirs is not None and (rule_dirs is None or list(rule_dirs) == _rule_dirs):
+        return COMPLIANCE_RULES
+
+    packs = load_rule_packs(rule_dirs)
+    RULE_PACKS.clear()
+    RULE_PACKS.update((pack["requirement"], pack) for pack in packs)
+    COMPLIANCE_RULES[:] = [rule for pack in packs for rule in pack["rules"]]
+    _rule_dirs = list(rule_dirs or [])
+    return COMPLIANCE_RULES
+
+
+def normalize_requirement(requirement: str) -> Optional[str]:
+    """Map a requirement alias (e.g. 'PCI', 'WCAG') to its canonical name."""
+    name = requirement.upper()
+    if name in REQUIREMENT_ALIASES:
+        return REQUIREMENT_ALIASES[name]
+    load_rules()
+    for pack in RULE_PACKS.values():
+        if name in pack["aliases"]:
+            return pack["requirement"]
+    return None
+
+
+def active_rules(requirements: List[str]) -> List[Dict]:
+    """Return the rules that apply to the given requirement names."""
+    canonical = {normalize_requirement(r) for r in requirements}
+    return [rule for rule in load_rules() if rule["requirement"] in canonical]
+
+
+def rules_version(
+    requirements: List[str],
+    policy: Optional[SkipPolicy] = None,
+    max_matches: int = DEFAULT_MAX_MATCHES
+) -> str:
+    """Fingerprint everything that shapes per-file analysis for requirements.
+
+    Cached analyses are only valid for the same rules version, so any change
+    to the active rules, the analyzer, the skip policy, the match cap or the
+    requirement set invalidates them.
+    """
+    canonical = sorted({normalize_requirement(r) or "" for r in requirements})
+    payload = json.dumps({
+        "analyzer": ANALYZER_VERSION,
+        "requirements": canonical,
+        "rules": active_rules(requirements),
+        "skip": (policy or SkipPolicy()).key(),
+        "max_matches": max_matches,
+    }, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+# Elements that are keyboard-operable without extra handlers
+KEYBOARD_ELEMENTS = {"a", "button", "input", "select", "textarea", "summary"}
+
+# Handlers that give a clickable element a keyboard alternative
+KEYBOARD_HANDLERS = {"onkeypress", "onkeydown", "onkeyup"}
+
+# Decoded text handed to the tokenizer per feed() call
+TOKENIZER_FEED_BYTES = 1024 * 1024
+
+
+class AccessibilityScanner(HTMLParser):
+    """Single-pass tokenizer for basic accessibility checks on one template.
+
+    Walks the markup once with html.parser, so time is linear in file size,
+    and records facts per element as it goes: images without alt text,
+    clickable elements without a keyboard handler, and form inputs with
+    their ids. Label targets are collected in a set, and inputs are matched
+    against it once parsing ends. Every finding carries the line of the
+    element it is about. Content can be fed in pieces.
+
+    Attribute names are case-insensitive, so JSX spellings such as onClick
+    and htmlFor are understood.
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=False)
+        self._decoder = codecs.getincrementaldecoder("utf-8")(errors="ignore")
+        self._label_depth = 0
+        self._labelled: Set[str] = set()
+        self._inputs: List[Tuple[str, int]] = []
+        self.issues: List[Dict] = []
+        self.warnings: List[Dict] = []
+
+    def feed_bytes(self, content) -> None:
+        """Feed raw bytes (or an mmap), decoding incrementally."""
+        for start in range(0, len(content), TOKENIZER_FEED_BYTES):
+            self.feed(self._decoder.decode(content[start:start + TOKENIZER_FEED_BYTES]))
+
+    def handle_starttag(self, tag: str, attrs: List[Tuple[str, Optional[str]]]) -> None:
+        attributes = dict(attrs)
+        line = self.getpos()[0]
+
+        if tag == "img" and "alt" not in attributes:
+            self.issues.append({
+                "issue": "Image without alt attribute",
+                "severity": "medium",
+                "line": line
             })
 
-    return {
-        "requirement": "HIPAA",
-        "status": "fail" if issues else ("warning" if warnings else "pass"),
-        "issues": issues,
-        "warnings": warnings,
-        "recommendations": [
-            "Audit all logging for PHI exposure",
-            "Ensure encryption at rest for all PHI storage",
-            "Review access controls for PHI access",
-            "Verify BAAs are in place for all services handling PHI",
-        ] if issues or warnings else []
-    }
+        if tag == "label":
+            target = attributes.get("for") or attributes.get("htmlfor")
+            if target:
+                self._labelled.add(target)
+            self._label_depth += 1
+
+        if tag == "input" and attributes.get("id"):
+            labelled = (
+                self._label_depth > 0
+                or "aria-label" in attributes
+                or "aria-labelledby" in attributes
+                or (attributes.get("type") or "").lower() == "hidden"
+            )
+            if not labelled:
+                self._inputs.append((attributes["id"], line))
+
+        if "onclick" in attributes and tag not in KEYBOARD_ELEMENTS:
+            if KEYBOARD_HANDLERS.isdisjoint(attributes):
+                self.warnings.append({
+                    "issue": "onclick without keyboard handler - may not be keyboard accessible",
+                    "severity": "medium",
+                    "line": line
+                })
 
+    def handle_startendtag(self, tag: str, attrs: List[Tuple[str, Optional[str]]]) -> None:
+        # <label/> never wraps anything
+        self.handle_starttag(tag, attrs)
+        if tag == "label":
+            self._label_depth -= 1
 
-def check_pci_compliance(project_path: Path) -> Dict:
-    """Check for common PCI-DSS violations.
+    def handle_endtag(self, tag: str) -> None:
+        if tag == "label" and self._label_depth > 0:
+            self._label_depth -= 1
+
+    def findings(self) -> Dict[str, List[Dict]]:
+        """Finish parsing and return issues and warnings in line order."""
+        self.feed(self._decoder.decode(b"", final=True))
+        self.close()
+
+        warnings = list(self.warnings)
+        for input_id, line in self._inputs:
+            if input_id not in self._labelled:
+                warnings.append({
+                    "issue": f"Input '{input_id}' may lack associated label",
+                    "severity": "low",
+                    "line": line
+                })
+        warnings.sort(key=lambda w: w["line"])
+
+        return {"issues": self.issues, "warnings": warnings}
+
+
+def analyze_accessibility(content: bytes) -> Dict[str, List[Dict]]:
+    """Find basic accessibility issues in one HTML/template file.
 
     Args:
-        project_path: Path to the project
+        content: Raw file content (bytes or mmap)
 
     Returns:
-        Dict with PCI-DSS compliance findings
+        Dict with 'issues' and 'warnings' lists (findings with a line but
+        without a file key)
     """
-    issues = []
-    warnings = []
-
-    code_files = get_files(project_path, CODE_PATTERNS)
-
-    # Patterns that might indicate card data handling
-    card_patterns = [
-        (r'\b\d{4}[- ]?\d{4}[- ]?\d{4}[- ]?\d{4}\b', "Potential card number in code"),
-        (r'card.*number.*=', "Variable storing card number"),
-        (r'cvv.*=', "Variable storing CVV (NEVER store CVV)"),
-        (r'cvc.*=', "Variable storing CVC (NEVER store CVC)"),
-        (r'expir.*=.*\d{2}', "Expiration date storage"),
-    ]
+    scanner = AccessibilityScanner()
+    scanner.feed_bytes(content)
+    return scanner.findings()
+
+
+class FileAnalyzer:
+    """Runs every per-file check for a set of requirements on file content.
+
+    Built from requirement names alone, so worker processes can construct
+    their own copy and compile the rule engines once per process.
+    """
+
+    def __init__(
+        self,
+        requirements: List[str],
+        policy: Optional[SkipPolicy] = None,
+        max_matches: int = DEFAULT_MAX_MATCHES
+    ):
+        self.requirements = [normalize_requirement(r) for r in requirements]
+        self.accessibility = "ADA/WCAG" in self.requirements
+        self.policy = policy or SkipPolicy()
+        self.max_matches = max_matches
+        self.rules_version = rules_version(requirements, self.policy, max_matches)
+
+        # Entropy-based secret detection over code, part of the HIPAA check
+        self.secrets = SecretDetector() if "HIPAA" in self.requirements else None
+
+        active = active_rules(requirements)
+        self.engines = {
+            bucket: RuleEngine([rule for rule in active if rule["bucket"] == bucket])
+            for bucket in FileInventory.BUCKETS
+            if any(rule["bucket"] == bucket for rule in active)
+        }
+
+    def wants(self, buckets: List[str]) -> bool:
+        """Return True if any per-file check applies to these buckets."""
+        return (
+            any(b in self.engines for b in buckets)
+            or (self.accessibility and "html" in buckets)
+            or (self.secrets is not None and "code" in buckets)
+        )
+
+    def analyze(self, content: Optional[bytes], buckets: List[str]) -> Dict:
+        """Analyze one file's content.
+
+        Args:
+            content: Raw file content, or None if the file could not be read
+            buckets: Inventory buckets the file belongs to
+
+        Returns:
+            Dict with matched rule ids ('rules'), their [line, column]
+            match locations ('locations', at most max_matches per rule),
+            for code files when HIPAA is requested, high-entropy tokens
+            ('secrets', at most max_matches) and, for HTML files when
+            accessibility is requested, 'accessibility' findings
+        """
+        if content is None:
+            return {"rules": [], "locations": {}}
+        return self.analyze_chunks([(0, content)], buckets)
+
+    def analyze_chunks(self, chunks: Iterable[Tuple[int, bytes]], buckets: List[str]) -> Dict:
+        """Analyze a file delivered as (offset, chunk) line-aligned pieces.
+
+        Produces the same analysis as analyze() on the whole content as
+        long as no line is longer than a chunk: locations are translated to
+        whole-file lines and columns, and matches repeated in the overlap
+        after a cut line are counted once.
+        """
+        locations = {bucket: {} for bucket in buckets if bucket in self.engines}
+        scanner = None
+        if self.accessibility and "html" in buckets:
+            scanner = AccessibilityScanner()
+        secrets = [] if self.secrets is not None and "code" in buckets else None
+
+        line_base = 0      # newlines before the current chunk
+        column_base = 0    # bytes between the last newline and the chunk start
+        seen = set()
+        previous = None
+
+        for offset, chunk in chunks:
+            overlap = 0
+            if previous is not None:
+                previous_offset, previous_chunk = previous
+                delta = offset - previous_offset
+                overlap = len(previous_chunk) - delta
+                newlines = previous_chunk.count(b"\n", 0, delta)
+                if newlines:
+                    line_base += newlines
+                    column_base = delta - previous_chunk.rfind(b"\n", 0, delta) - 1
+                else:
+                    column_base += delta
+            previous = (offset, chunk)
+
+            for bucket, found in locations.items():
+                matches = self.engines[bucket].occurrences(chunk, self.max_matches)
+                if not matches:
+                    continue
+                index = LineIndex(chunk, max(offsets[-1] for _, offsets in matches) + 1)
+                for rule, offsets in matches:
+                    rule_locations = found.setdefault(rule["id"], [])
+                    for position in offsets:
+                        if self.max_matches and len(rule_locations) >= self.max_matches:
+                            break
+                        if (rule["id"], offset + position) in seen:
+                            continue
+                        seen.add((rule["id"], offset + position))
+                        line, column = index.locate(position)
+                        if line == 1:
+                            column += column_base
+                        rule_locations.append([line_base + line, column])
+
+            if secrets is not None and not (self.max_matches and len(secrets) >= self.max_matches):
+                hits = self.secrets.find(chunk)
+                index = LineIndex(chunk, hits[-1][0] + 1) if hits else None
+                for position, kind, entropy in hits:
+                    if self.max_matches and len(secrets) >= self.max_matches:
+                        break
+                    if ("secret", offset + position) in seen:
+                        continue
+                    seen.add(("secret", offset + position))
+                    line, column = index.locate(position)
+                    if line == 1:
+                        column += column_base
+                    secrets.append({"line": line_base + line, "column": column, "kind": kind, "entropy": entropy})
+
+            if scanner is not None:
+                scanner.feed_bytes(chunk[overlap:] if overlap else chunk)
+
+        analysis = {"rules": [], "locations": {}}
+        for bucket, found in locations.items():
+            for rule in self.engines[bucket].rules:
+                if rule["id"] in found:
+                    analysis["rules"].append(rule["id"])
+                    analysis["locations"][rule["id"]] = found[rule["id"]]
+        if secrets is not None:
+            analysis["secrets"] = secrets
+        if scanner is not None:
+            analysis["accessibility"] = scanner.findings()
+        return analysis
+
+
+def analyze_path(
+    path: Path,
+    buckets: List[str],
+    analyzer: FileAnalyzer,
+    cache: ContentCache,
+    with_digest: bool = False,
+    reuse: Optional[Callable[[str], Optional[Dict]]] = None
+) -> Tuple[Optional[str], Dict, bool]:
+    """Read a file once and analyze it.
+
+    Files are read, memory-mapped or streamed depending on their size (see
+    ContentCache). Files the analyzer's skip policy rejects get an analysis
+    with no rules and a 'skipped' reason instead.
+
+    Args:
+        path: File to analyze
+        buckets: Inventory buckets the file belongs to
+        analyzer: Analyzer for the active requirements
+        cache: Content cache to read through
+        with_digest: Also return the SHA-256 of the raw content
+        reuse: Called with the digest before matching; a non-None return is
+            used as the analysis instead of matching the content
+
+    Returns:
+        (digest, analysis, reused); digest is None if not requested or if
+        the file was skipped by name or size or unreadable, and reused is
+        True if the analysis came from reuse
+    """
+    try:
+        size = path.stat().st_size
+    except OSError:
+        return None, analyzer.analyze(None, buckets), False
+
+    reason = analyzer.policy.classify(path, size)
+    if reason:
+        return None, {"rules": [], "skipped": reason}, False
 
-    for f in code_files:
+    if size > cache.stream_bytes:
         try:
-            content = f.read_text(errors='ignore')
-            for pattern, message in card_patterns:
-                if re.search(pattern, content, re.IGNORECASE):
-                    severity = "critical" if "cvv" in pattern.lower() or "cvc" in pattern.lower() else "high"
-                    issues.append({
-                        "file": str(f.relative_to(project_path)),
-                        "issue": message,
-                        "severity": severity
-                    })
-        except Exception:
-            continue
+            with open(path, "rb") as f:
+                reason = analyzer.policy.classify_sample(f.read(SAMPLE_BYTES))
+        except OSError:
+            return None, analyzer.analyze(None, buckets), False
+        if reason:
+            return None, {"rules": [], "skipped": reason}, False
+        hasher = hashlib.sha256() if with_digest else None
+        analysis = analyzer.analyze_chunks(cache.iter_chunks(path, hasher), buckets)
+        return (hasher.hexdigest() if hasher else None), analysis, False
+
+    with cache.open(path) as content:
+        if content is None:
+            return None, analyzer.analyze(None, buckets), False
+        digest = content_digest(content) if with_digest else None
+        if digest and reuse:
+            reused = reuse(digest)
+            if reused is not None:
+                return digest, reused, True
+        reason = analyzer.policy.classify_sample(content[:SAMPLE_BYTES])
+        if reason:
+            return digest, {"rules": [], "skipped": reason}, False
+        return digest, analyzer.analyze(content, buckets), False
+
+
+def analyze_blob(
+    path: Path,
+    size: int,
+    blob_id: str,
+    buckets: List[str],
+    analyzer: FileAnalyzer,
+    revision: GitRevision,
+    stream_bytes: int = DEFAULT_STREAM_BYTES,
+    reuse: Optional[Callable[[str], Optional[Dict]]] = None
+) -> Tuple[Optional[str], Dict, bool]:
+    """Analyze a file of a git revision, read through the revision's cat-file.
+
+    The counterpart of analyze_path for blobs. The cache key is the blob
+    SHA (as 'git:<sha>'), known from the tree listing, so reuse is tried
+    before the blob is read at all.
 
-    # Check for proper payment processor usage
-    payment_processors = ["stripe", "braintree", "paypal", "square", "adyen"]
-    uses_payment = False
+    Args:
+        path: Project path naming the file (for skip rules and reports)
+        size: Blob size from the tree listing
+        blob_id: Blob SHA
+        buckets: Inventory buckets the file belongs to
+        analyzer: Analyzer for the active requirements
+        revision: Revision to read the blob from
+        stream_bytes: Blobs larger than this are analyzed in chunks
+        reuse: Called with the cache key; a non-None return is used as the
+            analysis instead of reading and matching the blob
+
+    Returns:
+        (cache key, analysis, reused), as for analyze_path
+    """
+    reason = analyzer.policy.classify(path, size)
+    if reason:
+        return None, {"rules": [], "skipped": reason}, False
+
+    key = f"git:{blob_id}"
+    if reuse:
+        reused = reuse(key)
+        if reused is not None:
+            return key, reused, True
+
+    if size > stream_bytes:
+        blocks = revision.iter_blob(blob_id, CHUNK_BYTES)
+        first = next(blocks, b"")
+        reason = analyzer.policy.classify_sample(first[:SAMPLE_BYTES])
+        if reason:
+            blocks.close()
+            return key, {"rules": [], "skipped": reason}, False
+        return key, analyzer.analyze_chunks(line_chunks(itertools.chain([first], blocks)), buckets), False
+
+    content = revision.read_blob(blob_id)
+    reason = analyzer.policy.classify_sample(content[:SAMPLE_BYTES])
+    if reason:
+        return key, {"rules": [], "skipped": reason}, False
+    return key, analyzer.analyze(content, buckets), False
+
+
+def analyze_stream(
+    path: Path,
+    size: int,
+    stream,
+    buckets: List[str],
+    analyzer: FileAnalyzer,
+    stream_bytes: int = DEFAULT_STREAM_BYTES,
+    reuse: Optional[Callable[[str], Optional[Dict]]] = None
+) -> Tuple[Optional[str], Dict, bool]:
+    """Analyze a file read from a forward-only stream (an archive member).
+
+    The counterpart of analyze_path for archives: content up to
+    stream_bytes is read whole, hashed and offered to reuse; larger
+    members are hashed and matched chunk by chunk as they stream past.
 
-    for f in code_files:
+    Args:
+        path: Project path naming the file (for skip rules and reports)
+        size: Member size from the archive index
+        stream: Binary file object positioned at the member's start
+        buckets: Inventory buckets the file belongs to
+        analyzer: Analyzer for the active requirements
+        stream_bytes: Members larger than this are analyzed in chunks
+        reuse: Called with the content digest before matching; a non-None
+            return is used as the analysis instead
+
+    Returns:
+        (digest, analysis, reused), as for analyze_path
+    """
+    reason = analyzer.policy.classify(path, size)
+    if reason:
+        return None, {"rules": [], "skipped": reason}, False
+
+    if size > stream_bytes:
+        hasher = hashlib.sha256()
+        first = stream.read(CHUNK_BYTES)
+        reason = analyzer.policy.classify_sample(first[:SAMPLE_BYTES])
+        if reason:
+            return None, {"rules": [], "skipped": reason}, False
+        blocks = itertools.chain([first], iter(lambda: stream.read(CHUNK_BYTES), b""))
+        analysis = analyzer.analyze_chunks(line_chunks(blocks, hasher), buckets)
+        return hasher.hexdigest(), analysis, False
+
+    content = stream.read()
+    digest = content_digest(content)
+    if reuse:
+        reused = reuse(digest)
+        if reused is not None:
+            return digest, reused, True
+    reason = analyzer.policy.classify_sample(content[:SAMPLE_BYTES])
+    if reason:
+        return digest, {"rules": [], "skipped": reason}, False
+    return digest, analyzer.analyze(content, buckets), False
+
+
+# Per-process analyzer, reader, blob store and fail-fast cancel event
+# used by parallel scan workers
+_worker_analyzer: Optional[FileAnalyzer] = None
+_worker_cache: Optional[ContentCache] = None
+_worker_blobs: Optional[BlobStore] = None
+_worker_cancel = None
+
+
+def _init_worker(
+    requirements: List[str],
+    rule_dirs: List[Path],
+    policy: SkipPolicy,
+    max_matches: int,
+    mmap_bytes: int,
+    stream_bytes: int,
+    blob_store: Optional[Tuple[Path, str]] = None,
+    cancel_event=None
+) -> None:
+    """Compile the rule engines once in each worker process."""
+    global _worker_analyzer, _worker_cache, _worker_blobs, _worker_cancel
+    load_rules(rule_dirs)
+    _worker_analyzer = FileAnalyzer(requirements, policy, max_matches)
+    # Workers never see a file twice, so nothing is worth retaining
+    _worker_cache = ContentCache(max_bytes=0, mmap_bytes=mmap_bytes, stream_bytes=stream_bytes)
+    # Workers only look blobs up; the parent process writes what they found
+    _worker_blobs = BlobStore.open(*blob_store, read_only=True) if blob_store else None
+    _worker_cancel = cancel_event
+
+
+def _analyze_batch(batch: List[Tuple[str, List[str]]]) -> List[Tuple[Optional[str], Dict, bool]]:
+    """Read and analyze a batch of (path, buckets) in a worker process.
+
+    Returns:
+        (content digest, analysis, reused) per file; the digest is None if
+        unreadable, and reused is True if the blob store had the analysis.
+        Stops early, returning the files done so far, once the fail-fast
+        cancel event is set.
+    """
+    results = []
+    for path, buckets in batch:
+        if _worker_cancel is not None and _worker_cancel.is_set():
+            break
+        reuse = None
+        if _worker_blobs is not None:
+            reuse = lambda digest, buckets=buckets: _worker_blobs.get(digest, buckets)
+        results.append(analyze_path(
+            Path(path), buckets, _worker_analyzer, _worker_cache, with_digest=True, reuse=reuse
+        ))
+    return results
+
+
+def plan_batches(files: List[Path], sizes: Dict[Path, int], target_bytes: int) -> List[List[Path]]:
+    """Group files, in order, into batches of roughly target_bytes each.
+
+    Sizing by bytes rather than file count keeps one batch of large files
+    from serializing the whole scan behind a single worker.
+    """
+    batches = []
+    current: List[Path] = []
+    current_bytes = 0
+
+    for f in files:
+        current.append(f)
+        current_bytes += sizes.get(f, 0)
+        if current_bytes >= target_bytes:
+            batches.append(current)
+            current = []
+            current_bytes = 0
+
+    if current:
+        batches.append(current)
+    return batches
+
+
+class FailFast:
+    """Cancellation token for gate scans that stop at the first bad finding.
+
+    Tripped by the first issue at or above the severity threshold, whether
+    seen in a file's analysis as it is stored or added to a FindingSink.
+    Once tripped, the scan starts no new work: files not yet analyzed are
+    left alone, parallel workers stop between files, queued batches are
+    cancelled and only the requirement that tripped it is still reported
+    (from the files already analyzed); the other remaining requirements
+    are not checked.
+    """
+
+    def __init__(self, threshold: str = "high"):
+        self.threshold = threshold
+        self.triggered_by: Optional[Dict] = None
+
+    @property
+    def cancelled(self) -> bool:
+        return self.triggered_by is not None
+
+    def qualifies(self, level: str, severity: str) -> bool:
+        """Return True if a finding at level and severity should stop the scan."""
+        if level != "issue" or severity not in SEVERITIES:
+            return False
+        return SEVERITIES.index(severity) >= SEVERITIES.index(self.threshold)
+
+    def check(self, requirement: str, level: str, finding: Dict) -> None:
+        """Trip on finding if it qualifies and nothing has tripped yet."""
+        if self.triggered_by is None and self.qualifies(level, finding.get("severity", "")):
+            self.triggered_by = {"requirement": requirement, **finding}
+
+
+class ScanContext:
+    """Per-scan state shared by every check.
+
+    Holds the single file inventory, the read-once content cache and the
+    file analyzer. Each file is analyzed at most once, however many checks
+    look at it, and results are looked up in inventory order so serial and
+    parallel scans produce identical reports. With a blob store, a file
+    whose content was already analyzed - in this project or any other -
+    reuses that analysis. With a git revision, files are read from the
+    object database instead of the working tree; with an archive, the
+    inventory and every analysis come from one pass over its members
+    (see analyze_archive). Watch mode keeps one context for the whole
+    session and refreshes it with the files that changed (see refresh).
+    """
+
+    # Project files the checks read directly, kept as an archive streams past
+    PROJECT_FILES = (".env", ".gitignore")
+
+    def __init__(
+        self,
+        project_path: Path,
+        requirements: List[str],
+        cache: Optional[ContentCache] = None,
+        inventory: Optional[FileInventory] = None,
+        manifest: Optional[ScanManifest] = None,
+        policy: Optional[SkipPolicy] = None,
+        max_matches: int = DEFAULT_MAX_MATCHES,
+        blobs: Optional[BlobStore] = None,
+        revision: Optional[GitRevision] = None,
+        archive: Optional[ProjectArchive] = None,
+        fail_fast: Optional[FailFast] = None
+    ):
+        self.project_path = project_path
+        self.requirements = [normalize_requirement(r) for r in requirements]
+        self.inventory = inventory or build_file_inventory(project_path)
+        self.cache = cache or ContentCache()
+        self.analyzer = FileAnalyzer(requirements, policy, max_matches)
+        self.engines = self.analyzer.engines
+        self.manifest = manifest
+        self.blobs = blobs
+        self.revision = revision
+        self.archive = archive
+        self.fail_fast = fail_fast
+        self._rules = {rule["id"]: rule for rule in active_rules(requirements)}
+        self._archive_files: Dict[str, bytes] = {}
+        self._analysis: Dict[Path, Dict] = {}
+        # Requirements whose findings may trip fail-fast as analyses land:
+        # the ones being checked, or all of them while files are analyzed
+        # up front
+        self.active_requirements: Set[str] = set()
+        # Files a check asked for after fail-fast tripped, never analyzed
+        self.unanalyzed = 0
+
+    def _fingerprint(self, path: Path) -> Tuple[str, int, int]:
+        return (
+            str(path.relative_to(self.project_path)),
+            self.inventory.sizes.get(path, 0),
+            self.inventory.mtimes.get(path, 0),
+        )
+
+    @property
+    def cancelled(self) -> bool:
+        """True once a fail-fast scan has found what it was looking for."""
+        return self.fail_fast is not None and self.fail_fast.cancelled
+
+    def _analysis_findings(self, path: Path, analysis: Dict) -> Iterator[Tuple[str, str, Dict]]:
+        """Yield (requirement, level, finding) for the first hit of each rule in an analysis."""
+        rel_path = str(path.relative_to(self.project_path))
+        for rule_id in analysis["rules"]:
+            rule = self._rules[rule_id]
+            finding = {"file": rel_path, "issue": rule["message"], "severity": rule["severity"]}
+            locations = analysis.get("locations", {}).get(rule_id)
+            if locations:
+                finding["line"], finding["column"] = locations[0]
+            yield rule["requirement"], rule["level"], finding
+        for level, finding in secret_findings(rel_path, analysis):
+            yield "HIPAA", level, finding
+        for issue in analysis.get("accessibility", {}).get("issues", []):
+            yield "ADA/WCAG", "issue", {"file": rel_path, **issue}
+
+    def _remember(self, path: Path, analysis: Dict) -> Dict:
+        self._analysis[path] = analysis
+        # Checking analyses as they land lets parallel and archive scans
+        # stop before the checks that would report the issue have run
+        if self.fail_fast is not None and not self.fail_fast.cancelled:
+            for requirement, level, finding in self._analysis_findings(path, analysis):
+                if requirement in self.active_requirements:
+                    self.fail_fast.check(requirement, level, finding)
+        return analysis
+
+    def _store(self, path: Path, digest: Optional[str], analysis: Dict, reused: bool = False) -> Dict:
+        self._remember(path, analysis)
+        if digest is None:
+            return analysis
+        fingerprint = self._fingerprint(path)
+        if self.manifest is not None and not self.manifest.seen(fingerprint[0]):
+            self.manifest.record(*fingerprint, digest, analysis)
+        if self.blobs is not None and not reused:
+            self.blobs.put(digest, self.inventory.buckets_for(path), analysis)
+        return analysis
+
+    def _reuse(self, path: Path, digest: str) -> Optional[Dict]:
+        """Look a file's content up in the manifest, then the blob store."""
+        if self.manifest is not None:
+            cached = self.manifest.lookup_digest(*self._fingerprint(path), digest)
+            if cached is not None:
+                return cached
+        if self.blobs is not None:
+            return self.blobs.get(digest, self.inventory.buckets_for(path))
+        return None
+
+    def analysis(self, path: Path) -> Dict:
+        """Return the per-file analysis for path, computing it if needed."""
+        if path in self._analysis:
+            return self._analysis[path]
+
+        if self.cancelled:
+            # Fail-fast tripped: report what was analyzed, start nothing new
+            self.unanalyzed += 1
+            return {"rules": []}
+
+        if self.archive is not None:
+            # Not analyzed by analyze_archive: in a bucket no check wants
+            return {"rules": []}
+
+        if self.revision is not None:
+            reuse = None
+            if self.blobs is not None:
+                reuse = lambda key: self.blobs.get(key, self.inventory.buckets_for(path))
+            digest, analysis, reused = analyze_blob(
+                path,
+                self.inventory.sizes[path],
+                self.inventory.blob_ids[path],
+                self.inventory.buckets_for(path),
+                self.analyzer,
+                self.revision,
+                stream_bytes=self.cache.stream_bytes,
+                reuse=reuse
+            )
+            return self._store(path, digest, analysis, reused)
+
+        if self.manifest is not None:
+            cached = self.manifest.lookup(*self._fingerprint(path))
+            if cached is not None:
+                return self._remember(path, cached)
+
+        reusable = self.manifest is not None or self.blobs is not None
+        digest, analysis, reused = analyze_path(
+            path,
+            self.inventory.buckets_for(path),
+            self.analyzer,
+            self.cache,
+            with_digest=reusable,
+            reuse=(lambda digest: self._reuse(path, digest)) if reusable else None
+        )
+        return self._store(path, digest, analysis, reused)
+
+    def project_file(self, rel_path: str) -> Optional[bytes]:
+        """Return the content of a project file (from the revision, if any).
+
+        Returns:
+            File bytes, or None if the file does not exist
+        """
+        if self.revision is not None:
+            return self.revision.read(rel_path)
+        if self.archive is not None:
+            return self._archive_files.get(rel_path)
         try:
-            content = f.read_text(errors='ignore').lower()
-            if any(proc in content for proc in payment_processors):
-                uses_payment = True
-                break
-        except Exception:
-            continue
+            return (self.project_path / rel_path).read_bytes()
+        except OSError:
+            return None
+
+    def refresh(self, rel_paths: List[str], use_gitignore: bool = True) -> None:
+        """Bring a working-tree scan's state up to date after files changed.
+
+        Keeps the inventory, analyses and rule engines of the last scan:
+        the changed paths are looked up again (a deleted, excluded or
+        ignored file leaves the inventory, a new one takes its place in
+        walk order), and the analyses and cached content of those whose
+        size, mtime or buckets moved are dropped, so the next checks
+        re-analyze only them. A changed directory or ignore file re-walks
+        the tree instead, still re-analyzing only the files that changed.
+
+        Args:
+            rel_paths: Changed project-relative paths, files or directories
+            use_gitignore: As for build_file_inventory
+        """
+        inventory = self.inventory
+        rewalk = any(self._covers_tree(rel_path) for rel_path in rel_paths)
+        if rewalk:
+            fresh = build_file_inventory(self.project_path, use_gitignore=use_gitignore)
+            affected = set(inventory.sizes) | set(fresh.sizes)
+        else:
+            fresh = build_file_inventory(self.project_path, rel_paths, use_gitignore)
+            affected = {self.project_path / rel_path for rel_path in rel_paths}
+
+        for path in affected:
+            before = (inventory.sizes.get(path), inventory.mtimes.get(path), inventory.buckets_for(path))
+            after = (fresh.sizes.get(path), fresh.mtimes.get(path), fresh.buckets_for(path))
+            if before == after:
+                continue
+            self._analysis.pop(path, None)
+            self.cache.discard(path)
+            if self.manifest is not None:
+                self.manifest.forget(str(path.relative_to(self.project_path)))
+            if not rewalk:
+                inventory.discard(path)
+                for bucket in after[2]:
+                    inventory.insert(path, bucket, after[0], after[1])
+        if rewalk:
+            self.inventory = fresh
+
+    def _covers_tree(self, rel_path: str) -> bool:
+        """True if a change at rel_path can add or drop more files than itself."""
+        path = self.project_path / rel_path
+        if rel_path == "." or path.name == IGNORE_FILE or path.is_dir():
+            return True
+        if path in self.inventory.sizes:
+            return False
+        # A deleted or renamed directory
+        prefix = str(path) + os.sep
+        return any(str(f).startswith(prefix) for f in self.inventory.sizes)
+
+    def analyze_all(self, workers: int = 1) -> None:
+        """Analyze every relevant file up front, optionally in parallel.
+
+        With a manifest, files whose size and mtime are unchanged since the
+        last scan reuse their stored analysis without being read at all.
+        A revision is always analyzed in-process, through its one cat-file
+        reader.
+
+        Args:
+            workers: Number of worker processes (1 analyzes in-process)
+        """
+        files = []
+        for f in self.inventory.all_files():
+            if f in self._analysis or not self.analyzer.wants(self.inventory.buckets_for(f)):
+                continue
+            if self.manifest is not None:
+                cached = self.manifest.lookup(*self._fingerprint(f))
+                if cached is not None:
+                    self._remember(f, cached)
+                    continue
+            files.append(f)
+
+        if workers <= 1 or len(files) < 2 or self.revision is not None:
+            for f in files:
+                if self.cancelled:
+                    break
+                self.analysis(f)
+            return
+
+        # Aim for several batches per worker so stragglers even out
+        total_bytes = sum(self.inventory.sizes.get(f, 0) for f in files)
+        target = max(64 * 1024, min(BATCH_BYTES, total_bytes // (workers * 4)))
+        batches = plan_batches(files, self.inventory.sizes, target)
+        payloads = [[(str(f), self.inventory.buckets_for(f)) for f in batch] for batch in batches]
+        # Lets fail-fast stop workers between files, not just between batches
+        cancel_event = multiprocessing.Event() if self.fail_fast is not None else None
+
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(
+                self.requirements,
+                _rule_dirs or [],
+                self.analyzer.policy,
+                self.analyzer.max_matches,
+                self.cache.mmap_bytes,
+                self.cache.stream_bytes,
+                (self.blobs.path, self.blobs.rules_version) if self.blobs is not None else None,
+                cancel_event
+            )
+        ) as pool:
+            futures = {pool.submit(_analyze_batch, payload): batch for batch, payload in zip(batches, payloads)}
+            for future in as_completed(futures):
+                # A worker that saw the cancel event returns a short batch
+                for f, (digest, analysis, reused) in zip(futures[future], future.result()):
+                    if reused:
+                        self.blobs.touch(digest, self.inventory.buckets_for(f))
+                    self._store(f, digest, analysis, reused)
+                if self.cancelled:
+                    cancel_event.set()
+                    for pending in futures:
+                        pending.cancel()
+                    break
+
+    def analyze_archive(self) -> None:
+        """Inventory and analyze an archive's members in one forward pass.
+
+        Members are bucketed, skip-checked and matched as they stream out
+        of the archive, so a compressed tarball is decompressed once and
+        nothing touches the disk. If every member sits under one top-level
+        directory (the usual 'project-1.2.0/' of a release tarball), that
+        directory is treated as the project root. The walker's directory
+        exclusions apply below the root. After a fail-fast issue, the rest
+        of the archive is only listed, not analyzed.
+
+        Raises:
+            ValueError: If the archive is truncated or corrupt
+        """
+        matchers = {name: _compile_patterns(patterns) for name, patterns in FileInventory.BUCKETS.items()}
+        members = []
+        tops = set()
+        nested_only = True
+        kept = {}
+        stop = False
+
+        try:
+            for name, size, stream in self.archive.members():
+                parts = name.split("/")
+                if len(parts) > 1:
+                    tops.add(parts[0])
+                else:
+                    nested_only = False
+                if any(part in EXCLUDE_DIRS for part in parts[1:-1]):
+                    continue
+                if parts[-1] in self.PROJECT_FILES and len(parts) <= 2:
+                    kept[name] = stream.read()
+                    stream = io.BytesIO(kept[name])
+                buckets = [bucket for bucket, matcher in matchers.items() if matcher.match(parts[-1])]
+                if not buckets:
+                    continue
+                result = None
+                if self.analyzer.wants(buckets) and not stop:
+                    reuse = None
+                    if self.blobs is not None:
+                        reuse = lambda digest, buckets=buckets: self.blobs.get(digest, buckets)
+                    result = analyze_stream(
+                        self.project_path / name, size, stream, buckets, self.analyzer,
+                        stream_bytes=self.cache.stream_bytes, reuse=reuse
+                    )
+                    # Fail-fast trips once the root is known, on the stored analyses
+                    stop = self.fail_fast is not None and any(
+                        self.fail_fast.qualifies(level, finding.get("severity", ""))
+                        for requirement, level, finding in self._analysis_findings(self.project_path / name, result[1])
+                        if requirement in self.active_requirements
+                    )
+                members.append((parts, size, buckets, result))
+        except ARCHIVE_ERRORS as e:
+            raise ValueError(f"Could not read archive {self.archive.path}: {e}")
+
+        root = 1 if nested_only and len(tops) == 1 else 0
+        self._archive_files = {
+            "/".join(name.split("/")[root:]): content
+            for name, content in kept.items() if name.count("/") == root
+        }
+
+        # Sort by path components to list files in walk_project's order
+        for parts, size, buckets, result in sorted(members, key=lambda member: member[0][root:]):
+            rel_parts = parts[root:]
+            if len(rel_parts) > 1 and rel_parts[0] in EXCLUDE_DIRS:
+                continue
+            path = self.project_path.joinpath(*rel_parts)
+            for bucket in buckets:
+                self.inventory.add(path, bucket, size)
+            if result is not None:
+                self._store(path, *result)
+
+    def cancelled_work(self) -> Dict:
+        """Summarize the work a tripped fail-fast scan left undone.
+
+        Returns:
+            Dict with the finding that stopped the scan and the number and
+            size of the files that were never analyzed
+        """
+        files = [
+            f for f in self.inventory.all_files()
+            if f not in self._analysis and self.analyzer.wants(self.inventory.buckets_for(f))
+        ]
+        return {
+            "threshold": self.fail_fast.threshold,
+            "triggered_by": self.fail_fast.triggered_by,
+            "files_analyzed": len(self._analysis),
+            "files_skipped": len(files),
+            "bytes_skipped": sum(self.inventory.sizes.get(f, 0) for f in files),
+        }
+
+    def skipped(self) -> Dict:
+        """Summarize the files the skip policy left out of this scan.
+
+        Returns:
+            Dict with per-file entries, per-reason totals and overall totals
+        """
+        files = []
+        reasons: Dict[str, Dict[str, int]] = {}
+        for f in self.inventory.all_files():
+            reason = self._analysis.get(f, {}).get("skipped")
+            if not reason:
+                continue
+            size = self.inventory.sizes.get(f, 0)
+            files.append({
+                "file": str(f.relative_to(self.project_path)),
+                "reason": reason,
+                "bytes": size
+            })
+            totals = reasons.setdefault(reason, {"files": 0, "bytes": 0})
+            totals["files"] += 1
+            totals["bytes"] += size
+
+        return {
+            "total_files": len(files),
+            "total_bytes": sum(entry["bytes"] for entry in files),
+            "reasons": {reason: reasons[reason] for reason in sorted(reasons)},
+            "files": files,
+        }
+
+
+class FindingSink:
+    """Issues and warnings of one check, either kept or streamed.
+
+    Without emit, findings are collected into lists for the report. With
+    emit, each finding is handed to it as a record the moment it is
+    produced and only counts are kept, so memory stays flat however many
+    findings a scan turns up.
+    """
+
+    def __init__(
+        self,
+        requirement: str,
+        emit: Optional[Callable[[Dict], None]] = None,
+        fail_fast: Optional[FailFast] = None
+    ):
+        self.requirement = requirement
+        self.emit = emit
+        self.fail_fast = fail_fast
+        self.issues: List[Dict] = []
+        self.warnings: List[Dict] = []
+        self.issue_count = 0
+        self.warning_count = 0
+
+    def add(self, level: str, finding: Dict) -> None:
+        """Record a finding at level 'issue' or 'warning'."""
+        if self.fail_fast is not None:
+            self.fail_fast.check(self.requirement, level, finding)
+        if level == "issue":
+            self.issue_count += 1
+        else:
+            self.warning_count += 1
+
+        if self.emit is not None:
+            self.emit({"type": "finding", "requirement": self.requirement, "level": level, **finding})
+        elif level == "issue":
+            self.issues.append(finding)
+        else:
+            self.warnings.append(finding)
+
+    def report(self, recommendations: List[str]) -> Dict:
+        """Build the check result; streamed checks carry counts, not lists."""
+        result = {
+            "requirement": self.requirement,
+            "status": "fail" if self.issue_count else ("warning" if self.warning_count else "pass"),
+        }
+        if self.emit is not None:
+            result["issue_count"] = self.issue_count
+            result["warning_count"] = self.warning_count
+        else:
+            result["issues"] = self.issues
+            result["warnings"] = self.warnings
+        result["recommendations"] = recommendations
+        return result
+
+
+def pack_recommendations(requirement: str, sink: FindingSink) -> List[str]:
+    """Return the rule pack's recommendations if the check warrants them.
+
+    Packs with recommend_on 'issues' only recommend when issues were found;
+    otherwise any issue or warning triggers them.
+    """
+    pack = RULE_PACKS.get(requirement)
+    if not pack:
+        return []
+    if pack["recommend_on"] == "issues":
+        triggered = sink.issue_count
+    else:
+        triggered = sink.issue_count + sink.warning_count
+    return list(pack["recommendations"]) if triggered else []
+
+
+def collect_rule_findings(context: ScanContext, requirement: str, sink: FindingSink) -> None:
+    """Turn rule engine hits for one requirement into issues and warnings.
+
+    File-scoped hits are reported per file in rule order, one finding per
+    recorded match location; project-scoped rules are reported once,
+    against "general", after all file hits.
+    """
+    project_hits = set()
+
+    rules = {rule["id"]: rule for rule in COMPLIANCE_RULES}
+
+    for bucket in context.engines:
+        for f in context.inventory.bucket(bucket):
+            rel_path = str(f.relative_to(context.project_path))
+            analysis = context.analysis(f)
+            for rule_id in analysis["rules"]:
+                rule = rules[rule_id]
+                if rule["bucket"] != bucket or rule["requirement"] != requirement:
+                    continue
+                if rule.get("scope") == "project":
+                    project_hits.add(rule["id"])
+                    continue
+                for line, column in analysis.get("locations", {}).get(rule_id, []):
+                    sink.add(rule["level"], {
+                        "file": rel_path,
+                        "issue": rule["message"],
+                        "severity": rule["severity"],
+                        "line": line,
+                        "column": column
+                    })
+
+    for rule in COMPLIANCE_RULES:
+        if rule["id"] in project_hits:
+            sink.add(rule["level"], {
+                "file": "general",
+                "issue": rule["message"],
+                "severity": rule["severity"]
+            })
+
+
+# Level, severity and message per secret_detector kind
+SECRET_FINDINGS = {
+    "aws-access-key": ("issue", "high", "Possible AWS access key"),
+    "stripe-live-key": ("issue", "high", "Possible Stripe live secret key"),
+    "jwt": ("warning", "medium", "Possible hardcoded JSON Web Token"),
+    GENERIC_KIND: ("warning", "medium", "High-entropy string - possible hardcoded secret"),
+}
+
+
+def secret_findings(rel_path: str, analysis: Dict) -> Iterator[Tuple[str, Dict]]:
+    """Yield (level, finding) for each high-entropy token in a file analysis."""
+    for secret in analysis.get("secrets", []):
+        level, severity, message = SECRET_FINDINGS[secret["kind"]]
+        yield level, {
+            "file": rel_path,
+            "issue": message,
+            "severity": severity,
+            "line": secret["line"],
+            "column": secret["column"],
+            "entropy": secret["entropy"],
+        }
+
+
+def check_hipaa_compliance(
+    project_path: Path,
+    context: Optional[ScanContext] = None,
+    emit: Optional[Callable[[Dict], None]] = None
+) -> Dict:
+    """Check for common HIPAA violations in code.
+
+    Args:
+        project_path: Path to the project
+        context: Shared scan context (a HIPAA-only one is built if omitted)
+        emit: Stream each finding to this callback instead of listing it
+
+    Returns:
+        Dict with HIPAA compliance findings
+    """
+    context = context or ScanContext(project_path, ["HIPAA"])
+    sink = FindingSink("HIPAA", emit, context.fail_fast)
+
+    # PHI logging and hardcoded secret rules, matched in one pass per file
+    collect_rule_findings(context, "HIPAA", sink)
+
+    # Raw keys and tokens, found by entropy in the same pass
+    for f in context.inventory.code:
+        for level, finding in secret_findings(str(f.relative_to(project_path)), context.analysis(f)):
+            sink.add(level, finding)
+
+    # Check for .env file with secrets
+    if context.project_file(".env") is not None:
+        sink.add("warning", {
+            "file": ".env",
+            "issue": "Environment file exists - ensure not committed to repository",
+            "severity": "medium"
+        })
 
-    if uses_payment:
-        warnings.append({
-            "file": "general",
-            "issue": "Payment processing detected - verify hosted/tokenized integration",
-            "severity": "info"
+    # Check gitignore for .env
+    gitignore = context.project_file(".gitignore")
+    if gitignore is not None and b".env" not in gitignore:
+        sink.add("issue", {
+            "file": ".gitignore",
+            "issue": ".env not in .gitignore - secrets may be committed",
+            "severity": "high"
         })
 
-    return {
-        "requirement": "PCI-DSS",
-        "status": "fail" if issues else ("warning" if warnings else "pass"),
-        "issues": issues,
-        "warnings": warnings,
-        "recommendations": [
-            "NEVER store CVV/CVC - this is explicitly prohibited",
-            "Use tokenization from payment processor",
-            "Ensure card numbers never touch your servers",
-            "Complete SAQ A if using hosted payment pages",
-        ] if issues else []
-    }
+    return sink.report(pack_recommendations("HIPAA", sink))
 
 
-def check_accessibility(project_path: Path) -> Dict:
-    """Check for basic accessibility issues in HTML/templates.
+def check_pci_compliance(
+    project_path: Path,
+    context: Optional[ScanContext] = None,
+    emit: Optional[Callable[[Dict], None]] = None
+) -> Dict:
+    """Check for common PCI-DSS violations.
 
     Args:
         project_path: Path to the project
+        context: Shared scan context (a PCI-only one is built if omitted)
+        emit: Stream each finding to this callback instead of listing it
 
     Returns:
-        Dict with accessibility findings
+        Dict with PCI-DSS compliance findings
     """
-    issues = []
-    warnings = []
+    # Card data handling and payment processor rules
+    return check_rule_pack(project_path, "PCI-DSS", context, emit)
 
-    html_files = get_files(project_path, HTML_PATTERNS)
 
-    for f in html_files:
-        try:
-            content = f.read_text(errors='ignore')
-
-            # Check for images without alt
-            img_tags = re.findall(r'<img[^>]*>', content, re.IGNORECASE)
-            for img in img_tags:
-                if 'alt=' not in img.lower():
-                    issues.append({
-                        "file": str(f.relative_to(project_path)),
-                        "issue": "Image without alt attribute",
-                        "severity": "medium"
-                    })
+def check_rule_pack(
+    project_path: Path,
+    requirement: str,
+    context: Optional[ScanContext] = None,
+    emit: Optional[Callable[[Dict], None]] = None
+) -> Dict:
+    """Check a requirement defined entirely by its rule pack (e.g. CCPA).
 
-            # Check for inputs without labels
-            input_ids = re.findall(r'<input[^>]*id=["\']([^"\']+)["\']', content, re.IGNORECASE)
-            label_fors = re.findall(r'<label[^>]*for=["\']([^"\']+)["\']', content, re.IGNORECASE)
+    Args:
+        project_path: Path to the project
+        requirement: Canonical requirement name of a loaded rule pack
+        context: Shared scan context (built for requirement if omitted)
+        emit: Stream each finding to this callback instead of listing it
 
-            for input_id in input_ids:
-                if input_id not in label_fors:
-                    warnings.append({
-                        "file": str(f.relative_to(project_path)),
-                        "issue": f"Input '{input_id}' may lack associated label",
-                        "severity": "low"
-                    })
+    Returns:
+        Dict with the requirement's compliance findings
+    """
+    context = context or ScanContext(project_path, [requirement])
+    sink = FindingSink(requirement, emit, context.fail_fast)
 
-            # Check for onclick without keyboard alternative
-            if 'onclick=' in content.lower() and 'onkeypress=' not in content.lower():
-                warnings.append({
-                    "file": str(f.relative_to(project_path)),
-                    "issue": "onclick without keyboard handler - may not be keyboard accessible",
-                    "severity": "medium"
-                })
+    collect_rule_findings(context, requirement, sink)
 
-        except Exception:
-            continue
+    return sink.report(pack_recommendations(requirement, sink))
 
-    return {
-        "requirement": "ADA/WCAG",
-        "status": "fail" if issues else ("warning" if warnings else "pass"),
-        "issues": issues,
-        "warnings": warnings,
-        "recommendations": [
-            "Add alt text to all images",
-            "Ensure all form inputs have associated labels",
-            "Test keyboard navigation",
-            "Run automated accessibility tools (axe, Lighthouse)",
-        ] if issues or warnings else []
-    }
 
+def check_accessibility(
+    project_path: Path,
+    context: Optional[ScanContext] = None,
+    emit: Optional[Callable[[Dict], None]] = None
+) -> Dict:
+    """Check for basic accessibility issues in HTML/templates.
+
+    Args:
+        project_path: Path to the project
+        context: Shared scan context (built on demand if omitted)
+        emit: Stream each finding to this callback instead of listing it
 
-def scan_for_compliance_issues(project_path: Path, requirements: List[str]) -> Dict:
+    Returns:
+        Dict with accessibility findings
+    """
+    context = context or ScanContext(project_path, ["ADA"])
+    sink = FindingSink("ADA/WCAG", emit, context.fail_fast)
+
+    for f in context.inventory.html:
+        rel_path = str(f.relative_to(project_path))
+        findings = context.analysis(f).get("accessibility", {})
+        for issue in findings.get("issues", []):
+            sink.add("issue", {"file": rel_path, **issue})
+        for warning in findings.get("warnings", []):
+            sink.add("warning", {"file": rel_path, **warning})
+
+    return sink.report([
+        "Add alt text to all images",
+        "Ensure all form inputs have associated labels",
+        "Test keyboard navigation",
+        "Run automated accessibility tools (axe, Lighthouse)",
+    ] if sink.issue_count or sink.warning_count else [])
+
+
+def scan_for_compliance_issues(
+    project_path: Path,
+    requirements: List[str],
+    cache: Optional[ContentCache] = None,
+    workers: int = 1,
+    manifest: Optional[ScanManifest] = None,
+    since: Optional[str] = None,
+    policy: Optional[SkipPolicy] = None,
+    emit: Optional[Callable[[Dict], None]] = None,
+    rule_dirs: Optional[List[Path]] = None,
+    max_matches: int = DEFAULT_MAX_MATCHES,
+    use_gitignore: bool = True,
+    blobs: Optional[BlobStore] = None,
+    rev: Optional[str] = None,
+    fail_fast: Optional[str] = None,
+    context: Optional[ScanContext] = None
+) -> Dict:
     """Run compliance scans based on requirements.
 
     Args:
         project_path: Path to the project
         requirements: List of compliance requirements to check
+        cache: Content cache shared by all checks (created if omitted)
+        workers: Number of processes to analyze files with (1 = serial)
+        manifest: Incremental scan manifest; unchanged files reuse their
+            stored analysis and the manifest is saved after the scan
+        since: Only scan files changed or added since this git revision
+        policy: Which binary, minified, generated or oversized files to
+            skip (default: all of them, see SkipPolicy)
+        emit: Stream each finding and skipped file to this callback as a
+            record when it is produced; the returned dict then holds
+            counts instead of finding and skipped-file lists
+        rule_dirs: Extra rule pack directories to load alongside the
+            built-in packs in references/compliance/rules
+        max_matches: Match locations reported per rule per file (0 = all)
+        use_gitignore: Prune directories and files the project's
+            .gitignore files ignore
+        blobs: Content-addressed analysis store shared across projects;
+            files whose content it holds are not re-matched, and it is
+            saved after the scan
+        rev: Scan the project as of this git revision, read from the
+            object database instead of the working tree (analyzed
+            in-process; since and manifest do not apply)
+        fail_fast: Severity threshold ('low' to 'critical'); the first
+            issue at or above it stops the scan (see FailFast), fails it,
+            and results gain a 'fail_fast' summary of the skipped work
+        context: State kept from an earlier scan of the project's working
+            tree for the same requirements, brought up to date with
+            ScanContext.refresh; its inventory, analyses, content cache,
+            manifest and blob store are reused instead of walking and
+            analyzing the project again (the manifest is left for the
+            caller to save; since, rev, manifest and fail_fast do not apply)
+
+    project_path may also be a tar or zip archive of a project, which is
+    scanned in one pass over its members without extracting it (since,
+    manifest and rev do not apply).
+
+    Raises:
+        ValueError: If since or rev is given but git cannot list the
+            files, a rule pack cannot be loaded, or context is combined
+            with an archive, since, rev, manifest or fail_fast
 
     Returns:
         Dict with all compliance findings
@@ -282,20 +1958,100 @@ def scan_for_compliance_issues(project_path: Path, requirements: List[str]) -> D
         "findings": {}
     }
 
-    for req in requirements:
-        req_upper = req.upper()
-        results["checks_performed"].append(req_upper)
-
-        if req_upper == "HIPAA":
-            results["findings"]["HIPAA"] = check_hipaa_compliance(project_path)
-        elif req_upper == "PCI-DSS" or req_upper == "PCI":
-            results["findings"]["PCI-DSS"] = check_pci_compliance(project_path)
-        elif req_upper in ["ADA", "WCAG", "ACCESSIBILITY"]:
-            results["findings"]["ADA/WCAG"] = check_accessibility(project_path)
+    load_rules(rule_dirs)
+
+    # One walk, one read and one rule pass per file, shared by every check
+    revision = None
+    archive = None
+    if context is not None:
+        if is_archive(project_path) or since or rev or manifest is not None or fail_fast:
+            raise ValueError("A kept scan context cannot be combined with an archive, --since, --rev, "
+                             "an incremental manifest or --fail-fast")
+        blobs = context.blobs
+    elif is_archive(project_path):
+        if since or manifest is not None or rev:
+            raise ValueError("An archive scan cannot be combined with --since, --rev or an incremental manifest")
+        archive = ProjectArchive(project_path)
+        inventory = FileInventory(project_path)
+    elif rev:
+        if since or manifest is not None:
+            raise ValueError("A revision scan cannot be combined with --since or an incremental manifest")
+        revision = GitRevision(project_path, rev)
+        results["revision"] = rev
+        inventory = build_revision_inventory(project_path, revision)
+    else:
+        rel_paths = git_changed_paths(project_path, since) if since else None
+        inventory = build_file_inventory(project_path, rel_paths, use_gitignore)
+
+    gate = FailFast(fail_fast) if fail_fast else None
+    requirements_skipped: List[str] = []
+    requirements_partial: List[str] = []
+    if context is None:
+        context = ScanContext(
+            project_path, requirements, cache=cache, inventory=inventory, manifest=manifest, policy=policy,
+            max_matches=max_matches, blobs=blobs, revision=revision, archive=archive, fail_fast=gate
+        )
+    try:
+        # Serial scans analyze each file when a check first asks for it, so
+        # streamed findings go out as the scan progresses
+        if archive is not None or workers > 1:
+            # Every requirement's findings count while analyzing up front
+            context.active_requirements.update(context.requirements)
+        if archive is not None:
+            context.analyze_archive()
+        elif workers > 1:
+            context.analyze_all(workers)
+
+        for req in requirements:
+            req_upper = req.upper()
+            requirement = normalize_requirement(req)
+            # After fail-fast trips, only the requirement that tripped it is
+            # still reported, so the report shows the issue that failed the gate
+            if context.cancelled and requirement != gate.triggered_by["requirement"]:
+                requirements_skipped.append(req_upper)
+                continue
+            results["checks_performed"].append(req_upper)
+            context.active_requirements.add(requirement)
+            unanalyzed = context.unanalyzed
+
+            if requirement == "HIPAA":
+                results["findings"]["HIPAA"] = check_hipaa_compliance(project_path, context, emit)
+            elif requirement == "PCI-DSS":
+                results["findings"]["PCI-DSS"] = check_pci_compliance(project_path, context, emit)
+            elif requirement == "ADA/WCAG":
+                results["findings"]["ADA/WCAG"] = check_accessibility(project_path, context, emit)
+            elif requirement in RULE_PACKS:
+                results["findings"][requirement] = check_rule_pack(project_path, requirement, context, emit)
+
+            # Files left unanalyzed by fail-fast make this check's findings incomplete
+            if context.unanalyzed > unanalyzed and requirement in results["findings"]:
+                results["findings"][requirement]["partial"] = True
+                requirements_partial.append(req_upper)
+
+        results["skipped"] = context.skipped()
+        if emit is not None:
+            for entry in results["skipped"].pop("files"):
+                emit({"type": "skipped", **entry})
+    finally:
+        if revision is not None:
+            revision.close()
+
+    # A cancelled scan saw only part of the project; keep the last full manifest
+    if manifest is not None and not context.cancelled:
+        manifest.save()
+    if blobs is not None:
+        blobs.save()
+
+    if gate is not None:
+        results["fail_fast"] = {
+            **context.cancelled_work(),
+            "requirements_skipped": requirements_skipped,
+            "requirements_partial": requirements_partial,
+        }
 
     # Determine overall status
     statuses = [f["status"] for f in results["findings"].values()]
-    if "fail" in statuses:
+    if "fail" in statuses or context.cancelled:
         results["overall_status"] = "fail"
     elif "warning" in statuses:
         results["overall_status"] = "warning"
@@ -303,6 +2059,177 @@ def scan_for_compliance_issues(project_path: Path, requirements: List[str]) -> D
     return results
 
 
+def flatten_findings(results: Dict) -> List[Dict]:
+    """List every finding of a scan, tagged with its requirement and level."""
+    findings = []
+    for requirement, check in results["findings"].items():
+        for level, key in (("issue", "issues"), ("warning", "warnings")):
+            for finding in check.get(key, []):
+                findings.append({"requirement": requirement, "level": level, **finding})
+    return findings
+
+
+def diff_findings(previous: List[Dict], current: List[Dict]) -> Tuple[List[Dict], List[Dict]]:
+    """Return the findings that appeared and the ones resolved between two scans.
+
+    Findings are matched on everything but line and column, so an edit
+    that only moves a finding does not report it. When the number of
+    occurrences of a finding changes, occurrences at locations the other
+    scan did not have are reported first.
+    """
+    def group(findings: List[Dict]) -> Dict[str, List[Dict]]:
+        groups: Dict[str, List[Dict]] = {}
+        for finding in findings:
+            identity = {k: v for k, v in finding.items() if k not in ("line", "column")}
+            groups.setdefault(json.dumps(identity, sort_keys=True), []).append(finding)
+        return groups
+
+    def pick(items: List[Dict], others: List[Dict], count: int) -> List[Dict]:
+        seen = {(f.get("line"), f.get("column")) for f in others}
+        moved = [f for f in items if (f.get("line"), f.get("column")) not in seen]
+        return (moved + [f for f in items if f not in moved])[:count]
+
+    before, after = group(previous), group(current)
+    new, resolved = [], []
+    for identity in list(after) + [i for i in before if i not in after]:
+        old, cur = before.get(identity, []), after.get(identity, [])
+        if len(cur) > len(old):
+            new.extend(pick(cur, old, len(cur) - len(old)))
+        elif len(old) > len(cur):
+            resolved.extend(pick(old, cur, len(old) - len(cur)))
+    return new, resolved
+
+
+# Files outside the scan buckets whose changes can change the findings
+WATCHED_FILES = {IGNORE_FILE, ".env"}
+
+
+def watch_project(
+    project_path: Path,
+    scan: Callable[[Optional[List[str]]], Dict],
+    output: str = "text",
+    use_gitignore: bool = True,
+    debounce: float = DEFAULT_DEBOUNCE,
+    polling: bool = False
+) -> None:
+    """Scan a project, then re-scan it whenever its files change.
+
+    Prints the first scan as a full report, then one report per burst of
+    changes listing only the findings that appeared or were resolved.
+    Changes are picked up with inotify where available (one watch per
+    directory the walk visits) and by polling file snapshots otherwise;
+    excluded and ignored paths never trigger a re-scan. Runs until
+    interrupted.
+
+    Args:
+        project_path: Project directory to watch
+        scan: Runs one scan and returns its results; called with None for
+            the first scan and with the changed project-relative paths for
+            each re-scan, which should re-analyze only those
+        output: 'text', 'json' or 'jsonl'
+        use_gitignore: Leave ignored paths unwatched
+        debounce: Seconds the tree must be quiet before re-scanning
+        polling: Poll even where inotify is available
+    """
+    ignore = project_ignore(project_path) if use_gitignore else None
+    matcher = _compile_patterns([p for patterns in FileInventory.BUCKETS.values() for p in patterns])
+
+    def relevant(path: str, is_dir: bool) -> bool:
+        rel_path = os.path.relpath(path, project_path)
+        if rel_path == "." or rel_path.startswith(".."):
+            return rel_path == "."
+        parts = rel_path.split(os.sep)
+        if any(part in EXCLUDE_DIRS for part in (parts if is_dir else parts[:-1])):
+            return False
+        if ignore is not None and ignore.is_ignored("/".join(parts), is_dir):
+            return False
+        return is_dir or parts[-1] in WATCHED_FILES or bool(matcher.match(parts[-1]))
+
+    def snapshot() -> Dict[str, Tuple[int, int]]:
+        files = {}
+        for entry in walk_project(project_path, ignore=ignore):
+            if entry.name in WATCHED_FILES or matcher.match(entry.name):
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                files[entry.path] = (stat.st_size, stat.st_mtime_ns)
+        return files
+
+    results = scan(None)
+    if output == "jsonl":
+        for finding in flatten_findings(results):
+            emit_jsonl({"type": "finding", **finding})
+        emit_jsonl({"type": "summary", **results})
+    elif output == "json":
+        print(json.dumps(results, indent=2), flush=True)
+    else:
+        print(format_text_report(results), flush=True)
+    previous = flatten_findings(results)
+
+    directories = [str(project_path)] + [
+        entry.path for entry in walk_project(project_path, ignore=ignore, include_dirs=True)
+        if entry.is_dir(follow_symlinks=False)
+    ]
+    watcher = open_watcher(directories, snapshot, relevant, polling=polling)
+    mode = "inotify" if isinstance(watcher, InotifyWatcher) else "polling"
+    print(f"Watching {project_path} ({mode}, {len(directories)} directories) - Ctrl-C to stop", file=sys.stderr)
+
+    try:
+        while True:
+            changed = sorted(os.path.relpath(p, project_path) for p in wait_for_changes(watcher, debounce))
+            results = scan(changed)
+            current = flatten_findings(results)
+            new, resolved = diff_findings(previous, current)
+            previous = current
+
+            summary = {
+                "changed_files": changed,
+                "new": len(new),
+                "resolved": len(resolved),
+                "overall_status": results["overall_status"],
+            }
+            if output == "jsonl":
+                for finding in new:
+                    emit_jsonl({"type": "new_finding", **finding})
+                for finding in resolved:
+                    emit_jsonl({"type": "resolved_finding", **finding})
+                emit_jsonl({"type": "rescan", **summary})
+            elif output == "json":
+                print(json.dumps({**summary, "new": new, "resolved": resolved}, indent=2), flush=True)
+            else:
+                print(format_watch_report(summary, new, resolved), flush=True)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        watcher.close()
+
+
+def format_watch_report(summary: Dict, new: List[Dict], resolved: List[Dict]) -> str:
+    """Format one watch-mode re-scan as text."""
+    changed = summary["changed_files"]
+    lines = [
+        f"\n[{time.strftime('%H:%M:%S')}] {len(changed)} file(s) changed: "
+        f"{', '.join(changed[:5])}{' ...' if len(changed) > 5 else ''}",
+        f"  {len(new)} new, {len(resolved)} resolved - status {summary['overall_status'].upper()}",
+    ]
+    for sign, findings in (("+", new), ("-", resolved)):
+        for finding in findings:
+            lines.append(f"  {sign} [{finding['severity'].upper()}] {finding['requirement']} "
+                         f"{format_location(finding)}: {finding['issue']}")
+    return "\n".join(lines)
+
+
+def format_location(finding: Dict) -> str:
+    """Return 'file', 'file:line' or 'file:line:column' for a finding."""
+    location = finding["file"]
+    if "line" in finding:
+        location += f":{finding['line']}"
+        if "column" in finding:
+            location += f":{finding['column']}"
+    return location
+
+
 def format_text_report(results: Dict) -> str:
     """Format results as text report."""
     lines = [
@@ -314,37 +2241,110 @@ def format_text_report(results: Dict) -> str:
         f"Overall Status: {results['overall_status'].upper()}",
         ""
     ]
+    if results.get("revision"):
+        lines.insert(4, f"Revision: {results['revision']}")
 
     for req_name, finding in results["findings"].items():
         lines.append(f"\n{req_name}")
         lines.append("-" * 40)
         lines.append(f"Status: {finding['status'].upper()}")
+        if finding.get("partial"):
+            lines.append("Partial: fail-fast stopped the scan before every file was analyzed")
 
         if finding["issues"]:
             lines.append("\nIssues:")
             for issue in finding["issues"][:10]:
-                lines.append(f"  [{issue['severity'].upper()}] {issue['file']}: {issue['issue']}")
+                lines.append(f"  [{issue['severity'].upper()}] {format_location(issue)}: {issue['issue']}")
 
         if finding["warnings"]:
             lines.append("\nWarnings:")
             for warn in finding["warnings"][:5]:
-                lines.append(f"  [{warn['severity'].upper()}] {warn['file']}: {warn['issue']}")
+                lines.append(f"  [{warn['severity'].upper()}] {format_location(warn)}: {warn['issue']}")
 
         if finding["recommendations"]:
             lines.append("\nRecommendations:")
             for rec in finding["recommendations"]:
                 lines.append(f"  - {rec}")
 
+    fail_fast = results.get("fail_fast")
+    if fail_fast and fail_fast["triggered_by"]:
+        trigger = fail_fast["triggered_by"]
+        lines.append(f"\nFail-fast: stopped at the first {fail_fast['threshold']}+ issue")
+        lines.append("-" * 40)
+        lines.append(f"  [{trigger['severity'].upper()}] {trigger['requirement']} "
+                     f"{format_location(trigger)}: {trigger['issue']}")
+        lines.append(f"  Not analyzed: {fail_fast['files_skipped']} files ({fail_fast['bytes_skipped']:,} bytes)")
+        if fail_fast["requirements_partial"]:
+            lines.append(f"  Partly checked: {', '.join(fail_fast['requirements_partial'])}")
+        if fail_fast["requirements_skipped"]:
+            lines.append(f"  Not checked: {', '.join(fail_fast['requirements_skipped'])}")
+
+    skipped = results.get("skipped", {})
+    if skipped.get("total_files"):
+        lines.append(f"\nSkipped: {skipped['total_files']} files ({skipped['total_bytes']:,} bytes)")
+        lines.append("-" * 40)
+        for reason, totals in skipped["reasons"].items():
+            lines.append(f"  {reason}: {totals['files']} files ({totals['bytes']:,} bytes)")
+
     return "\n".join(lines)
 
 
+def emit_jsonl(record: Dict) -> None:
+    """Write one record as a JSON line and flush it straight away."""
+    sys.stdout.write(json.dumps(record, default=str) + "\n")
+    sys.stdout.flush()
+
+
 def main():
     parser = argparse.ArgumentParser(description="Compliance Scanner")
-    parser.add_argument("project_path", type=Path, help="Path to project directory")
+    parser.add_argument("project_path", type=Path,
+                       help="Path to project directory, or a .tar.gz/.zip archive of one")
     parser.add_argument("--requirements", nargs="+", default=["HIPAA", "PCI-DSS", "ADA"],
                        help="Compliance requirements to check")
-    parser.add_argument("--output", choices=["text", "json"], default="text",
-                       help="Output format")
+    parser.add_argument("--output", choices=["text", "json", "jsonl"], default="text",
+                       help="Output format (jsonl streams one finding per line, then a summary)")
+    parser.add_argument("--rules-dir", type=Path, action="append", default=[],
+                       help="Extra rule pack directory (YAML); may be repeated")
+    parser.add_argument("--max-matches", type=int, default=DEFAULT_MAX_MATCHES,
+                       help="Match locations reported per rule per file (0 = all)")
+    parser.add_argument("--cache-mb", type=int, default=DEFAULT_CACHE_BYTES // (1024 * 1024),
+                       help="Memory budget for the file content cache in MB")
+    parser.add_argument("--max-map-mb", type=int, default=DEFAULT_STREAM_BYTES // (1024 * 1024),
+                       help="Files larger than this are streamed in chunks instead of memory-mapped")
+    parser.add_argument("--skip", nargs="*", choices=SKIP_KINDS, default=SKIP_KINDS,
+                       help="Kinds of files to skip (default: all); pass --skip alone to scan everything")
+    parser.add_argument("--max-file-mb", type=int, default=DEFAULT_MAX_FILE_BYTES // (1024 * 1024),
+                       help="Files larger than this are skipped as oversized (0 = no limit)")
+    parser.add_argument("--no-gitignore", action="store_true",
+                       help="Also scan directories and files listed in .gitignore")
+    parser.add_argument("--fail-fast", nargs="?", const="high", choices=SEVERITIES, metavar="SEVERITY",
+                       help="Stop at the first issue at or above SEVERITY (default: high) and exit non-zero")
+    parser.add_argument("--workers", type=int, default=1,
+                       help="Number of worker processes for file analysis (default: 1)")
+    parser.add_argument("--since", metavar="REV",
+                       help="Only scan files changed or added since a git revision")
+    parser.add_argument("--rev", metavar="REF",
+                       help="Scan the project as of a git revision, read from the object database "
+                            "without a checkout")
+    parser.add_argument("--incremental", action="store_true",
+                       help="Reuse results for unchanged files from the last scan")
+    parser.add_argument("--manifest", type=Path,
+                       help="Manifest file for incremental scans "
+                            "(default: ~/.smb-growth-agent/scan_manifests/); implies --incremental")
+    parser.add_argument("--blob-store-mb", type=int, default=DEFAULT_BLOB_STORE_BYTES // (1024 * 1024),
+                       help="Size budget of the analysis store shared across projects "
+                            "(~/.smb-growth-agent/blob_store.sqlite)")
+    parser.add_argument("--no-blob-store", action="store_true",
+                       help="Do not reuse or record analyses in the shared store")
+    parser.add_argument("--watch", action="store_true",
+                       help="Keep running and re-scan on file changes, reporting new and resolved "
+                            "findings (implies --incremental)")
+    parser.add_argument("--debounce", type=float, default=DEFAULT_DEBOUNCE,
+                       help="Seconds of quiet after a change before re-scanning in --watch mode")
+    parser.add_argument("--poll", action="store_true",
+                       help="Poll for changes in --watch mode instead of using inotify")
+    parser.add_argument("--stats", action="store_true",
+                       help="Print scan statistics to stderr")
 
     args = parser.parse_args()
 
@@ -353,10 +2353,108 @@ def main():
     if not project_path.exists():
         print(f"Error: Project path does not exist: {project_path}")
         sys.exit(1)
+    if not project_path.is_dir() and not is_archive(project_path):
+        print(f"Error: Not a directory or a supported archive: {project_path}")
+        sys.exit(1)
+
+    try:
+        load_rules([d.resolve() for d in args.rules_dir])
+    except ValueError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
 
-    results = scan_for_compliance_issues(project_path, args.requirements)
+    policy = SkipPolicy(args.skip, max_file_bytes=args.max_file_mb * 1024 * 1024)
+
+    version = rules_version(args.requirements, policy, args.max_matches)
+    manifest = None
+    if args.incremental or args.manifest:
+        manifest_path = args.manifest or default_manifest_path(project_path)
+        manifest = ScanManifest.load(manifest_path, version)
+
+    blobs = None
+    if not args.no_blob_store:
+        blobs = BlobStore.open(BLOB_STORE_PATH, version, max_bytes=args.blob_store_mb * 1024 * 1024)
+
+    if args.watch:
+        if args.since or args.rev or args.fail_fast or not project_path.is_dir():
+            print("Error: --watch needs a project directory and cannot be combined with --since, --rev or --fail-fast")
+            sys.exit(1)
+        manifest = ScanManifest.load(args.manifest or default_manifest_path(project_path), version)
+        # One context for the whole session: the inventory, analyses, rule
+        # engines and manifest stay in memory and each re-scan re-analyzes
+        # only the files that changed
+        context = ScanContext(
+            project_path,
+            args.requirements,
+            cache=ContentCache(max_bytes=args.cache_mb * 1024 * 1024, stream_bytes=args.max_map_mb * 1024 * 1024),
+            inventory=build_file_inventory(project_path, use_gitignore=not args.no_gitignore),
+            manifest=manifest,
+            policy=policy,
+            max_matches=args.max_matches,
+            blobs=blobs
+        )
+
+        def scan(changed: Optional[List[str]]) -> Dict:
+            if changed is not None:
+                context.refresh(changed, use_gitignore=not args.no_gitignore)
+            results = scan_for_compliance_issues(
+                project_path,
+                args.requirements,
+                workers=args.workers if changed is None else 1,
+                rule_dirs=[d.resolve() for d in args.rules_dir],
+                context=context
+            )
+            if changed is None:
+                manifest.save()
+            return results
+
+        try:
+            watch_project(project_path, scan, args.output, not args.no_gitignore, args.debounce, args.poll)
+        except ValueError as e:
+            print(f"Error: {e}")
+            sys.exit(1)
+        finally:
+            manifest.save()
+        return
+
+    cache = ContentCache(
+        max_bytes=args.cache_mb * 1024 * 1024,
+        stream_bytes=args.max_map_mb * 1024 * 1024
+    )
+    emit = emit_jsonl if args.output == "jsonl" else None
+    try:
+        results = scan_for_compliance_issues(
+            project_path,
+            args.requirements,
+            cache=cache,
+            workers=args.workers,
+            manifest=manifest,
+            since=args.since,
+            policy=policy,
+            emit=emit,
+            rule_dirs=[d.resolve() for d in args.rules_dir],
+            max_matches=args.max_matches,
+            use_gitignore=not args.no_gitignore,
+            blobs=blobs,
+            rev=args.rev,
+            fail_fast=args.fail_fast
+        )
+    except ValueError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
 
-    if args.output == "json":
+    if args.stats:
+        print(f"Content cache: {json.dumps(cache.stats())}", file=sys.stderr)
+        if manifest is not None:
+            print(f"Manifest: {json.dumps(manifest.stats())}", file=sys.stderr)
+        if not args.no_gitignore and not args.rev and project_path.is_dir():
+            print(f"Ignore rules: {json.dumps(project_ignore(project_path).stats())}", file=sys.stderr)
+        if blobs is not None:
+            print(f"Blob store: {json.dumps(blobs.stats())}", file=sys.stderr)
+
+    if args.output == "jsonl":
+        emit_jsonl({"type": "summary", **results})
+    elif args.output == "json":
         print(json.dumps(results, indent=2))
     else:
         print(format_text_report(results))
@@ -2,20 +2,94 @@
 """Dependency Audit - Check for outdated packages and security issues.
 
 This script analyzes project dependencies for security vulnerabilities and
-available updates. It supports npm, yarn, pip, and uv package managers.
+available updates. It supports npm, yarn, pnpm, pip, poetry, pipenv and uv
+package managers.
+
+A repository may hold several projects (a frontend and a backend in
+subfolders, npm/pnpm workspaces, several Python packages). They are found
+in one walk (see workspaces.py) and audited in parallel, and the report
+rolls their results up in total and lists each unit's own totals.
+
+The audit and outdated tools are slow and mostly wait on the network, so
+they run concurrently as asyncio subprocesses, under a concurrency limit
+and a per-command timeout. A command that times out is killed together
+with every process it started, and each command's duration is reported.
+
+A project's resolved dependencies are read from its lockfiles in-process
+(see lockfiles.py). The outdated check compares those versions with the
+latest release on the npm registry or PyPI instead of running
+`npm outdated` or `pip list --outdated` (which reports the scanning
+machine's environment, not the project), and pip-audit is given the
+locked versions as pinned requirements. Projects without a lockfile fall
+back to the package manager's own commands.
+
+When an offline advisory database has been imported (see advisory_db.py)
+and covers the project's ecosystem, the security audit is a local lookup
+of the locked versions in it instead: no npm audit or pip-audit, no
+network, and each vulnerability carries its advisory's real severity.
+Otherwise pip-audit's findings, which come unrated, still take their
+severity from the database where it has their advisory.
+
+Results are cached in ~/.smb-growth-agent/audit_cache.sqlite, keyed by
+the package manager, the contents of the project's lockfiles and
+manifests, and the advisory database version; until an entry's TTL runs
+out, auditing the same project again runs nothing and reports the
+result as cached, with its age.
 
 Usage:
     python dependency_audit.py /path/to/project
     python dependency_audit.py /path/to/project --output json
     python dependency_audit.py /path/to/project --security-only
+    python dependency_audit.py /path/to/project --timeout 60 --concurrency 2
+    python dependency_audit.py /path/to/project --advisory-db /path/to/advisories.sqlite
+    python dependency_audit.py /path/to/project --no-advisory-db
+    python dependency_audit.py /path/to/project --cache-ttl 6
+    python dependency_audit.py /path/to/project --no-cache
 """
 
 import argparse
+import asyncio
+import functools
+import hashlib
 import json
-import subprocess
+import os
+import signal
 import sys
+import tempfile
+import time
+import urllib.parse
+import urllib.request
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Callable, Dict, Iterator, List, Optional, Set, Tuple
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from advisory_db import ADVISORY_DB_PATH, AdvisoryIndex
+from lockfiles import (
+    NPM, PYPI, Dependency, direct_dependencies, find_lockfiles, lockfile_sources, resolve_dependencies,
+    version_key
+)
+from scan_cache import (
+    AUDIT_CACHE_PATH, DEFAULT_AUDIT_CACHE_BYTES, DEFAULT_AUDIT_CACHE_TTL, AuditCache, content_digest
+)
+from workspaces import discover_units
+
+
+# Seconds a single audit or outdated command may run before it is killed
+DEFAULT_TIMEOUT = 120
+
+# Commands run at the same time
+DEFAULT_CONCURRENCY = 4
+
+# Seconds a single registry lookup may take
+REGISTRY_TIMEOUT = 15
+
+# Latest-release metadata per ecosystem: URL template and the key path to
+# the version in its JSON response
+REGISTRY_URLS = {
+    NPM: ("https://registry.npmjs.org/{name}/latest", ("version",)),
+    PYPI: ("https://pypi.org/pypi/{name}/json", ("info", "version")),
+}
 
 
 def detect_package_manager(project_path: Path) -> str:
@@ -60,21 +134,97 @@ def detect_package_manager(project_path: Path) -> str:
     return "unknown"
 
 
-def run_command(cmd: List[str], cwd: Path) -> Tuple[int, str, str]:
-    """Run a command and return exit code, stdout, stderr."""
+def kill_process_group(process: asyncio.subprocess.Process) -> None:
+    """Kill a process and everything it started (it leads its own session)."""
     try:
-        result = subprocess.run(
-            cmd,
-            cwd=cwd,
-            capture_output=True,
-            text=True,
-            timeout=120
-        )
-        return result.returncode, result.stdout, result.stderr
-    except subprocess.TimeoutExpired:
-        return -1, "", "Command timed out"
-    except FileNotFoundError:
-        return -1, "", f"Command not found: {cmd[0]}"
+        if hasattr(os, "killpg"):
+            os.killpg(process.pid, signal.SIGKILL)
+        else:
+            process.kill()
+    except ProcessLookupError:
+        pass
+
+
+class CommandRunner:
+    """Runs commands as asyncio subprocesses, a limited number at a time.
+
+    Every command gets its own process group, so a timeout kills the
+    package manager along with the node/python children it spawned. Each
+    finished command is recorded in timings with its duration and outcome.
+    Create a runner inside the event loop that uses it.
+    """
+
+    def __init__(self, concurrency: int = DEFAULT_CONCURRENCY, timeout: float = DEFAULT_TIMEOUT):
+        self.timeout = timeout
+        self.timings: List[Dict] = []
+        self._limit = asyncio.Semaphore(max(1, concurrency))
+
+    def fork(self) -> "CommandRunner":
+        """Return a runner sharing this one's concurrency limit, with its own timings."""
+        runner = CommandRunner(1, self.timeout)
+        runner._limit = self._limit
+        return runner
+
+    async def run(self, cmd: List[str], cwd: Path, timeout: Optional[float] = None) -> Tuple[int, str, str]:
+        """Run a command and return exit code, stdout, stderr.
+
+        A command that cannot be started or times out returns exit code -1
+        with the reason in stderr.
+        """
+        timeout = self.timeout if timeout is None else timeout
+        # Timings are listed in launch order, whatever order commands finish in
+        timing = {"command": " ".join(cmd), "cwd": str(cwd)}
+        self.timings.append(timing)
+        async with self._limit:
+            start = time.monotonic()
+            status = "ok"
+            try:
+                process = await asyncio.create_subprocess_exec(
+                    *cmd,
+                    cwd=cwd,
+                    stdout=asyncio.subprocess.PIPE,
+                    stderr=asyncio.subprocess.PIPE,
+                    start_new_session=True
+                )
+            except FileNotFoundError:
+                code, stdout, stderr = -1, "", f"Command not found: {cmd[0]}"
+                status = "not_found"
+            else:
+                try:
+                    out, err = await asyncio.wait_for(process.communicate(), timeout)
+                    code = process.returncode
+                    stdout = out.decode("utf-8", "replace")
+                    stderr = err.decode("utf-8", "replace")
+                except asyncio.TimeoutError:
+                    kill_process_group(process)
+                    await process.wait()
+                    code, stdout, stderr = -1, "", f"Command timed out after {timeout:g}s"
+                    status = "timeout"
+
+            timing.update(seconds=round(time.monotonic() - start, 3), exit_code=code, status=status)
+            return code, stdout, stderr
+
+    async def call(self, func: Callable, *args):
+        """Run a blocking function in a worker thread, under the concurrency limit."""
+        async with self._limit:
+            return await asyncio.to_thread(func, *args)
+
+
+def run_command(cmd: List[str], cwd: Path, timeout: float = DEFAULT_TIMEOUT) -> Tuple[int, str, str]:
+    """Run a command and return exit code, stdout, stderr."""
+    async def run() -> Tuple[int, str, str]:
+        return await CommandRunner(1, timeout).run(cmd, cwd)
+    return asyncio.run(run())
+
+
+NPM_AUDIT = ["npm", "audit", "--json"]
+NPM_OUTDATED = ["npm", "outdated", "--json"]
+PIP_AUDIT = ["pip-audit", "--format", "json", "-r", "requirements.txt"]
+PIP_OUTDATED = ["pip", "list", "--outdated", "--format", "json"]
+
+# pip-audit over a pinned requirements file written from the lockfiles; the
+# pins are exact, so nothing needs resolving or installing
+PIP_AUDIT_LOCKED = ["pip-audit", "--format", "json", "--no-deps", "--disable-pip", "-r"]
 
 
 def audit_npm(project_path: Path) -> Dict:
@@ -86,8 +236,11 @@ def audit_npm(project_path: Path) -> Dict:
     Returns:
         Dict with audit results
     """
-    code, stdout, stderr = run_command(["npm", "audit", "--json"], project_path)
+    return parse_npm_audit(*run_command(NPM_AUDIT, project_path))
+
 
+def parse_npm_audit(code: int, stdout: str, stderr: str) -> Dict:
+    """Parse npm audit --json output into audit results."""
     result = {
         "tool": "npm audit",
         "success": code == 0,
@@ -101,6 +254,10 @@ def audit_npm(project_path: Path) -> Dict:
         "details": []
     }
 
+    if code == -1:
+        result["error"] = stderr
+        return result
+
     if stdout:
         try:
             audit_data = json.loads(stdout)
@@ -132,8 +289,11 @@ def check_outdated_npm(project_path: Path) -> List[Dict]:
     Returns:
         List of outdated packages
     """
-    code, stdout, stderr = run_command(["npm", "outdated", "--json"], project_path)
+    return parse_npm_outdated(*run_command(NPM_OUTDATED, project_path))
+
 
+def parse_npm_outdated(code: int, stdout: str, stderr: str) -> List[Dict]:
+    """Parse npm outdated --json output into outdated packages."""
     packages = []
     if stdout:
         try:
@@ -161,6 +321,37 @@ def audit_pip(project_path: Path) -> Dict:
     Returns:
         Dict with audit results
     """
+    return parse_pip_audit(*run_command(PIP_AUDIT, project_path))
+
+
+def pip_audit_vulnerabilities(audit_data) -> Iterator[Tuple[Dict, Dict]]:
+    """Yield (dependency, vulnerability) pairs from pip-audit JSON output.
+
+    pip-audit 2 reports {"dependencies": [{"name", "version", "vulns":
+    [...]}], "fixes": [...]}; older releases printed a bare list, either of
+    such dependencies or of flat vulnerabilities carrying their package's
+    name and version.
+    """
+    if isinstance(audit_data, dict):
+        for dependency in audit_data["dependencies"]:
+            for vuln in dependency.get("vulns") or []:
+                yield dependency, vuln
+        return
+    for entry in audit_data:
+        if "vulns" in entry:
+            for vuln in entry["vulns"] or []:
+                yield entry, vuln
+        else:
+            yield entry, entry
+
+
+def parse_pip_audit(code: int, stdout: str, stderr: str, advisories: Optional[AdvisoryIndex] = None) -> Dict:
+    """Parse pip-audit JSON output into audit results.
+
+    pip-audit does not rate vulnerabilities, so each one takes the rating
+    of its advisory (by id or alias) in the offline advisory index, and is
+    counted as unknown when the index is missing or lacks the advisory.
+    """
     result = {
         "tool": "pip-audit",
         "success": False,
@@ -169,37 +360,37 @@ def audit_pip(project_path: Path) -> Dict:
             "high": 0,
             "moderate": 0,
             "low": 0,
+            "unknown": 0,
         },
         "details": []
     }
 
-    # Try pip-audit
-    code, stdout, stderr = run_command(
-        ["pip-audit", "--format", "json", "-r", "requirements.txt"],
-        project_path
-    )
-
     if code == -1 and "not found" in stderr.lower():
         result["error"] = "pip-audit not installed. Install with: pip install pip-audit"
         return result
+    if code == -1:
+        result["error"] = stderr
+        return result
 
     result["success"] = code == 0
 
     if stdout:
         try:
             audit_data = json.loads(stdout)
-            for vuln in audit_data:
-                # Map CVSS to severity
-                severity = "low"
+            for dependency, vuln in pip_audit_vulnerabilities(audit_data):
                 vuln_id = vuln.get("id", "")
+                severity = None
+                if advisories is not None:
+                    severity = advisories.severity_of([vuln_id, *(vuln.get("aliases") or [])])
+                severity = severity or "unknown"
                 result["details"].append({
-                    "package": vuln.get("name"),
-                    "version": vuln.get("version"),
+                    "package": dependency.get("name"),
+                    "version": dependency.get("version"),
                     "vulnerability_id": vuln_id,
                     "severity": severity,
                 })
                 result["vulnerabilities"][severity] += 1
-        except json.JSONDecodeError:
+        except (json.JSONDecodeError, AttributeError, KeyError, TypeError):
             result["error"] = "Could not parse pip-audit output"
 
     return result
@@ -214,11 +405,11 @@ def check_outdated_pip(project_path: Path) -> List[Dict]:
     Returns:
         List of outdated packages
     """
-    code, stdout, stderr = run_command(
-        ["pip", "list", "--outdated", "--format", "json"],
-        project_path
-    )
+    return parse_pip_outdated(*run_command(PIP_OUTDATED, project_path))
+
 
+def parse_pip_outdated(code: int, stdout: str, stderr: str) -> List[Dict]:
+    """Parse pip list --outdated JSON output into outdated packages."""
     packages = []
     if stdout:
         try:
@@ -235,11 +426,486 @@ def check_outdated_pip(project_path: Path) -> List[Dict]:
     return packages
 
 
+def fetch_latest_version(ecosystem: str, name: str, timeout: float = REGISTRY_TIMEOUT) -> Optional[str]:
+    """Return the latest release of a package from its registry.
+
+    Args:
+        ecosystem: NPM or PYPI
+        name: Package name (scoped npm names included)
+        timeout: Seconds the request may take
+
+    Returns:
+        Version string, or None if the registry could not be reached or
+        does not know the package
+    """
+    template, keys = REGISTRY_URLS[ecosystem]
+    url = template.format(name=urllib.parse.quote(name, safe="@"))
+    request = urllib.request.Request(url, headers={"Accept": "application/json"})
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            data = json.load(response)
+    except (OSError, ValueError):
+        return None
+    for key in keys:
+        data = data.get(key) if isinstance(data, dict) else None
+    return data if isinstance(data, str) else None
+
+
+async def check_outdated_locked(
+    ecosystem: str,
+    dependencies: Set[Dependency],
+    project_path: Path,
+    runner: CommandRunner
+) -> List[Dict]:
+    """Compare locked versions with each package's latest registry release.
+
+    When the project's manifests declare dependencies, only those are
+    looked up (as `npm outdated` does); otherwise every locked package is.
+    A package locked at several versions is compared at its highest. The
+    lookups share the runner's concurrency limit and are recorded in its
+    timings as one entry.
+
+    Returns:
+        Outdated packages, in the shape of the parse_*_outdated results
+    """
+    current: Dict[str, str] = {}
+    for dep_ecosystem, name, version in dependencies:
+        if dep_ecosystem == ecosystem and (name not in current or version_key(version) > version_key(current[name])):
+            current[name] = version
+    declared = {name: group for (dep_ecosystem, name), group in direct_dependencies(project_path).items()
+                if dep_ecosystem == ecosystem and name in current}
+    names = sorted(declared or current)
+
+    timing = {"command": f"registry lookups ({ecosystem}, {len(names)} packages)", "cwd": str(project_path)}
+    runner.timings.append(timing)
+    start = time.monotonic()
+    latest = await asyncio.gather(*(runner.call(fetch_latest_version, ecosystem, name) for name in names))
+    failed = latest.count(None)
+    status = "unreachable" if names and failed == len(names) else "ok"
+    timing.update(
+        seconds=round(time.monotonic() - start, 3),
+        exit_code=0 if status == "ok" else -1,
+        status=status,
+        failed_lookups=failed
+    )
+
+    packages = []
+    for name, version in zip(names, latest):
+        if version is None or version_key(version) <= version_key(current[name]):
+            continue
+        package = {"name": name, "current": current[name], "latest": version}
+        if ecosystem == NPM:
+            package["type"] = declared.get(name, "dependencies")
+        packages.append(package)
+    return packages
+
+
+async def audit_locked_pip(
+    dependencies: Set[Dependency],
+    project_path: Path,
+    runner: CommandRunner,
+    advisories: Optional[AdvisoryIndex] = None
+) -> Dict:
+    """Run pip-audit over the locked Python dependencies as exact pins."""
+    pins = sorted(f"{name}=={version}" for ecosystem, name, version in dependencies if ecosystem == PYPI)
+    fd, requirements = tempfile.mkstemp(prefix="locked-", suffix=".txt", text=True)
+    try:
+        with os.fdopen(fd, "w") as f:
+            f.write("\n".join(pins) + "\n")
+        return parse_pip_audit(*await runner.run(PIP_AUDIT_LOCKED + [requirements], project_path), advisories)
+    finally:
+        os.unlink(requirements)
+
+
+async def audit_offline(
+    index: AdvisoryIndex,
+    ecosystem: str,
+    dependencies: Set[Dependency],
+    project_path: Path,
+    runner: CommandRunner
+) -> Dict:
+    """Audit the locked dependencies against the offline advisory database."""
+    start = time.monotonic()
+    result = index.audit(dependencies)
+    runner.timings.append({
+        "command": f"advisory lookups ({ecosystem}, {len(dependencies)} packages)",
+        "cwd": str(project_path),
+        "seconds": round(time.monotonic() - start, 3),
+        "exit_code": 0 if result["success"] else -1,
+        "status": "ok" if result["success"] else "error",
+    })
+    return result
+
+
+async def run_parsed(runner: CommandRunner, cmd: List[str], cwd: Path, parse: Callable):
+    """Run a command and return its parsed output."""
+    return parse(*await runner.run(cmd, cwd))
+
+
+# Package manager families: their audit and outdated commands and parsers
+AUDIT_TOOLS = {
+    "npm": ((NPM_AUDIT, parse_npm_audit), (NPM_OUTDATED, parse_npm_outdated)),
+    "pip": ((PIP_AUDIT, parse_pip_audit), (PIP_OUTDATED, parse_pip_outdated)),
+}
+
+PACKAGE_MANAGER_FAMILIES = {
+    "npm": "npm", "yarn": "npm", "pnpm": "npm",
+    "pip": "pip", "poetry": "pip", "pipenv": "pip", "uv": "pip",
+}
+
+# Lockfile ecosystem of each package manager family
+FAMILY_ECOSYSTEMS = {"npm": NPM, "pip": PYPI}
+
+# Manifests that change a cached result besides the lockfiles (they decide
+# which packages the outdated check treats as direct dependencies)
+CACHE_KEY_MANIFESTS = ("package.json", "pyproject.toml", "Pipfile")
+
+
+def audit_cache_key(
+    project_path: Path,
+    package_manager: str,
+    security_only: bool,
+    advisory_version: Optional[str]
+) -> Optional[str]:
+    """Return the audit cache key for a project, or None if it has no lockfiles.
+
+    Without lockfiles the results depend on whatever the package manager
+    resolves at run time, so they are not cached. The key covers every
+    file the lockfiles pull in (requirements files included with -r or
+    -c), not only the lockfiles themselves; when one of those cannot be
+    read there is no key either, and the audit reports the lockfile error.
+    """
+    lockfiles = find_lockfiles(project_path)
+    if not lockfiles:
+        return None
+    try:
+        sources = [source for path in lockfiles for source in lockfile_sources(path)]
+    except ValueError:
+        return None
+    key = hashlib.sha256(json.dumps([package_manager, security_only, advisory_version]).encode("utf-8"))
+    for path in sources + [project_path / name for name in CACHE_KEY_MANIFESTS]:
+        try:
+            content = path.read_bytes()
+        except OSError:
+            continue
+        key.update(f"\0{os.path.relpath(path, project_path)}\0{content_digest(content)}".encode("utf-8"))
+    return key.hexdigest()
+
+
+def is_cacheable(audit_results: Optional[Dict], timings: List[Dict]) -> bool:
+    """Return True if every command and lookup of an audit completed."""
+    if audit_results is None or audit_results.get("error"):
+        return False
+    return all(timing["status"] == "ok" and not timing.get("failed_lookups") for timing in timings)
+
+
+async def audit_project_async(
+    project_path: Path,
+    package_manager: str,
+    runner: CommandRunner,
+    security_only: bool = False,
+    advisories: Optional[AdvisoryIndex] = None
+) -> Tuple[Optional[Dict], List[Dict]]:
+    """Run a project's security audit and outdated check concurrently.
+
+    Both stages work from the dependencies resolved in the project's
+    lockfiles when it has any: the outdated check queries the registries
+    directly, and the audit looks the locked versions up in the offline
+    advisory database when it covers the ecosystem, or else gives
+    pip-audit the locked pins (a requirements.txt alone is still audited
+    by pip-audit itself, which also resolves its unpinned and transitive
+    requirements). Without lockfiles the package manager's commands are run.
+
+    Returns:
+        (audit results or None if the package manager is unsupported,
+        outdated packages)
+    """
+    family = PACKAGE_MANAGER_FAMILIES.get(package_manager)
+    if family is None:
+        return None, []
+    (audit_cmd, parse_audit), (outdated_cmd, parse_outdated) = AUDIT_TOOLS[family]
+    if parse_audit is parse_pip_audit:
+        parse_audit = functools.partial(parse_pip_audit, advisories=advisories)
+
+    ecosystem = FAMILY_ECOSYSTEMS[family]
+    lockfile_error = None
+    try:
+        resolved, lockfiles = resolve_dependencies(project_path)
+    except ValueError as e:
+        resolved, lockfiles, lockfile_error = set(), [], str(e)
+    dependencies = {dependency for dependency in resolved if dependency[0] == ecosystem}
+
+    if dependencies and advisories is not None and advisories.covers(ecosystem):
+        stages = [audit_offline(advisories, ecosystem, dependencies, project_path, runner)]
+    elif family == "pip" and dependencies and any(path.name != "requirements.txt" for path in lockfiles):
+        stages = [audit_locked_pip(dependencies, project_path, runner, advisories)]
+    else:
+        stages = [run_parsed(runner, audit_cmd, project_path, parse_audit)]
+    if not security_only:
+        if dependencies:
+            stages.append(check_outdated_locked(ecosystem, dependencies, project_path, runner))
+        else:
+            stages.append(run_parsed(runner, outdated_cmd, project_path, parse_outdated))
+    audit_results, *outdated = await asyncio.gather(*stages)
+
+    if lockfiles:
+        audit_results["lockfiles"] = [path.name for path in lockfiles]
+        audit_results["dependency_count"] = len(dependencies)
+    if lockfile_error:
+        audit_results["lockfile_error"] = lockfile_error
+    return audit_results, outdated[0] if outdated else []
+
+
+async def audit_unit_async(
+    project_path: Path,
+    package_manager: str,
+    runner: CommandRunner,
+    security_only: bool = False,
+    advisories: Optional[AdvisoryIndex] = None,
+    cache: Optional[AuditCache] = None
+) -> Tuple[Optional[Dict], List[Dict]]:
+    """Audit one project directory, answering from the cache when possible.
+
+    The runner's timings must only hold this directory's commands (give
+    each directory its own fork), since they decide whether the result
+    is complete enough to cache.
+
+    Returns:
+        (audit results or None, outdated packages); a cached result's
+        audit results carry cached: true and the entry's age in
+        cache_age_seconds, and no command is run for it
+    """
+    key = None
+    if cache is not None and package_manager in PACKAGE_MANAGER_FAMILIES:
+        key = audit_cache_key(project_path, package_manager, security_only, advisories and advisories.version)
+        hit = cache.get(key) if key is not None else None
+        if hit is not None:
+            cached, age = hit
+            cached["security_audit"].update(cached=True, cache_age_seconds=round(age))
+            return cached["security_audit"], cached["outdated"]
+
+    audit_results, outdated = await audit_project_async(project_path, package_manager, runner, security_only, advisories)
+    if key is not None and is_cacheable(audit_results, runner.timings):
+        cache.put(key, {"security_audit": audit_results, "outdated": outdated})
+    if audit_results is not None and cache is not None:
+        audit_results["cached"] = False
+    return audit_results, outdated
+
+
+def audit_units(
+    project_path: Path,
+    units: List[Dict],
+    security_only: bool = False,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    timeout: float = DEFAULT_TIMEOUT,
+    advisory_db: Optional[Path] = ADVISORY_DB_PATH,
+    cache_path: Optional[Path] = AUDIT_CACHE_PATH,
+    cache_ttl: float = DEFAULT_AUDIT_CACHE_TTL,
+    cache_max_bytes: int = DEFAULT_AUDIT_CACHE_BYTES
+) -> List[Dict]:
+    """Audit several project directories in parallel.
+
+    Every unit's commands share one concurrency limit; each unit is
+    cached on its own.
+
+    Args:
+        project_path: Path the unit paths are relative to
+        units: Units from discover_units (path, package_manager, workspaces)
+        security_only: Skip the outdated checks
+        concurrency: Commands run at the same time, across all units
+        timeout: Seconds each command may run before its process group is killed
+        advisory_db: Offline advisory database to audit against, if it
+            exists; None always uses the online audit tools
+        cache_path: Audit result cache; None disables caching
+        cache_ttl: Seconds a cached result stays valid
+        cache_max_bytes: Size budget of the cache
+
+    Returns:
+        A copy of each unit with its security_audit, outdated_packages and
+        commands added, in the order given
+    """
+    advisories = AdvisoryIndex.open(advisory_db) if advisory_db is not None else None
+    cache = AuditCache.open(cache_path, cache_ttl, cache_max_bytes) if cache_path is not None else None
+
+    async def run() -> List[Dict]:
+        runner = CommandRunner(concurrency, timeout)
+        forks = [runner.fork() for _ in units]
+        audits = await asyncio.gather(*(
+            audit_unit_async(
+                project_path / unit["path"], unit["package_manager"], fork, security_only, advisories, cache
+            )
+            for unit, fork in zip(units, forks)
+        ))
+        return [
+            {**unit, "security_audit": audit_results, "outdated_packages": outdated, "commands": fork.timings}
+            for unit, (audit_results, outdated), fork in zip(units, audits, forks)
+        ]
+    try:
+        return asyncio.run(run())
+    finally:
+        if advisories is not None:
+            advisories.close()
+        if cache is not None:
+            cache.close()
+
+
+def audit_project(
+    project_path: Path,
+    package_manager: str,
+    security_only: bool = False,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    timeout: float = DEFAULT_TIMEOUT,
+    advisory_db: Optional[Path] = ADVISORY_DB_PATH,
+    cache_path: Optional[Path] = AUDIT_CACHE_PATH,
+    cache_ttl: float = DEFAULT_AUDIT_CACHE_TTL,
+    cache_max_bytes: int = DEFAULT_AUDIT_CACHE_BYTES
+) -> Tuple[Optional[Dict], List[Dict], List[Dict]]:
+    """Audit a project's dependencies, running its tools concurrently.
+
+    Args:
+        project_path: Path to the project
+        package_manager: Package manager from detect_package_manager
+        security_only: Skip the outdated check
+        concurrency: Commands run at the same time
+        timeout: Seconds each command may run before its process group is killed
+        advisory_db: Offline advisory database to audit against, if it
+            exists; None always uses the online audit tools
+        cache_path: Audit result cache; None disables caching
+        cache_ttl: Seconds a cached result stays valid
+        cache_max_bytes: Size budget of the cache
+
+    Returns:
+        (audit results or None, outdated packages, per-command timings);
+        a cached result has no timings, and its audit results carry
+        cached: true and the entry's age in cache_age_seconds
+    """
+    unit = audit_units(
+        project_path,
+        [{"path": ".", "package_manager": package_manager, "workspaces": []}],
+        security_only, concurrency, timeout, advisory_db, cache_path, cache_ttl, cache_max_bytes
+    )[0]
+    return unit["security_audit"], unit["outdated_packages"], unit["commands"]
+
+
+def unit_path(unit: Dict, name: str) -> str:
+    """Return a unit's file name as a path relative to the repository root."""
+    return name if unit["path"] == "." else f"{unit['path']}/{name}"
+
+
+def roll_up(units: List[Dict]) -> Tuple[Optional[Dict], List[Dict], List[Dict]]:
+    """Combine per-unit results into one set of audit results.
+
+    Vulnerability counts are summed, and every detail and outdated package
+    is tagged with the unit it came from. A single unit's results are
+    returned unchanged.
+
+    Returns:
+        (audit results or None if no unit could be audited, outdated
+        packages, per-command timings)
+    """
+    commands = [command for unit in units for command in unit["commands"]]
+    audited = [unit for unit in units if unit["security_audit"] is not None]
+    if len(units) == 1:
+        return units[0]["security_audit"], units[0]["outdated_packages"], commands
+    outdated = [{**package, "unit": unit["path"]} for unit in units for package in unit["outdated_packages"]]
+    if not audited:
+        return None, outdated, commands
+
+    vulnerabilities: Dict[str, int] = {}
+    for unit in audited:
+        for severity, count in unit["security_audit"].get("vulnerabilities", {}).items():
+            vulnerabilities[severity] = vulnerabilities.get(severity, 0) + count
+    audit_results = {
+        "tool": ", ".join(dict.fromkeys(unit["security_audit"].get("tool", "") for unit in audited)),
+        "success": all(unit["security_audit"].get("success") for unit in audited),
+        "vulnerabilities": vulnerabilities,
+        "details": [
+            {**detail, "unit": unit["path"]}
+            for unit in audited for detail in unit["security_audit"].get("details", [])
+        ],
+    }
+    lockfiles = [unit_path(unit, name) for unit in audited for name in unit["security_audit"].get("lockfiles", [])]
+    if lockfiles:
+        audit_results["lockfiles"] = lockfiles
+        audit_results["dependency_count"] = sum(
+            unit["security_audit"].get("dependency_count", 0) for unit in audited
+        )
+    errors = [f"{unit['path']}: {unit['security_audit']['error']}" for unit in audited if unit["security_audit"].get("error")]
+    if errors:
+        audit_results["errors"] = errors
+        if len(errors) == len(audited):
+            audit_results["error"] = "; ".join(errors)
+    if all("cached" in unit["security_audit"] for unit in audited):
+        audit_results["cached"] = all(unit["security_audit"]["cached"] for unit in audited)
+    return audit_results, outdated, commands
+
+
+def workspace_units(project_path: Path) -> List[Dict]:
+    """Return a repository's dependency units.
+
+    A repository without npm or Python units is one unit at its root, with
+    the package manager detect_package_manager finds (which may not be
+    supported, or 'unknown').
+    """
+    units = discover_units(project_path)
+    if not units:
+        units = [{"path": ".", "package_manager": detect_package_manager(project_path), "workspaces": []}]
+    return units
+
+
+def audit_workspace(
+    project_path: Path,
+    units: Optional[List[Dict]] = None,
+    security_only: bool = False,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    timeout: float = DEFAULT_TIMEOUT,
+    advisory_db: Optional[Path] = ADVISORY_DB_PATH,
+    cache_path: Optional[Path] = AUDIT_CACHE_PATH,
+    cache_ttl: float = DEFAULT_AUDIT_CACHE_TTL,
+    cache_max_bytes: int = DEFAULT_AUDIT_CACHE_BYTES
+) -> Tuple[str, Optional[Dict], List[Dict], List[Dict], List[Dict]]:
+    """Audit every dependency unit of a repository in parallel.
+
+    Args:
+        Same as audit_units; units default to workspace_units(project_path)
+
+    Returns:
+        (package managers, rolled-up audit results or None, rolled-up
+        outdated packages, per-command timings, per-unit results)
+    """
+    if units is None:
+        units = workspace_units(project_path)
+    results = audit_units(
+        project_path, units, security_only, concurrency, timeout,
+        advisory_db, cache_path, cache_ttl, cache_max_bytes
+    )
+    package_manager = ", ".join(dict.fromkeys(unit["package_manager"] for unit in units))
+    return (package_manager, *roll_up(results), results)
+
+
+def summarize(audit_results: Optional[Dict], outdated_packages: List[Dict]) -> Dict:
+    """Return vulnerability and outdated totals for one set of results."""
+    summary = {
+        "total_vulnerabilities": 0,
+        "critical_vulnerabilities": 0,
+        "outdated_count": len(outdated_packages),
+    }
+    if audit_results and "vulnerabilities" in audit_results:
+        vulns = audit_results["vulnerabilities"]
+        summary["critical_vulnerabilities"] = vulns.get("critical", 0)
+        summary["total_vulnerabilities"] = sum(
+            vulns.get(k, 0) for k in ["critical", "high", "moderate", "low", "info", "unknown"]
+        )
+    return summary
+
+
 def generate_report(
     package_manager: str,
     audit_results: Optional[Dict],
     outdated_packages: List[Dict],
-    output_format: str = "text"
+    output_format: str = "text",
+    commands: Optional[List[Dict]] = None,
+    units: Optional[List[Dict]] = None
 ) -> str:
     """Generate audit report.
 
@@ -248,6 +914,9 @@ def generate_report(
         audit_results: Security audit results
         outdated_packages: List of outdated packages
         output_format: 'text' or 'json'
+        commands: Per-command timings from the runner
+        units: Per-unit results from audit_workspace; listed when there is
+            more than one unit or the only one is not the project root
 
     Returns:
         Formatted report string
@@ -256,19 +925,22 @@ def generate_report(
         "package_manager": package_manager,
         "security_audit": audit_results,
         "outdated_packages": outdated_packages,
-        "summary": {
-            "total_vulnerabilities": 0,
-            "critical_vulnerabilities": 0,
-            "outdated_count": len(outdated_packages),
-        }
+        "summary": summarize(audit_results, outdated_packages),
     }
-
-    if audit_results and "vulnerabilities" in audit_results:
-        vulns = audit_results["vulnerabilities"]
-        report["summary"]["critical_vulnerabilities"] = vulns.get("critical", 0)
-        report["summary"]["total_vulnerabilities"] = sum(
-            vulns.get(k, 0) for k in ["critical", "high", "moderate", "low", "info"]
-        )
+    if commands is not None:
+        report["commands"] = commands
+    if units and (len(units) > 1 or units[0]["path"] != "."):
+        report["units"] = [
+            {
+                "path": unit["path"],
+                "package_manager": unit["package_manager"],
+                "workspaces": unit["workspaces"],
+                "security_audit": unit["security_audit"],
+                "outdated_packages": unit["outdated_packages"],
+                "summary": summarize(unit["security_audit"], unit["outdated_packages"]),
+            }
+            for unit in units
+        ]
 
     if output_format == "json":
         return json.dumps(report, indent=2)
@@ -290,18 +962,31 @@ def generate_report(
         if audit_results.get("error"):
             lines.append(f"Error: {audit_results['error']}")
         else:
+            for error in audit_results.get("errors", []):
+                lines.append(f"  Error in {error}")
             vulns = audit_results.get("vulnerabilities", {})
             lines.append(f"  Critical: {vulns.get('critical', 0)}")
             lines.append(f"  High: {vulns.get('high', 0)}")
             lines.append(f"  Moderate: {vulns.get('moderate', 0)}")
             lines.append(f"  Low: {vulns.get('low', 0)}")
+            if vulns.get("unknown"):
+                lines.append(f"  Unknown: {vulns['unknown']}")
 
             if audit_results.get("details"):
                 lines.append("\n  Details:")
                 for detail in audit_results["details"][:10]:  # Limit to 10
-                    lines.append(f"    - {detail.get('package')}: {detail.get('severity')}")
+                    advisory = f" ({detail['vulnerability_id']})" if detail.get("vulnerability_id") else ""
+                    unit = f"{detail['unit']}: " if "unit" in detail else ""
+                    lines.append(f"    - {unit}{detail.get('package')}: {detail.get('severity')}{advisory}")
     else:
         lines.append("  No security audit available")
+    if audit_results and audit_results.get("cached"):
+        age = audit_results.get("cache_age_seconds", 0)
+        age_text = f"{age}s" if age < 60 else f"{age // 60}m" if age < 3600 else f"{age / 3600:.1f}h"
+        lines.append(f"\n  Cached result ({age_text} old)")
+    if audit_results and audit_results.get("lockfiles"):
+        lines.append(f"\n  Lockfiles: {', '.join(audit_results['lockfiles'])} "
+                     f"({audit_results.get('dependency_count', 0)} packages)")
 
     # Outdated packages section
     lines.append("\n\nOUTDATED PACKAGES")
@@ -313,7 +998,8 @@ def generate_report(
         for pkg in outdated_packages[:15]:  # Limit to 15
             current = pkg.get("current", "?")
             latest = pkg.get("latest", "?")
-            lines.append(f"  {pkg['name']}: {current} → {latest}")
+            unit = f"{pkg['unit']}: " if "unit" in pkg else ""
+            lines.append(f"  {unit}{pkg['name']}: {current} → {latest}")
 
         if len(outdated_packages) > 15:
             lines.append(f"  ... and {len(outdated_packages) - 15} more")
@@ -327,6 +1013,25 @@ def generate_report(
     lines.append(f"  Critical vulnerabilities: {report['summary']['critical_vulnerabilities']}")
     lines.append(f"  Outdated packages: {report['summary']['outdated_count']}")
 
+    if "units" in report:
+        lines.append("\n\nUNITS")
+        lines.append("-" * 40)
+        for unit in report["units"]:
+            summary = unit["summary"]
+            members = f", {len(unit['workspaces'])} workspaces" if unit["workspaces"] else ""
+            audited = "" if unit["security_audit"] is not None else ", not audited"
+            lines.append(f"  {unit['path']} ({unit['package_manager']}{members}{audited}): "
+                         f"{summary['total_vulnerabilities']} vulnerabilities "
+                         f"({summary['critical_vulnerabilities']} critical), "
+                         f"{summary['outdated_count']} outdated")
+
+    if commands:
+        lines.append("\n\nCOMMANDS")
+        lines.append("-" * 40)
+        for command in commands:
+            status = "" if command["status"] == "ok" else f" ({command['status'].replace('_', ' ')})"
+            lines.append(f"  {command['command']}: {command['seconds']:.2f}s{status}")
+
     # Recommendations
     lines.append("\n\nRECOMMENDATIONS")
     lines.append("-" * 40)
@@ -354,6 +1059,21 @@ def main():
                        help="Output format")
     parser.add_argument("--security-only", action="store_true",
                        help="Only run security audit, skip outdated check")
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT,
+                       help="Seconds each audit command may run before it is killed")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY,
+                       help="Audit commands run at the same time")
+    parser.add_argument("--advisory-db", type=Path, default=ADVISORY_DB_PATH,
+                       help="Offline advisory database from advisory_db.py "
+                            "(default ~/.smb-growth-agent/advisories.sqlite, used if it exists)")
+    parser.add_argument("--no-advisory-db", action="store_true",
+                       help="Always audit with npm audit / pip-audit, even if an advisory database exists")
+    parser.add_argument("--cache-ttl", type=float, default=DEFAULT_AUDIT_CACHE_TTL / 3600,
+                       help="Hours a cached audit result is reused while the lockfiles are unchanged")
+    parser.add_argument("--cache-mb", type=int, default=DEFAULT_AUDIT_CACHE_BYTES // (1024 * 1024),
+                       help="Size budget of the audit cache; least recently used results are evicted")
+    parser.add_argument("--no-cache", action="store_true",
+                       help="Always run the audit, without reading or writing the cache")
 
     args = parser.parse_args()
 
@@ -363,29 +1083,30 @@ def main():
         print(f"Error: Project path does not exist: {project_path}")
         sys.exit(1)
 
-    # Detect package manager
-    pkg_manager = detect_package_manager(project_path)
-    print(f"Detected package manager: {pkg_manager}", file=sys.stderr)
-
-    audit_results = None
-    outdated_packages = []
+    # Find every project in the repository and its package manager
+    units = workspace_units(project_path)
+    for unit in units:
+        location = "" if unit["path"] == "." else f" in {unit['path']}"
+        print(f"Detected package manager: {unit['package_manager']}{location}", file=sys.stderr)
 
-    # Run appropriate audits
-    if pkg_manager in ["npm", "yarn", "pnpm"]:
-        audit_results = audit_npm(project_path)
-        if not args.security_only:
-            outdated_packages = check_outdated_npm(project_path)
-
-    elif pkg_manager in ["pip", "poetry", "pipenv", "uv"]:
-        audit_results = audit_pip(project_path)
-        if not args.security_only:
-            outdated_packages = check_outdated_pip(project_path)
-
-    elif pkg_manager == "unknown":
+    if units[0]["package_manager"] == "unknown":
         print("Warning: Could not detect package manager", file=sys.stderr)
 
+    # Audit every unit, each running its audit and outdated check side by side
+    pkg_manager, audit_results, outdated_packages, commands, unit_results = audit_workspace(
+        project_path,
+        units,
+        security_only=args.security_only,
+        concurrency=args.concurrency,
+        timeout=args.timeout,
+        advisory_db=None if args.no_advisory_db else args.advisory_db,
+        cache_path=None if args.no_cache else AUDIT_CACHE_PATH,
+        cache_ttl=args.cache_ttl * 3600,
+        cache_max_bytes=args.cache_mb * 1024 * 1024
+    )
+
     # Generate and print report
-    report = generate_report(pkg_manager, audit_results, outdated_packages, args.output)
+    report = generate_report(pkg_manager, audit_results, outdated_packages, args.output, commands, unit_results)
     print(report)
 
     # Exit with error code if critical vulnerabilities found
@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""File Watcher - Wait for changes under a project tree.
+
+Used by the compliance scanner's watch mode. On Linux, changes are
+reported by inotify (through ctypes, no extra packages); each watched
+directory costs one inotify watch and new subdirectories are picked up as
+they appear. Where inotify is unavailable or its watch limit is reached,
+a polling watcher compares (size, mtime) snapshots instead.
+
+Editors and build tools touch files in bursts, so changes are debounced:
+wait_for_changes returns only once the tree has been quiet for the
+debounce period, with every path that changed during the burst.
+
+Usage:
+    from file_watcher import open_watcher, wait_for_changes
+
+    watcher = open_watcher(directories, snapshot, relevant)
+    while True:
+        changed = wait_for_changes(watcher, debounce=0.5)
+"""
+
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+
+# inotify event bits (see inotify(7))
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+
+WATCH_MASK = (
+    IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO
+    | IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_ONLYDIR
+)
+
+EVENT_HEADER = struct.Struct("iIII")
+READ_BYTES = 64 * 1024
+
+DEFAULT_DEBOUNCE = 0.5
+DEFAULT_POLL_INTERVAL = 1.0
+
+# Decides whether a changed path matters: (path, is_dir) -> bool
+RelevantFn = Callable[[str, bool], bool]
+
+# Returns path -> (size, mtime_ns) for every file worth watching
+SnapshotFn = Callable[[], Dict[str, Tuple[int, int]]]
+
+
+class InotifyWatcher:
+    """Watch a set of directories with one inotify instance.
+
+    Raises:
+        OSError: If inotify is unavailable or a watch cannot be added
+            (e.g. fs.inotify.max_user_watches is exhausted)
+    """
+
+    def __init__(self, directories: Iterable[str], relevant: RelevantFn):
+        libc_name = ctypes.util.find_library("c")
+        if libc_name is None:
+            raise OSError("libc not found")
+        self._libc = ctypes.CDLL(libc_name, use_errno=True)
+        if not hasattr(self._libc, "inotify_init1"):
+            raise OSError("inotify not supported")
+        self._fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.relevant = relevant
+        self._paths: Dict[int, str] = {}
+        try:
+            for directory in directories:
+                self.add(directory)
+        except OSError:
+            self.close()
+            raise
+
+    def add(self, directory: str) -> None:
+        """Watch directory (not its subdirectories)."""
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(directory), WATCH_MASK)
+        if wd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, f"inotify_add_watch failed for {directory}: {os.strerror(errno)}")
+        self._paths[wd] = directory
+
+    def _add_tree(self, directory: str) -> None:
+        """Watch a directory that just appeared, and its relevant subdirectories."""
+        for current, subdirs, _ in os.walk(directory):
+            subdirs[:] = [d for d in subdirs if self.relevant(os.path.join(current, d), True)]
+            try:
+                self.add(current)
+            except OSError:
+                # Vanished again, or out of watches; the next event will tell
+                pass
+
+    def read(self, timeout: Optional[float]) -> Set[str]:
+        """Wait up to timeout seconds and return the relevant paths that changed."""
+        ready, _, _ = select.select([self._fd], [], [], timeout)
+        if not ready:
+            return set()
+        try:
+            data = os.read(self._fd, READ_BYTES)
+        except BlockingIOError:
+            return set()
+
+        changed = set()
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = EVENT_HEADER.unpack_from(data, offset)
+            offset += EVENT_HEADER.size
+            name = data[offset:offset + length].rstrip(b"\0")
+            offset += length
+
+            if mask & IN_Q_OVERFLOW:
+                # Events were dropped; report the whole tree as changed
+                changed.update(self._paths.values())
+                continue
+            if mask & IN_IGNORED:
+                self._paths.pop(wd, None)
+                continue
+            directory = self._paths.get(wd)
+            if directory is None:
+                continue
+            path = os.path.join(directory, os.fsdecode(name)) if name else directory
+            is_dir = bool(mask & IN_ISDIR)
+            if not self.relevant(path, is_dir):
+                continue
+            if is_dir and mask & (IN_CREATE | IN_MOVED_TO):
+                self._add_tree(path)
+            changed.add(path)
+        return changed
+
+    def close(self) -> None:
+        """Release the inotify instance."""
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+
+class PollingWatcher:
+    """Detect changes by comparing file snapshots every interval seconds."""
+
+    def __init__(self, snapshot: SnapshotFn, interval: float = DEFAULT_POLL_INTERVAL):
+        self.snapshot = snapshot
+        self.interval = interval
+        self._last = snapshot()
+
+    def read(self, timeout: Optional[float]) -> Set[str]:
+        """Wait up to timeout seconds (at least one interval) and return changed paths."""
+        time.sleep(self.interval if timeout is None else min(self.interval, max(timeout, 0.05)))
+        current = self.snapshot()
+        changed = {
+            path for path in self._last.keys() | current.keys()
+            if self._last.get(path) != current.get(path)
+        }
+        self._last = current
+        return changed
+
+    def close(self) -> None:
+        pass
+
+
+def open_watcher(
+    directories: List[str],
+    snapshot: SnapshotFn,
+    relevant: RelevantFn,
+    poll_interval: float = DEFAULT_POLL_INTERVAL,
+    polling: bool = False
+):
+    """Return an inotify watcher, or a polling one if inotify cannot be used.
+
+    Args:
+        directories: Directories to watch (inotify watches each one)
+        snapshot: File snapshot function for the polling watcher
+        relevant: Filter for changed paths and new directories
+        poll_interval: Seconds between polling snapshots
+        polling: Use the polling watcher even where inotify works
+    """
+    if not polling:
+        try:
+            return InotifyWatcher(directories, relevant)
+        except (OSError, AttributeError):
+            pass
+    return PollingWatcher(snapshot, poll_interval)
+
+
+def wait_for_changes(watcher, debounce: float = DEFAULT_DEBOUNCE) -> Set[str]:
+    """Block until something changes, then until debounce seconds pass quietly.
+
+    Returns:
+        Every relevant path that changed during the burst
+    """
+    changed: Set[str] = set()
+    while not changed:
+        changed = watcher.read(None)
+    while True:
+        more = watcher.read(debounce)
+        if not more:
+            return changed
+        changed |= more
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""Git Objects - Read a project's files at a git revision without a checkout.
+
+Lists the tree of a revision with `git ls-tree` and reads blob contents
+through a single long-lived `git cat-file --batch` process, so a
+historical release or another branch can be scanned straight from the
+object database. Blob SHAs identify content, so callers can use them as
+cache keys and skip reading blobs they have already analyzed.
+
+Usage:
+    from git_objects import GitRevision
+
+    with GitRevision(Path("/path/to/project"), "v1.2.0") as revision:
+        for rel_path, (blob_id, size) in revision.files.items():
+            content = revision.read_blob(blob_id)
+"""
+
+import subprocess
+from pathlib import Path
+from typing import Dict, Iterator, Optional, Tuple
+
+
+# Bytes read from cat-file per block when streaming a large blob
+BLOB_BLOCK_BYTES = 8 * 1024 * 1024
+
+# Tree entry modes that are not regular files (symlinks, submodules)
+SKIP_MODES = {"120000", "160000"}
+
+
+def list_tree(project_path: Path, rev: str) -> Dict[str, Tuple[str, int]]:
+    """List the regular files under project_path at a revision.
+
+    Args:
+        project_path: Path to the project (anywhere inside a git work tree)
+        rev: Revision to list, e.g. 'v1.2.0', 'origin/main' or a commit SHA
+
+    Returns:
+        Project-relative path -> (blob SHA, size in bytes), in path order
+
+    Raises:
+        ValueError: If git is unavailable or rev cannot be resolved
+    """
+    # Without --full-tree, ls-tree lists the subtree of the working
+    # directory with paths relative to it, i.e. the project's files
+    cmd = ["git", "ls-tree", "-r", "-l", "-z", rev]
+    try:
+        result = subprocess.run(cmd, cwd=project_path, capture_output=True, timeout=300)
+    except FileNotFoundError:
+        raise ValueError("git not found - --rev requires git")
+    except subprocess.TimeoutExpired:
+        raise ValueError(f"Command timed out: {' '.join(cmd)}")
+    if result.returncode != 0:
+        raise ValueError(result.stderr.decode("utf-8", "replace").strip() or f"git failed: {' '.join(cmd)}")
+
+    files = {}
+    for record in result.stdout.split(b"\0"):
+        if not record:
+            continue
+        meta, _, path = record.partition(b"\t")
+        mode, object_type, blob_id, size = meta.decode("ascii").split()
+        if object_type != "blob" or mode in SKIP_MODES:
+            continue
+        files[path.decode("utf-8", "surrogateescape")] = (blob_id, int(size))
+    return files
+
+
+class GitRevision:
+    """The files of a project at one revision, read from the object database.
+
+    The cat-file process is started on the first read and shared by every
+    read after it; close() (or leaving a with block) stops it.
+    """
+
+    def __init__(self, project_path: Path, rev: str):
+        self.project_path = project_path
+        self.rev = rev
+        self.files = list_tree(project_path, rev)
+        self._process: Optional[subprocess.Popen] = None
+        self.blobs_read = 0
+        self.bytes_read = 0
+
+    def __enter__(self) -> "GitRevision":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def _request(self, blob_id: str) -> int:
+        """Ask cat-file for a blob and return its size from the header."""
+        if self._process is None:
+            try:
+                self._process = subprocess.Popen(
+                    ["git", "cat-file", "--batch"],
+                    cwd=self.project_path,
+                    stdin=subprocess.PIPE,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.DEVNULL
+                )
+            except FileNotFoundError:
+                raise ValueError("git not found - --rev requires git")
+
+        self._process.stdin.write(f"{blob_id}\n".encode("ascii"))
+        self._process.stdin.flush()
+        header = self._process.stdout.readline().split()
+        if len(header) != 3:
+            raise ValueError(f"git cat-file could not read blob {blob_id}")
+        self.blobs_read += 1
+        return int(header[2])
+
+    def read_blob(self, blob_id: str) -> bytes:
+        """Return the full content of a blob."""
+        size = self._request(blob_id)
+        content = self._process.stdout.read(size)
+        self._process.stdout.read(1)  # newline after the content
+        self.bytes_read += len(content)
+        return content
+
+    def iter_blob(self, blob_id: str, block_bytes: int = BLOB_BLOCK_BYTES) -> Iterator[bytes]:
+        """Yield a blob's content in blocks, for blobs too large to hold whole.
+
+        A consumer may stop early: the rest of the blob is drained when the
+        generator is closed, keeping the cat-file stream in step.
+        """
+        remaining = self._request(blob_id)
+        try:
+            while remaining:
+                block = self._process.stdout.read(min(block_bytes, remaining))
+                if not block:
+                    raise ValueError(f"git cat-file ended inside blob {blob_id}")
+                remaining -= len(block)
+                self.bytes_read += len(block)
+                yield block
+        finally:
+            while remaining:
+                drained = self._process.stdout.read(min(block_bytes, remaining))
+                if not drained:
+                    break
+                remaining -= len(drained)
+            self._process.stdout.read(1)
+
+    def read(self, rel_path: str) -> Optional[bytes]:
+        """Return the content of a project-relative file, or None if absent."""
+        entry = self.files.get(rel_path)
+        return self.read_blob(entry[0]) if entry else None
+
+    def close(self) -> None:
+        """Stop the cat-file process."""
+        if self._process is not None:
+            self._process.stdin.close()
+            self._process.stdout.close()
+            self._process.wait()
+            self._process = None
+
+    def stats(self) -> Dict:
+        """Return tree and read counters."""
+        return {
+            "rev": self.rev,
+            "files": len(self.files),
+            "blobs_read": self.blobs_read,
+            "bytes_read": self.bytes_read,
+        }
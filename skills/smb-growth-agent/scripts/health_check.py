@@ -7,7 +7,9 @@ combining dependency audits, compliance scans, and generating recommendations.
 Usage:
     python health_check.py <product_id>
     python health_check.py <product_id> --output json
+    python health_check.py <product_id> --output jsonl
     python health_check.py --project-path /path/to/project --requirements HIPAA
+    python health_check.py <product_id> --no-blob-store
 """
 
 import argparse
@@ -15,7 +17,7 @@ import json
 import sys
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Callable, Dict, List, Optional
 
 # Import sibling modules
 script_dir = Path(__file__).parent
@@ -23,8 +25,9 @@ sys.path.insert(0, str(script_dir))
 
 try:
     from product_registry import ProductRegistry
-    from dependency_audit import detect_package_manager, audit_npm, check_outdated_npm, audit_pip, check_outdated_pip
-    from compliance_scan import scan_for_compliance_issues
+    from dependency_audit import audit_workspace
+    from compliance_scan import scan_for_compliance_issues, emit_jsonl, rules_version
+    from scan_cache import BLOB_STORE_PATH, DEFAULT_BLOB_STORE_BYTES, BlobStore
 except ImportError as e:
     print(f"Warning: Could not import module: {e}")
     ProductRegistry = None
@@ -33,7 +36,10 @@ except ImportError as e:
 def run_health_check(
     product_id: Optional[str] = None,
     project_path: Optional[Path] = None,
-    compliance_requirements: Optional[List[str]] = None
+    compliance_requirements: Optional[List[str]] = None,
+    emit: Optional[Callable[[Dict], None]] = None,
+    use_blob_store: bool = True,
+    blob_store_bytes: Optional[int] = None
 ) -> Dict:
     """Run full health check for a product.
 
@@ -41,6 +47,13 @@ def run_health_check(
         product_id: Product ID from registry (optional)
         project_path: Direct path to project (optional)
         compliance_requirements: List of compliance requirements to check
+        emit: Stream outdated packages, compliance findings, recommendations
+            and growth opportunities to this callback as records when they
+            are produced (compliance findings are then counted, not listed)
+        use_blob_store: Reuse and record compliance analyses in the store
+            shared across projects
+        blob_store_bytes: Size budget of the shared store (default:
+            DEFAULT_BLOB_STORE_BYTES)
 
     Returns:
         Dict with health check results
@@ -79,24 +92,36 @@ def run_health_check(
 
     # Run dependency audit if we have a project path
     if project_path and project_path.exists():
-        pkg_manager = detect_package_manager(project_path)
+        # Every project in the repository is audited, side by side
+        pkg_manager, security_audit, outdated, commands, units = audit_workspace(project_path)
         results["dependency_audit"]["package_manager"] = pkg_manager
-
-        if pkg_manager in ["npm", "yarn", "pnpm"]:
-            security_audit = audit_npm(project_path)
-            outdated = check_outdated_npm(project_path)
-            results["dependency_audit"]["security"] = security_audit
-            results["dependency_audit"]["outdated"] = outdated
-
-        elif pkg_manager in ["pip", "poetry", "pipenv", "uv"]:
-            security_audit = audit_pip(project_path)
-            outdated = check_outdated_pip(project_path)
+        if security_audit is not None:
             results["dependency_audit"]["security"] = security_audit
             results["dependency_audit"]["outdated"] = outdated
+            results["dependency_audit"]["commands"] = commands
+            if len(units) > 1 or units[0]["path"] != ".":
+                results["dependency_audit"]["units"] = [
+                    {"path": unit["path"], "package_manager": unit["package_manager"],
+                     "security": unit["security_audit"], "outdated": unit["outdated_packages"]}
+                    for unit in units
+                ]
+
+        if emit is not None:
+            for package in results["dependency_audit"].get("outdated", []):
+                emit({"type": "outdated", **package})
 
     # Run compliance scan
     if project_path and project_path.exists() and compliance_requirements:
-        compliance_results = scan_for_compliance_issues(project_path, compliance_requirements)
+        # Products that vendor the same files share analyses through the blob store
+        blobs = None
+        if use_blob_store:
+            blobs = BlobStore.open(
+                BLOB_STORE_PATH, rules_version(compliance_requirements),
+                max_bytes=blob_store_bytes or DEFAULT_BLOB_STORE_BYTES
+            )
+        compliance_results = scan_for_compliance_issues(
+            project_path, compliance_requirements, emit=emit, blobs=blobs
+        )
         results["compliance_scan"] = compliance_results
 
     # Generate recommendations
@@ -105,6 +130,12 @@ def run_health_check(
     # Generate growth opportunities
     results["growth_opportunities"] = identify_growth_opportunities(results)
 
+    if emit is not None:
+        for rec in results["recommendations"]:
+            emit({"type": "recommendation", **rec})
+        for opp in results["growth_opportunities"]:
+            emit({"type": "growth_opportunity", **opp})
+
     # Determine overall status
     results["overall_status"] = determine_overall_status(results)
 
@@ -177,7 +208,7 @@ def generate_recommendations(health_results: Dict) -> List[Dict]:
         findings = compliance.get("findings", {})
         for req_name, finding in findings.items():
             if finding.get("status") == "fail":
-                issue_count = len(finding.get("issues", []))
+                issue_count = finding.get("issue_count", len(finding.get("issues", [])))
                 recommendations.append({
                     "priority": "critical" if req_name == "HIPAA" else "high",
                     "action": f"Address {issue_count} {req_name} compliance issues",
@@ -204,7 +235,7 @@ def identify_growth_opportunities(health_results: Dict) -> List[Dict]:
     security = dep_audit.get("security", {})
     vulns = security.get("vulnerabilities", {}) if security else {}
 
-    total_vulns = sum(vulns.get(k, 0) for k in ["critical", "high", "moderate", "low"])
+    total_vulns = sum(vulns.get(k, 0) for k in ["critical", "high", "moderate", "low", "unknown"])
 
     if total_vulns == 0:
         opportunities.append({
@@ -314,7 +345,7 @@ def format_text_report(results: Dict) -> str:
 
         for req_name, finding in compliance.get("findings", {}).items():
             status = finding.get("status", "N/A")
-            issues = len(finding.get("issues", []))
+            issues = finding.get("issue_count", len(finding.get("issues", [])))
             lines.append(f"  {req_name}: {status.upper()} ({issues} issues)")
 
     # Recommendations
@@ -344,13 +375,36 @@ def format_text_report(results: Dict) -> str:
     return "\n".join(lines)
 
 
+def summary_record(results: Dict) -> Dict:
+    """Build the trailing jsonl record: the results with streamed lists counted.
+
+    Args:
+        results: Health check results produced with an emit callback
+
+    Returns:
+        Summary record
+    """
+    summary = {"type": "summary", **results}
+    summary["dependency_audit"] = dict(results.get("dependency_audit", {}))
+    if "outdated" in summary["dependency_audit"]:
+        summary["dependency_audit"]["outdated"] = len(summary["dependency_audit"]["outdated"])
+    summary["recommendations"] = len(results.get("recommendations", []))
+    summary["growth_opportunities"] = len(results.get("growth_opportunities", []))
+    return summary
+
+
 def main():
     parser = argparse.ArgumentParser(description="Product Health Check")
     parser.add_argument("product_id", nargs="?", help="Product ID from registry")
     parser.add_argument("--project-path", type=Path, help="Direct path to project")
     parser.add_argument("--requirements", nargs="+", help="Compliance requirements to check")
-    parser.add_argument("--output", choices=["text", "json"], default="text",
-                       help="Output format")
+    parser.add_argument("--output", choices=["text", "json", "jsonl"], default="text",
+                       help="Output format (jsonl streams one record per line, then a summary)")
+    parser.add_argument("--blob-store-mb", type=int, default=DEFAULT_BLOB_STORE_BYTES // (1024 * 1024),
+                       help="Size budget of the analysis store shared across projects "
+                            "(~/.smb-growth-agent/blob_store.sqlite)")
+    parser.add_argument("--no-blob-store", action="store_true",
+                       help="Do not reuse or record analyses in the shared store")
 
     args = parser.parse_args()
 
@@ -364,14 +418,19 @@ def main():
     results = run_health_check(
         product_id=args.product_id,
         project_path=project_path,
-        compliance_requirements=args.requirements
+        compliance_requirements=args.requirements,
+        emit=emit_jsonl if args.output == "jsonl" else None,
+        use_blob_store=not args.no_blob_store,
+        blob_store_bytes=args.blob_store_mb * 1024 * 1024
     )
 
     if "error" in results:
         print(f"Error: {results['error']}")
         sys.exit(1)
 
-    if args.output == "json":
+    if args.output == "jsonl":
+        emit_jsonl(summary_record(results))
+    elif args.output == "json":
         print(json.dumps(results, indent=2, default=str))
     else:
         print(format_text_report(results))
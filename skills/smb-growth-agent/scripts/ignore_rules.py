@@ -0,0 +1,306 @@
+#!/usr/bin/env python3
+"""Ignore Rules - Compile .gitignore files into fast path matchers.
+
+The compliance scanner's file walker uses these matchers to prune
+directories a project ignores (build output, coverage reports, vendored
+dependencies, Terraform state and the like) before descending into them.
+
+Each ignore file is compiled once: every pattern becomes an anchored
+regex, and all of a file's patterns are also joined into one combined
+regex so the common case - a path no pattern matches - costs a single
+match call. Git's precedence rules are kept: within a file the last
+matching pattern wins, a deeper .gitignore overrides the ones above it,
+and a "!" pattern re-includes a path an earlier pattern ignored.
+
+Parsed ignore files are cached per project and revalidated by size and
+mtime, so repeated walks of the same project (a health check followed by
+a compliance scan, or a scan re-run after each change) only re-parse the
+ignore files that changed.
+
+Usage:
+    from ignore_rules import project_ignore
+
+    ignore = project_ignore(Path("/path/to/project"))
+    if not ignore.is_ignored("dist/app.js"):
+        ...
+"""
+
+import os
+import re
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+
+IGNORE_FILE = ".gitignore"
+
+# Directories no project walk descends into, whatever the ignore files say:
+# dependencies, virtualenvs, VCS metadata and build output
+EXCLUDE_DIRS = {"node_modules", "venv", ".venv", "__pycache__", ".git", "dist", "build", ".next", ".terraform"}
+
+# A chain is the ignore files that apply inside one directory, shallowest
+# first, each paired with the path prefix (relative to the top of the
+# work tree, with a trailing slash) of the directory it sits in
+IgnoreChain = Tuple[Tuple[str, "IgnoreFile"], ...]
+
+
+def translate_pattern(pattern: str) -> str:
+    """Translate one gitignore glob (without its leading '/') into a regex.
+
+    '*' and '?' do not cross '/', '**' spans directories when it makes up
+    a whole path segment, bracket expressions never match '/', and a
+    backslash escapes the next character.
+    """
+    out = []
+    i, n = 0, len(pattern)
+    if pattern.startswith("**/"):
+        out.append("(?:.*/)?")
+        i = 3
+    while i < n:
+        c = pattern[i]
+        if c == "\\" and i + 1 < n:
+            out.append(re.escape(pattern[i + 1]))
+            i += 2
+        elif pattern.startswith("/**/", i):
+            out.append("/(?:.*/)?")
+            i += 4
+        elif pattern.startswith("/**", i) and i + 3 == n:
+            out.append("/.*")
+            i += 3
+        elif c == "*":
+            while i < n and pattern[i] == "*":
+                i += 1
+            out.append("[^/]*")
+        elif c == "?":
+            out.append("[^/]")
+            i += 1
+        elif c == "[":
+            j = i + 1
+            if j < n and pattern[j] in "!^":
+                j += 1
+            if j < n and pattern[j] == "]":
+                j += 1
+            while j < n and pattern[j] != "]":
+                j += 1
+            if j >= n:
+                out.append("\\[")
+                i += 1
+                continue
+            body = pattern[i + 1:j].replace("\\", "\\\\")
+            if body[0] in "!^":
+                body = "^" + body[1:]
+            out.append(f"(?!/)[{body}]")
+            i = j + 1
+        else:
+            out.append(re.escape(c))
+            i += 1
+    return "".join(out)
+
+
+def parse_ignore_line(line: str) -> Optional[Tuple[str, bool, bool]]:
+    """Parse one ignore file line.
+
+    Returns:
+        (regex, negate, dir_only) for a pattern line, None for blank lines
+        and comments
+    """
+    line = line.rstrip("\r\n")
+    # Trailing spaces are dropped unless escaped with a backslash
+    while line.endswith(" ") and not line.endswith("\\ "):
+        line = line[:-1]
+    if not line or line.startswith("#"):
+        return None
+
+    negate = line.startswith("!")
+    if negate:
+        line = line[1:]
+    dir_only = line.endswith("/")
+    line = line.rstrip("/")
+    if not line:
+        return None
+
+    # A slash anywhere but the end anchors the pattern to the ignore
+    # file's directory; otherwise it matches a name at any depth
+    anchored = "/" in line
+    regex = translate_pattern(line.lstrip("/"))
+    if not anchored:
+        regex = "(?:.*/)?" + regex
+    return regex, negate, dir_only
+
+
+class IgnoreFile:
+    """The compiled patterns of one ignore file."""
+
+    def __init__(self, lines: List[str]):
+        self.rules: List[Tuple["re.Pattern", bool, bool]] = []
+        sources = []
+        for line in lines:
+            parsed = parse_ignore_line(line)
+            if parsed is None:
+                continue
+            regex, negate, dir_only = parsed
+            try:
+                compiled = re.compile(regex, re.DOTALL)
+            except re.error:
+                # Git silently skips patterns it cannot parse
+                continue
+            self.rules.append((compiled, negate, dir_only))
+            sources.append((regex, dir_only))
+
+        self._any_dir = self._combine(regex for regex, _ in sources)
+        self._any_file = self._combine(regex for regex, dir_only in sources if not dir_only)
+
+    @staticmethod
+    def _combine(regexes) -> Optional["re.Pattern"]:
+        regexes = list(regexes)
+        if not regexes:
+            return None
+        return re.compile("|".join(f"(?:{regex})" for regex in regexes), re.DOTALL)
+
+    def match(self, rel_path: str, is_dir: bool) -> Optional[bool]:
+        """Decide whether a path relative to this file's directory is ignored.
+
+        Returns:
+            True if ignored, False if re-included by a '!' pattern, None if
+            no pattern in this file matches
+        """
+        combined = self._any_dir if is_dir else self._any_file
+        if combined is None or not combined.fullmatch(rel_path):
+            return None
+        for pattern, negate, dir_only in reversed(self.rules):
+            if dir_only and not is_dir:
+                continue
+            if pattern.fullmatch(rel_path):
+                return not negate
+        return None
+
+
+def find_work_tree_top(project_path: Path) -> Optional[Path]:
+    """Return the nearest directory at or above project_path holding .git."""
+    for directory in (project_path, *project_path.parents):
+        if (directory / ".git").exists():
+            return directory
+    return None
+
+
+class ProjectIgnore:
+    """Cached ignore files for one project, plus the chain matching logic.
+
+    Paths are matched relative to the top of the git work tree holding the
+    project, so .gitignore files above a project that is a subdirectory of
+    a repository apply too, as does the repository's .git/info/exclude.
+    Outside a work tree only the project's own ignore files are used.
+    """
+
+    def __init__(self, project_path: Path):
+        self.root = project_path
+        top = find_work_tree_top(project_path)
+        self.top = top or project_path
+        offset = project_path.relative_to(self.top).as_posix()
+        self.prefix = "" if offset == "." else offset + "/"
+        self.is_work_tree = top is not None
+        self._files: Dict[str, Tuple[Tuple[int, int], IgnoreFile]] = {}
+        self.parsed = 0
+        self.reused = 0
+        self.pruned_dirs = 0
+        self.ignored_files = 0
+
+    def load(self, path: str) -> Optional[IgnoreFile]:
+        """Return the compiled ignore file at path, re-parsing only if it changed."""
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        key = (stat.st_size, stat.st_mtime_ns)
+        cached = self._files.get(path)
+        if cached is not None and cached[0] == key:
+            self.reused += 1
+            return cached[1]
+        try:
+            with open(path, "r", encoding="utf-8", errors="replace") as f:
+                compiled = IgnoreFile(f.readlines())
+        except OSError:
+            return None
+        self._files[path] = (key, compiled)
+        self.parsed += 1
+        return compiled
+
+    def extend(self, chain: IgnoreChain, directory: str, rel_prefix: str) -> IgnoreChain:
+        """Add the ignore file in directory (if any) to a parent's chain."""
+        compiled = self.load(os.path.join(directory, IGNORE_FILE))
+        if compiled is None or not compiled.rules:
+            return chain
+        return chain + ((rel_prefix, compiled),)
+
+    def root_chain(self) -> IgnoreChain:
+        """Return the chain for the project root's parent directory.
+
+        Holds .git/info/exclude and every .gitignore between the top of the
+        work tree and the project root; the project root's own .gitignore
+        is added by the walk like any other directory's.
+        """
+        chain: IgnoreChain = ()
+        if not self.is_work_tree:
+            return chain
+        exclude = self.load(str(self.top / ".git" / "info" / "exclude"))
+        if exclude is not None and exclude.rules:
+            chain += (("", exclude),)
+        rel_prefix = ""
+        directory = self.top
+        for part in Path(self.prefix).parts:
+            chain = self.extend(chain, str(directory), rel_prefix)
+            directory = directory / part
+            rel_prefix += part + "/"
+        return chain
+
+    def ignored(self, chain: IgnoreChain, rel_path: str, is_dir: bool) -> bool:
+        """Decide a work-tree-relative path against a chain, deepest file first."""
+        for base, compiled in reversed(chain):
+            decision = compiled.match(rel_path[len(base):], is_dir)
+            if decision is not None:
+                if decision:
+                    if is_dir:
+                        self.pruned_dirs += 1
+                    else:
+                        self.ignored_files += 1
+                return decision
+        return False
+
+    def is_ignored(self, rel_path: str, is_dir: bool = False) -> bool:
+        """Decide a project-relative path, checking every parent directory.
+
+        A path under an ignored directory is ignored whatever its own
+        patterns say, just as the walk never descends into that directory.
+        """
+        parts = Path(rel_path).parts
+        chain = self.root_chain()
+        directory = self.root
+        rel_prefix = self.prefix
+        for index, part in enumerate(parts):
+            chain = self.extend(chain, str(directory), rel_prefix)
+            if self.ignored(chain, rel_prefix + part, is_dir or index < len(parts) - 1):
+                return True
+            directory = directory / part
+            rel_prefix += part + "/"
+        return False
+
+    def stats(self) -> Dict:
+        """Return parse, reuse and pruning counters."""
+        return {
+            "work_tree": str(self.top) if self.is_work_tree else None,
+            "ignore_files_parsed": self.parsed,
+            "ignore_files_reused": self.reused,
+            "dirs_pruned": self.pruned_dirs,
+            "files_ignored": self.ignored_files,
+        }
+
+
+# Ignore caches by resolved project path
+_project_ignores: Dict[str, ProjectIgnore] = {}
+
+
+def project_ignore(project_path: Path) -> ProjectIgnore:
+    """Return the ignore cache for a project, creating it on first use."""
+    key = str(project_path)
+    if key not in _project_ignores:
+        _project_ignores[key] = ProjectIgnore(project_path)
+    return _project_ignores[key]
@@ -0,0 +1,400 @@
+#!/usr/bin/env python3
+"""Lockfiles - Read a project's resolved dependencies without its toolchain.
+
+Parses the lockfiles of the package managers dependency_audit supports
+in-process, instead of asking npm or pip: package-lock.json (and
+npm-shrinkwrap.json), yarn.lock (classic and berry), pnpm-lock.yaml,
+poetry.lock, uv.lock, Pipfile.lock and pinned requirements.txt files.
+Every parser returns the same normalized set of (ecosystem, name, version)
+tuples, with OSV ecosystem names ("npm", "PyPI") and PEP 503 normalized
+Python package names, so audits and outdated checks can work from one
+dependency set whatever tool produced it.
+
+pnpm-lock.yaml and yarn.lock are read line by line (neither needs a YAML
+parser); the TOML lockfiles use the standard library's tomllib.
+
+Usage:
+    from lockfiles import resolve_dependencies
+
+    dependencies, lockfiles = resolve_dependencies(Path("/path/to/project"))
+    for ecosystem, name, version in sorted(dependencies):
+        print(ecosystem, name, version)
+"""
+
+import json
+import re
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+try:
+    import tomllib
+except ImportError:
+    tomllib = None
+
+
+NPM = "npm"
+PYPI = "PyPI"
+
+# (ecosystem, name, version)
+Dependency = Tuple[str, str, str]
+
+# Requirements files included with -r or -c, followed at most this deep
+MAX_INCLUDE_DEPTH = 5
+
+# Pre-release phases in version order; a final release sorts after all of
+# them and a post release after the final
+_PHASES = {"dev": 0, "a": 1, "alpha": 1, "b": 2, "beta": 2, "c": 3, "rc": 3, "pre": 3, "preview": 3}
+_FINAL = 4
+_POST = 5
+
+_PEP503 = re.compile(r"[-_.]+")
+_REQUIREMENT_PIN = re.compile(r"^([A-Za-z0-9][A-Za-z0-9._-]*)\s*(?:\[[^\]]*\])?\s*===?\s*([^\s;,#]+)")
+_REQUIREMENT_NAME = re.compile(r"^([A-Za-z0-9][A-Za-z0-9._-]*)")
+
+
+def normalize_name(ecosystem: str, name: str) -> str:
+    """Normalize a package name the way its registry compares names."""
+    if ecosystem == PYPI:
+        return _PEP503.sub("-", name).lower()
+    return name
+
+
+def version_key(version: str) -> Tuple:
+    """Return a sort key ordering semver and PEP 440 versions.
+
+    Handles epochs, any number of release components (1.0 == 1.0.0),
+    pre-releases (1.0.0-beta.2, 1.0rc1, dev releases) and post releases;
+    build metadata and local version labels are ignored.
+    """
+    text = version.strip().lower().lstrip("v").split("+")[0]
+    epoch = 0
+    if "!" in text:
+        prefix, text = text.split("!", 1)
+        epoch = int(prefix) if prefix.isdigit() else 0
+    match = re.match(r"(\d+(?:\.\d+)*)(.*)", text)
+    if not match:
+        return (epoch, (), 0, ())
+    release = tuple(int(part) for part in match.group(1).split("."))
+    while len(release) > 1 and release[-1] == 0:
+        release = release[:-1]
+    tokens = re.findall(r"[a-z]+|\d+", match.group(2))
+    if not tokens:
+        phase = _FINAL
+    elif tokens[0] in ("post", "rev", "r"):
+        phase = _POST
+    else:
+        # Unknown pre-release tags (semver "1.0.0-next.1") sort as alphas
+        phase = _PHASES.get(tokens[0], 1)
+    return (epoch, release, phase, tuple(int(token) for token in tokens if token.isdigit()))
+
+
+def _is_version(version: Optional[str]) -> bool:
+    # Git, file, link and workspace references are not registry versions
+    return bool(version) and version[0].isdigit()
+
+
+def _load_json(path: Path) -> Dict:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError) as e:
+        raise ValueError(f"Could not read {path}: {e}")
+    if not isinstance(data, dict):
+        raise ValueError(f"{path}: expected a JSON object")
+    return data
+
+
+def _load_toml(path: Path) -> Dict:
+    if tomllib is None:
+        raise ValueError(f"Python 3.11+ required to read {path.name}")
+    try:
+        with open(path, "rb") as f:
+            return tomllib.load(f)
+    except (OSError, tomllib.TOMLDecodeError) as e:
+        raise ValueError(f"Could not read {path}: {e}")
+
+
+def _read_lines(path: Path) -> List[str]:
+    try:
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            return f.read().splitlines()
+    except OSError as e:
+        raise ValueError(f"Could not read {path}: {e}")
+
+
+def parse_package_lock(path: Path) -> Set[Dependency]:
+    """Parse package-lock.json / npm-shrinkwrap.json (lockfile versions 1-3)."""
+    data = _load_json(path)
+    dependencies = set()
+
+    packages = data.get("packages")
+    if isinstance(packages, dict):
+        # v2/v3: one entry per installed folder; the root ("") and
+        # workspace folders are the project's own packages
+        for key, entry in packages.items():
+            if "node_modules/" not in key or not isinstance(entry, dict) or entry.get("link"):
+                continue
+            name = entry.get("name") or key.rsplit("node_modules/", 1)[1]
+            if _is_version(entry.get("version")):
+                dependencies.add((NPM, name, entry["version"]))
+        return dependencies
+
+    # v1: nested "dependencies" trees
+    stack = list((data.get("dependencies") or {}).items())
+    while stack:
+        name, entry = stack.pop()
+        if not isinstance(entry, dict):
+            continue
+        if _is_version(entry.get("version")):
+            dependencies.add((NPM, name, entry["version"]))
+        stack.extend((entry.get("dependencies") or {}).items())
+    return dependencies
+
+
+def _yarn_spec_name(spec: str) -> str:
+    # "@babel/core@^7.0.0" -> "@babel/core", "lodash@npm:^4.17.0" -> "lodash"
+    at = spec.find("@", 1)
+    return spec[:at] if at > 0 else spec
+
+
+def parse_yarn_lock(path: Path) -> Set[Dependency]:
+    """Parse yarn.lock, classic (v1) or berry (v2+)."""
+    dependencies = set()
+    name = None
+    for line in _read_lines(path):
+        if not line or line.startswith("#"):
+            continue
+        if not line[0].isspace():
+            # Entry header: one or more comma-separated specs
+            spec = line.rstrip(":").split(",")[0].strip().strip('"')
+            local = any(f"@{protocol}:" in line for protocol in ("workspace", "link", "portal", "file"))
+            name = None if spec == "__metadata" or local else _yarn_spec_name(spec)
+        elif name is not None and line.startswith("  version"):
+            # Classic: '  version "1.2.3"'; berry: '  version: 1.2.3'
+            version = line.strip()[len("version"):].lstrip(":").strip().strip('"')
+            if _is_version(version):
+                dependencies.add((NPM, name, version))
+            name = None
+    return dependencies
+
+
+def parse_pnpm_lock(path: Path) -> Set[Dependency]:
+    """Parse the packages section of pnpm-lock.yaml (lockfile v5 to v9)."""
+    dependencies = set()
+    in_packages = False
+    for line in _read_lines(path):
+        if not line or line.lstrip().startswith("#"):
+            continue
+        if not line[0].isspace():
+            in_packages = line.rstrip() == "packages:"
+            continue
+        if not in_packages or line[2:3].isspace() or not line.rstrip().endswith(":"):
+            continue
+
+        # v5 "/name/1.0.0_peer", v6 "/name@1.0.0(peer)", v9 "name@1.0.0"
+        key = line.strip().rstrip(":").strip("'\"").lstrip("/").split("(")[0]
+        at = key.find("@", 1)
+        name, version = key[:at], key[at + 1:]
+        if at < 0 or "/" in version or not _is_version(version):
+            name, _, version = key.rpartition("/")
+            version = version.split("_")[0]
+        if name and _is_version(version):
+            dependencies.add((NPM, name, version))
+    return dependencies
+
+
+def parse_poetry_lock(path: Path) -> Set[Dependency]:
+    """Parse poetry.lock."""
+    return {
+        (PYPI, normalize_name(PYPI, package["name"]), str(package["version"]))
+        for package in _load_toml(path).get("package", [])
+        if package.get("name") and _is_version(str(package.get("version", "")))
+    }
+
+
+def parse_uv_lock(path: Path) -> Set[Dependency]:
+    """Parse uv.lock, leaving out the project's own (editable or virtual) packages."""
+    dependencies = set()
+    for package in _load_toml(path).get("package", []):
+        source = package.get("source") or {}
+        if "editable" in source or "virtual" in source:
+            continue
+        if package.get("name") and _is_version(str(package.get("version", ""))):
+            dependencies.add((PYPI, normalize_name(PYPI, package["name"]), str(package["version"])))
+    return dependencies
+
+
+def parse_pipfile_lock(path: Path) -> Set[Dependency]:
+    """Parse Pipfile.lock (default and develop groups)."""
+    data = _load_json(path)
+    dependencies = set()
+    for group in ("default", "develop"):
+        for name, entry in (data.get(group) or {}).items():
+            version = str((entry or {}).get("version", "")).lstrip("=")
+            if _is_version(version):
+                dependencies.add((PYPI, normalize_name(PYPI, name), version))
+    return dependencies
+
+
+def _requirement_lines(path: Path, depth: int = 0, sources: Optional[List[Path]] = None) -> List[str]:
+    """Return the logical lines of a requirements file, following -r includes.
+
+    Files included with -c only constrain versions and add no lines; like
+    the -r includes they are appended to sources, after path itself.
+    """
+    if sources is not None:
+        sources.append(path)
+    lines = []
+    pending = ""
+    for raw in _read_lines(path):
+        line = raw.split(" #", 1)[0].strip() if not raw.lstrip().startswith("#") else ""
+        if line.endswith("\\"):
+            pending += line[:-1] + " "
+            continue
+        line, pending = (pending + line).strip(), ""
+        if not line:
+            continue
+        match = re.match(r"^(-r|--requirement|-c|--constraint)[\s=]+(\S+)", line)
+        if match:
+            if depth < MAX_INCLUDE_DEPTH:
+                included = _requirement_lines(path.parent / match.group(2), depth + 1, sources)
+                if match.group(1) in ("-r", "--requirement"):
+                    lines.extend(included)
+            continue
+        lines.append(line)
+    return lines
+
+
+def parse_requirements(path: Path) -> Set[Dependency]:
+    """Parse the pinned (== or ===) requirements of a requirements.txt.
+
+    Ranges and unpinned names do not resolve to a version and are left
+    out; options, URLs and editable installs are ignored.
+    """
+    dependencies = set()
+    for line in _requirement_lines(path):
+        match = _REQUIREMENT_PIN.match(line)
+        if match and _is_version(match.group(2)):
+            dependencies.add((PYPI, normalize_name(PYPI, match.group(1)), match.group(2)))
+    return dependencies
+
+
+# Lockfile name -> parser, in the order resolve_dependencies tries them
+LOCKFILE_PARSERS: Dict[str, Callable[[Path], Set[Dependency]]] = {
+    "package-lock.json": parse_package_lock,
+    "npm-shrinkwrap.json": parse_package_lock,
+    "yarn.lock": parse_yarn_lock,
+    "pnpm-lock.yaml": parse_pnpm_lock,
+    "uv.lock": parse_uv_lock,
+    "poetry.lock": parse_poetry_lock,
+    "Pipfile.lock": parse_pipfile_lock,
+    "requirements.txt": parse_requirements,
+}
+
+
+def parse_lockfile(path: Path) -> Set[Dependency]:
+    """Parse one lockfile by its file name.
+
+    Raises:
+        ValueError: If the file name is not a known lockfile or the file is malformed
+    """
+    parser = LOCKFILE_PARSERS.get(path.name)
+    if parser is None:
+        raise ValueError(f"Unsupported lockfile: {path.name}")
+    try:
+        return parser(path)
+    except (KeyError, TypeError, AttributeError) as e:
+        raise ValueError(f"Malformed lockfile {path}: {e}")
+
+
+def lockfile_sources(path: Path) -> List[Path]:
+    """Return every file a lockfile's contents come from.
+
+    That is the lockfile itself, plus for a requirements.txt the files it
+    includes with -r or -c.
+
+    Raises:
+        ValueError: If the lockfile or one of its includes cannot be read
+    """
+    if path.name != "requirements.txt":
+        return [path]
+    sources: List[Path] = []
+    _requirement_lines(path, sources=sources)
+    return list(dict.fromkeys(sources))
+
+
+def find_lockfiles(project_path: Path) -> List[Path]:
+    """Return the lockfiles in a project directory, in LOCKFILE_PARSERS order."""
+    return [project_path / name for name in LOCKFILE_PARSERS if (project_path / name).is_file()]
+
+
+def resolve_dependencies(project_path: Path) -> Tuple[Set[Dependency], List[Path]]:
+    """Return the union of the dependencies in a project's lockfiles.
+
+    Returns:
+        (dependency set, lockfiles read)
+
+    Raises:
+        ValueError: If a lockfile is malformed
+    """
+    lockfiles = find_lockfiles(project_path)
+    dependencies: Set[Dependency] = set()
+    for path in lockfiles:
+        dependencies |= parse_lockfile(path)
+    return dependencies, lockfiles
+
+
+def direct_dependencies(project_path: Path) -> Dict[Tuple[str, str], str]:
+    """Return the dependencies a project declares itself, from its manifests.
+
+    Reads package.json, pyproject.toml (PEP 621 and Poetry tables),
+    Pipfile and requirements.txt.
+
+    Returns:
+        (ecosystem, normalized name) -> dependency type, e.g.
+        'dependencies' or 'devDependencies'; unreadable manifests are skipped
+    """
+    declared: Dict[Tuple[str, str], str] = {}
+
+    try:
+        package = _load_json(project_path / "package.json") if (project_path / "package.json").is_file() else {}
+    except ValueError:
+        package = {}
+    for group in ("dependencies", "devDependencies", "optionalDependencies"):
+        for name in package.get(group) or {}:
+            declared.setdefault((NPM, name), group)
+
+    def add_python(names, group: str) -> None:
+        for spec in names:
+            if "://" in spec:
+                continue
+            match = _REQUIREMENT_NAME.match(spec.strip())
+            if match and match.group(1).lower() != "python":
+                declared.setdefault((PYPI, normalize_name(PYPI, match.group(1))), group)
+
+    for manifest in ("pyproject.toml", "Pipfile"):
+        if not (project_path / manifest).is_file():
+            continue
+        try:
+            data = _load_toml(project_path / manifest)
+        except ValueError:
+            continue
+        if manifest == "Pipfile":
+            add_python(data.get("packages") or {}, "dependencies")
+            add_python(data.get("dev-packages") or {}, "devDependencies")
+            continue
+        project = data.get("project") or {}
+        add_python(project.get("dependencies") or [], "dependencies")
+        for extra in (project.get("optional-dependencies") or {}).values():
+            add_python(extra, "optionalDependencies")
+        poetry = (data.get("tool") or {}).get("poetry") or {}
+        add_python(poetry.get("dependencies") or {}, "dependencies")
+        for group in (poetry.get("group") or {}).values():
+            add_python(group.get("dependencies") or {}, "devDependencies")
+
+    if (project_path / "requirements.txt").is_file():
+        try:
+            add_python(_requirement_lines(project_path / "requirements.txt"), "dependencies")
+        except ValueError:
+            pass
+    return declared
@@ -0,0 +1,462 @@
+#!/usr/bin/env python3
+"""Rule Engine - Match many compliance rules against a file in one pass.
+
+Rules are plain dicts with at least an "id" and a regex "pattern", and
+optionally "keywords": literals of which every match contains at least one
+(derived from the pattern when absent). The engine compiles every rule into
+a single combined regex and attributes each hit back to its rule, instead
+of running one re.search per rule per file.
+
+Patterns are compiled as bytes and run directly on raw file content (bytes
+or an mmap), so nothing is decoded or lowercased first. Matching is
+case-insensitive for ASCII, and patterns must not span lines.
+
+Usage:
+    from rule_engine import RuleEngine
+
+    engine = RuleEngine(rules)
+    for rule in engine.matched_rules(content_bytes):
+        print(rule["id"])
+"""
+
+import bisect
+import re
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+
+# Quantifiers that may follow a leading atom
+_QUANTIFIER = re.compile(r'\{(\d+)(?:,(\d*))?\}|\+')
+
+_NEWLINE = re.compile(rb"\n")
+
+# Any quantifier, including a lazy/possessive suffix
+_ANY_QUANTIFIER = re.compile(r'(?:[*+?]|\{(\d*)(?:,\d*)?\})[?+]?')
+
+# Shortest literal worth gating a rule on
+MIN_KEYWORD_LENGTH = 3
+
+# Lowercased block size when searching memory-mapped content for keywords
+KEYWORD_BLOCK_BYTES = 4 * 1024 * 1024
+
+# Keyword windows closer than this are matched as one span
+WINDOW_GAP_BYTES = 4096
+
+
+def split_alternatives(pattern: str) -> List[str]:
+    """Split a regex on its top-level '|' operators.
+
+    Escapes, character classes and groups are respected, so only
+    alternatives that apply to the whole pattern are separated.
+    """
+    parts = []
+    depth = 0
+    in_class = False
+    start = 0
+    i = 0
+
+    while i < len(pattern):
+        char = pattern[i]
+        if char == "\\":
+            i += 2
+            continue
+        if in_class:
+            if char == "]":
+                in_class = False
+        elif char == "[":
+            in_class = True
+            # A ']' straight after '[' or '[^' is a literal
+            if pattern[i + 1:i + 2] == "^":
+                i += 1
+            if pattern[i + 1:i + 2] == "]":
+                i += 1
+        elif char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+        elif char == "|" and depth == 0:
+            parts.append(pattern[start:i])
+            start = i + 1
+        i += 1
+
+    parts.append(pattern[start:])
+    return parts
+
+
+def _skip_bracketed(pattern: str, i: int) -> int:
+    """Return the index just past the group or class starting at pattern[i]."""
+    depth = 0
+    in_class = False
+    while i < len(pattern):
+        char = pattern[i]
+        if char == "\\":
+            i += 2
+            continue
+        if in_class:
+            if char == "]":
+                in_class = False
+                if depth == 0:
+                    return i + 1
+        elif char == "[":
+            in_class = True
+            if pattern[i + 1:i + 2] == "^":
+                i += 1
+            if pattern[i + 1:i + 2] == "]":
+                i += 1
+        elif char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+            if depth == 0:
+                return i + 1
+        i += 1
+    return i
+
+
+def required_literal(alternative: str) -> Optional[str]:
+    """Return the longest literal every match of alternative must contain.
+
+    Only top-level literal runs count: groups, classes, escapes such as \\d
+    and optional atoms end a run. The literal is lowercased for matching
+    against lowercased content.
+
+    Returns:
+        Lowercase ASCII literal of at least MIN_KEYWORD_LENGTH characters,
+        or None if the alternative has none
+    """
+    runs = []
+    current = ""
+    i = 0
+
+    while i < len(alternative):
+        char = alternative[i]
+        if char == "\\":
+            escaped = alternative[i + 1:i + 2]
+            i += 2
+            if escaped and not escaped.isalnum():
+                current += escaped
+                continue
+            runs.append(current)
+            current = ""
+            continue
+        if char in "([":
+            runs.append(current)
+            current = ""
+            i = _skip_bracketed(alternative, i)
+            continue
+
+        quantifier = _ANY_QUANTIFIER.match(alternative, i)
+        if quantifier:
+            # The quantified atom is only required if it must repeat
+            low = quantifier.group(1)
+            optional = quantifier.group(0)[0] in "*?" or (low is not None and low in ("", "0"))
+            if optional:
+                current = current[:-1]
+            runs.append(current)
+            current = ""
+            i = quantifier.end()
+            continue
+
+        if char in ".^$":
+            runs.append(current)
+            current = ""
+        else:
+            current += char
+        i += 1
+
+    runs.append(current)
+    best = max(runs, key=len).lower()
+    if len(best) < MIN_KEYWORD_LENGTH or not best.isascii():
+        return None
+    return best
+
+
+def _leading_literal(alternative: str) -> Optional[Tuple[List[str], str]]:
+    """Split an alternative into its possible first characters and the rest.
+
+    Only simple heads are understood: an optional \\b followed by a word
+    character, an escaped punctuation character or \\d. The returned rest,
+    appended to any of the returned characters, matches exactly what the
+    alternative matched.
+
+    Returns:
+        (first characters, rest of pattern), or None if the head is not simple
+    """
+    boundary = alternative.startswith(r"\b")
+    body = alternative[2:] if boundary else alternative
+
+    if body.startswith(r"\d"):
+        atom, chars = r"\d", list("0123456789")
+    elif body[:1] == "\\" and len(body) > 1 and not body[1].isalnum():
+        atom, chars = body[:2], [body[1]]
+    elif body[:1].isascii() and (body[:1].isalnum() or body[:1] == "_"):
+        atom, chars = body[0], sorted({body[0].lower(), body[0].upper()})
+    else:
+        return None
+
+    rest = body[len(atom):]
+
+    # Peel one repetition off a quantified head: \d{4} -> \d + \d{3}
+    quantifier = _QUANTIFIER.match(rest)
+    if quantifier:
+        if quantifier.group(0) == "+":
+            rest = atom + "*" + rest[1:]
+        else:
+            low = int(quantifier.group(1))
+            if low < 1:
+                return None
+            high = quantifier.group(2)
+            if high is None:
+                repeat = f"{{{low - 1}}}"
+            elif high == "":
+                repeat = f"{{{low - 1},}}"
+            else:
+                repeat = f"{{{low - 1},{int(high) - 1}}}"
+            rest = atom + repeat + rest[quantifier.end():]
+    elif rest[:1] in ("*", "?"):
+        return None
+
+    if boundary:
+        # \b before the head, checked once the head has been consumed
+        head_is_word = re.match(r"\w", chars[0]) is not None
+        rest = (r"(?<!\w.)" if head_is_word else r"(?<=\w.)") + rest
+
+    return chars, rest
+
+
+class LineIndex:
+    """Maps byte offsets in content to 1-based (line, column) positions.
+
+    Newline offsets are collected once, up to the last offset that will be
+    looked up, and each lookup is a bisect, so locating many matches in a
+    large file does not recount newlines per match. Columns are byte
+    offsets within the line.
+    """
+
+    def __init__(self, content, upto: Optional[int] = None):
+        end = len(content) if upto is None else min(upto, len(content))
+        self._newlines = [match.start() for match in _NEWLINE.finditer(content, 0, end)]
+
+    def locate(self, offset: int) -> Tuple[int, int]:
+        """Return (line, column) of a byte offset, both 1-based."""
+        line = bisect.bisect_left(self._newlines, offset)
+        line_start = self._newlines[line - 1] + 1 if line else 0
+        return line + 1, offset - line_start + 1
+
+
+class KeywordPrefilter:
+    """Finds where any of a set of literal keywords occurs, case-insensitively.
+
+    Content is lowercased once (in blocks for memory-mapped files) and each
+    keyword is located with bytes.find, which runs in C far faster than a
+    regex alternation of the same literals or a pure-Python automaton.
+    """
+
+    def __init__(self, keywords: List[str]):
+        self.keywords = sorted({k.lower().encode("ascii") for k in keywords})
+        self._overlap = max((len(k) for k in self.keywords), default=1) - 1
+
+    def _lowered_blocks(self, content) -> Iterator[Tuple[int, bytes, int]]:
+        """Yield (offset, lowercased block, owned length) covering content."""
+        if isinstance(content, (bytes, bytearray)):
+            yield 0, content.lower(), len(content)
+            return
+        size = len(content)
+        for offset in range(0, size, KEYWORD_BLOCK_BYTES):
+            # Blocks overlap so keywords straddling a boundary are found
+            block = content[offset:offset + KEYWORD_BLOCK_BYTES + self._overlap].lower()
+            yield offset, block, min(KEYWORD_BLOCK_BYTES, size - offset)
+
+    def find(self, content) -> Dict[bytes, List[int]]:
+        """Return the offsets of every occurrence of each keyword present."""
+        hits: Dict[bytes, List[int]] = {}
+        for offset, block, owned in self._lowered_blocks(content):
+            for keyword in self.keywords:
+                pos = block.find(keyword)
+                while pos != -1 and pos < owned:
+                    hits.setdefault(keyword, []).append(offset + pos)
+                    pos = block.find(keyword, pos + 1)
+        return hits
+
+
+class RuleEngine:
+    """Compiled single-pass matcher for a list of rule dicts.
+
+    Each top-level alternative of each rule becomes one branch of a combined
+    regex. Branches that start with a literal character are factored as
+    ``c(?:(?P<gN>(?i:rest))|...)`` so the regex keeps a first-character
+    prefilter and skips most positions in C; the named group identifies the
+    rule. Anything else goes into a second combined regex that is only run
+    when such rules exist.
+
+    Rules whose every alternative contains a required literal keyword
+    (``patient``, ``password``, ``stripe``...) are keyword-gated: a
+    KeywordPrefilter locates the keywords first and their combined regex
+    only runs on the lines around keyword hits, so files without any
+    keyword skip regex matching for those rules altogether. Rules without
+    such a literal (e.g. the card number pattern) scan the whole file.
+
+    Hits can hide one another inside the combined scan (the regex engine
+    does not report overlapping matches), so rules that did not fire are
+    re-checked on just the lines that produced hits, which keeps the result
+    identical to running each rule's re.search on its own.
+    """
+
+    def __init__(self, rules: List[Dict]):
+        self.rules = list(rules)
+        self._patterns = [re.compile(rule["pattern"].encode("utf-8"), re.IGNORECASE) for rule in self.rules]
+        self._group_rule: Dict[str, int] = {}
+
+        gated = []
+        ungated = []
+        self._rule_keywords: Dict[int, Set[bytes]] = {}
+        for index, rule in enumerate(self.rules):
+            keywords = rule.get("keywords") or [required_literal(a) for a in split_alternatives(rule["pattern"])]
+            if all(keywords):
+                self._rule_keywords[index] = {k.encode("ascii") for k in keywords}
+                gated.append(index)
+            else:
+                ungated.append(index)
+
+        self._prefilter = None
+        if gated:
+            self._prefilter = KeywordPrefilter([k.decode("ascii") for i in gated for k in self._rule_keywords[i]])
+        self._gated = self._compile(gated)
+        self._ungated = self._compile(ungated)
+
+    def _compile(self, indexes: List[int]) -> List["re.Pattern"]:
+        """Build the combined regexes for a subset of rules."""
+        # Branches sharing a first character are factored under it
+        fast_branches: Dict[str, List[str]] = {}
+        slow_branches = []
+        for index in indexes:
+            rule = self.rules[index]
+            for alternative in split_alternatives(rule["pattern"]):
+                split = _leading_literal(alternative)
+                if split:
+                    chars, rest = split
+                    for char in chars:
+                        name = self._group_name(index)
+                        fast_branches.setdefault(char, []).append(f"(?P<{name}>(?i:{rest}))")
+                else:
+                    name = self._group_name(index)
+                    slow_branches.append(f"(?P<{name}>(?i:{alternative}))")
+
+        combined = []
+        if fast_branches:
+            combined.append("|".join(
+                f"{re.escape(char)}(?:{'|'.join(branches)})"
+                for char, branches in fast_branches.items()
+            ))
+        if slow_branches:
+            combined.append("|".join(slow_branches))
+        return [re.compile(pattern.encode("utf-8")) for pattern in combined]
+
+    def _group_name(self, rule_index: int) -> str:
+        name = f"g{len(self._group_rule)}"
+        self._group_rule[name] = rule_index
+        return name
+
+    def matched_rules(self, content) -> List[Dict]:
+        """Return the rules that match anywhere in content, in rule order.
+
+        Args:
+            content: Raw file content as bytes, bytearray or mmap
+        """
+        fired, _ = self._fire(content)
+        return [self.rules[index] for index in sorted(fired)]
+
+    def occurrences(self, content, limit: int = 0) -> List[Tuple[Dict, List[int]]]:
+        """Return every match offset of every rule that matches content.
+
+        Only rules that fired are searched again, each with its own pattern
+        and, for keyword-gated rules, only on the keyword windows.
+
+        Args:
+            content: Raw file content as bytes, bytearray or mmap
+            limit: Maximum offsets per rule (0 = all)
+
+        Returns:
+            (rule, ascending match start offsets) pairs in rule order
+        """
+        fired, gated_spans = self._fire(content)
+        full = [(0, len(content))]
+
+        results = []
+        for index in sorted(fired):
+            pattern = self._patterns[index]
+            offsets = []
+            for start, end in (gated_spans if index in self._rule_keywords else full):
+                for match in pattern.finditer(content, start, end):
+                    offsets.append(match.start())
+                    if len(offsets) == limit:
+                        break
+                if len(offsets) == limit:
+                    break
+            results.append((self.rules[index], offsets))
+        return results
+
+    def _fire(self, content) -> Tuple[Set[int], List[Tuple[int, int]]]:
+        """Return the indexes of rules that match and the keyword windows."""
+        fired = set()
+        hit_lines = []
+        candidates = set(range(len(self.rules))) - set(self._rule_keywords)
+
+        for combined in self._ungated:
+            self._scan(combined, content, [(0, len(content))], fired, hit_lines)
+
+        spans = []
+        if self._prefilter is not None:
+            hits = self._prefilter.find(content)
+            if hits:
+                candidates.update(
+                    index for index, keywords in self._rule_keywords.items()
+                    if not keywords.isdisjoint(hits)
+                )
+                spans = self._keyword_windows(content, hits)
+                for combined in self._gated:
+                    self._scan(combined, content, spans, fired, hit_lines)
+
+        # Recover rules shadowed by an overlapping hit on the same line
+        if hit_lines and len(fired) < len(candidates):
+            for index, pattern in enumerate(self._patterns):
+                if index in fired or index not in candidates:
+                    continue
+                for start, end in hit_lines:
+                    if pattern.search(content, start, end):
+                        fired.add(index)
+                        break
+
+        return fired, spans
+
+    def _scan(self, combined: "re.Pattern", content, spans, fired: Set[int], hit_lines: List) -> None:
+        """Run one combined regex over spans, recording rules and hit lines."""
+        line_end = -1
+        for start, end in spans:
+            for match in combined.finditer(content, start, end):
+                fired.add(self._group_rule[match.lastgroup])
+                if match.start() > line_end:
+                    line_start = content.rfind(b"\n", 0, match.start()) + 1
+                    line_end = content.find(b"\n", match.end())
+                    if line_end == -1:
+                        line_end = len(content)
+                    hit_lines.append((line_start, line_end))
+
+    @staticmethod
+    def _keyword_windows(content, hits: Dict[bytes, List[int]]) -> List[Tuple[int, int]]:
+        """Return merged line spans around every keyword occurrence.
+
+        Rules do not match across lines, so a gated rule can only match on a
+        line containing one of its keywords.
+        """
+        size = len(content)
+        spans = []
+        for pos in sorted(p for offsets in hits.values() for p in offsets):
+            if spans and pos < spans[-1][1] + WINDOW_GAP_BYTES:
+                if pos >= spans[-1][1]:
+                    end = content.find(b"\n", pos)
+                    spans[-1][1] = size if end == -1 else end
+                continue
+            start = content.rfind(b"\n", 0, pos) + 1
+            end = content.find(b"\n", pos)
+            spans.append([start, size if end == -1 else end])
+        return [(start, end) for start, end in spans]
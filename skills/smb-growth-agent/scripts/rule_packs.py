@@ -0,0 +1,306 @@
+#!/usr/bin/env python3
+"""Rule Packs - Load declarative compliance rule packs from YAML.
+
+A rule pack is a YAML file describing one compliance requirement: its name
+and command-line aliases, the recommendations to give when it finds
+something, and the content rules the compliance scanner matches. The
+built-in packs live in references/compliance/rules; extra directories (for
+state privacy laws or in-house policies) can be added without touching
+code.
+
+Parsing and validating YAML (including compiling every pattern once to
+reject bad regexes) is the slow part of loading, so the validated packs
+are cached on disk as JSON under ~/.smb-growth-agent/rule_cache, keyed by a
+hash of every pack file's name and bytes. Editing, adding or removing a
+pack changes the key; an unchanged set loads from the cache without
+importing or running the YAML parser.
+
+The built-in packs also ship pre-parsed in builtin-packs.json next to
+them, each entry checked against its YAML file's hash, so the scanner
+runs on the standard library alone: PyYAML is only needed for extra pack
+directories, or after editing a built-in pack until builtin-packs.json is
+rebuilt.
+
+Usage:
+    from rule_packs import load_rule_packs
+
+    packs = load_rule_packs([Path("my-rules")])
+    for pack in packs:
+        print(pack["requirement"], len(pack["rules"]))
+
+    python rule_packs.py build    # Rebuild builtin-packs.json after editing a built-in pack
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional
+
+try:
+    import yaml
+except ImportError:
+    yaml = None
+
+from scan_cache import CACHE_DIR
+
+
+# Built-in packs shipped with the skill
+RULE_PACK_DIR = Path(__file__).parent.parent / "references" / "compliance" / "rules"
+RULE_CACHE_DIR = CACHE_DIR / "rule_cache"
+# The built-in packs pre-parsed, so loading them needs no YAML parser
+BUILTIN_PACKS_PATH = RULE_PACK_DIR / "builtin-packs.json"
+
+# Bump when the cached pack layout changes
+PACK_FORMAT = 1
+
+RULE_LEVELS = ("issue", "warning")
+RULE_BUCKETS = ("code", "html", "config")
+RULE_SCOPES = ("file", "project")
+RECOMMEND_ON = ("findings", "issues")
+
+
+def find_pack_files(pack_dirs: List[Path]) -> List[Path]:
+    """Return the .yaml/.yml files in pack_dirs, in directory then name order."""
+    files = []
+    for pack_dir in pack_dirs:
+        if not pack_dir.is_dir():
+            raise ValueError(f"Rule pack directory not found: {pack_dir}")
+        files.extend(sorted(
+            p for p in pack_dir.iterdir()
+            if p.suffix in (".yaml", ".yml") and p.is_file()
+        ))
+    return files
+
+
+def packs_digest(pack_files: List[Path]) -> str:
+    """Hash the names and contents of a list of pack files."""
+    digest = hashlib.sha256(f"format:{PACK_FORMAT}".encode("utf-8"))
+    for path in pack_files:
+        digest.update(b"\0" + str(path.resolve()).encode("utf-8") + b"\0")
+        digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+def parse_pack(path: Path) -> Dict:
+    """Parse and validate one YAML rule pack.
+
+    Returns:
+        Pack dict with requirement, aliases, recommendations, recommend_on,
+        source and rules; each rule carries its requirement, defaults for
+        bucket and scope, and its lowercased keywords if the pack gives any
+
+    Raises:
+        ValueError: If PyYAML is missing or the pack is malformed
+    """
+    if yaml is None:
+        raise ValueError(f"PyYAML required to load rule pack {path}. Install with: pip install pyyaml")
+
+    try:
+        with open(path, "r") as f:
+            data = yaml.safe_load(f)
+    except (OSError, yaml.YAMLError) as e:
+        raise ValueError(f"Could not read rule pack {path}: {e}")
+
+    if not isinstance(data, dict) or not data.get("requirement"):
+        raise ValueError(f"Rule pack {path} must define a 'requirement'")
+
+    requirement = str(data["requirement"]).upper()
+    recommend_on = data.get("recommend_on", "findings")
+    if recommend_on not in RECOMMEND_ON:
+        raise ValueError(f"{path}: recommend_on must be one of {', '.join(RECOMMEND_ON)}")
+
+    rules = []
+    for index, raw in enumerate(data.get("rules") or []):
+        where = f"{path}: rule {raw.get('id', index) if isinstance(raw, dict) else index}"
+        if not isinstance(raw, dict):
+            raise ValueError(f"{where} must be a mapping")
+        for key in ("id", "level", "severity", "message", "pattern"):
+            if not raw.get(key):
+                raise ValueError(f"{where} is missing '{key}'")
+
+        rule = {
+            "id": str(raw["id"]),
+            "requirement": requirement,
+            "bucket": raw.get("bucket", "code"),
+            "level": raw["level"],
+            "severity": str(raw["severity"]),
+            "message": str(raw["message"]),
+            "pattern": str(raw["pattern"]),
+            "scope": raw.get("scope", "file"),
+        }
+        if rule["level"] not in RULE_LEVELS:
+            raise ValueError(f"{where}: level must be one of {', '.join(RULE_LEVELS)}")
+        if rule["bucket"] not in RULE_BUCKETS:
+            raise ValueError(f"{where}: bucket must be one of {', '.join(RULE_BUCKETS)}")
+        if rule["scope"] not in RULE_SCOPES:
+            raise ValueError(f"{where}: scope must be one of {', '.join(RULE_SCOPES)}")
+        try:
+            re.compile(rule["pattern"].encode("utf-8"), re.IGNORECASE)
+        except re.error as e:
+            raise ValueError(f"{where}: invalid pattern: {e}")
+        if raw.get("keywords") is not None:
+            keywords = raw["keywords"]
+            if not isinstance(keywords, list) or not all(isinstance(k, str) and k.isascii() and k for k in keywords):
+                raise ValueError(f"{where}: keywords must be a list of non-empty ASCII strings")
+            rule["keywords"] = sorted({k.lower() for k in keywords})
+        rules.append(rule)
+
+    return {
+        "requirement": requirement,
+        "aliases": sorted({requirement} | {str(a).upper() for a in data.get("aliases") or []}),
+        "recommend_on": recommend_on,
+        "recommendations": [str(r) for r in data.get("recommendations") or []],
+        "source": str(path),
+        "rules": rules,
+    }
+
+
+def builtin_pack(path: Path) -> Optional[Dict]:
+    """Return a built-in pack from builtin-packs.json, if it matches the YAML file.
+
+    Returns:
+        The pack as parse_pack would return it, or None if path is not a
+        built-in pack or was edited since builtin-packs.json was built
+    """
+    if path.parent.resolve() != RULE_PACK_DIR.resolve():
+        return None
+    try:
+        with open(BUILTIN_PACKS_PATH, "r") as f:
+            data = json.load(f)
+        entry = data["packs"][path.name] if data.get("format") == PACK_FORMAT else None
+        content = path.read_bytes()
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+    if entry is None or entry.get("sha256") != hashlib.sha256(content).hexdigest():
+        return None
+    return {**entry["pack"], "source": str(path)}
+
+
+def build_builtin_packs() -> Dict:
+    """Parse the built-in packs and write them to builtin-packs.json.
+
+    Returns:
+        Dict of pack file name -> number of rules
+
+    Raises:
+        ValueError: If PyYAML is missing or a pack is malformed
+    """
+    packs = {}
+    for path in find_pack_files([RULE_PACK_DIR]):
+        pack = parse_pack(path)
+        packs[path.name] = {
+            "sha256": hashlib.sha256(path.read_bytes()).hexdigest(),
+            "pack": {**pack, "source": path.name},
+        }
+    with open(BUILTIN_PACKS_PATH, "w") as f:
+        json.dump({"format": PACK_FORMAT, "packs": packs}, f, indent=2)
+        f.write("\n")
+    return {name: len(entry["pack"]["rules"]) for name, entry in packs.items()}
+
+
+def merge_packs(packs: List[Dict]) -> List[Dict]:
+    """Combine packs for the same requirement, in load order.
+
+    Later packs add rules, aliases and recommendations to an earlier pack
+    for the same requirement, so a state pack can extend a built-in one.
+
+    Raises:
+        ValueError: If two rules share an id
+    """
+    merged: Dict[str, Dict] = {}
+    seen_ids: Dict[str, str] = {}
+
+    for pack in packs:
+        for rule in pack["rules"]:
+            if rule["id"] in seen_ids:
+                raise ValueError(
+                    f"Duplicate rule id '{rule['id']}' in {pack['source']} "
+                    f"(already defined in {seen_ids[rule['id']]})"
+                )
+            seen_ids[rule["id"]] = pack["source"]
+
+        base = merged.get(pack["requirement"])
+        if base is None:
+            merged[pack["requirement"]] = {**pack, "rules": list(pack["rules"])}
+            continue
+        base["aliases"] = sorted(set(base["aliases"]) | set(pack["aliases"]))
+        base["recommendations"] += [r for r in pack["recommendations"] if r not in base["recommendations"]]
+        base["rules"] += pack["rules"]
+        base["source"] += f", {pack['source']}"
+
+    return list(merged.values())
+
+
+def load_rule_packs(
+    pack_dirs: Optional[List[Path]] = None,
+    cache_dir: Optional[Path] = RULE_CACHE_DIR
+) -> List[Dict]:
+    """Load, validate and merge rule packs, through the on-disk cache.
+
+    Args:
+        pack_dirs: Extra pack directories, loaded after the built-in packs
+        cache_dir: Where validated packs are cached (None disables caching)
+
+    Returns:
+        Merged packs in load order
+
+    Raises:
+        ValueError: If a directory is missing or a pack is malformed
+    """
+    pack_files = find_pack_files([RULE_PACK_DIR] + list(pack_dirs or []))
+    key = packs_digest(pack_files)
+    cache_path = cache_dir / f"{key[:32]}.json" if cache_dir else None
+
+    if cache_path is not None:
+        try:
+            with open(cache_path, "r") as f:
+                data = json.load(f)
+            if data.get("format") == PACK_FORMAT and data.get("key") == key:
+                return data["packs"]
+        except (OSError, ValueError):
+            pass
+
+    packs = merge_packs([builtin_pack(path) or parse_pack(path) for path in pack_files])
+
+    if cache_path is not None:
+        # A read-only home directory only costs the next run a re-parse
+        try:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.tmp")
+            with open(tmp_path, "w") as f:
+                json.dump({"format": PACK_FORMAT, "key": key, "packs": packs}, f)
+            os.replace(tmp_path, cache_path)
+        except OSError:
+            pass
+
+    return packs
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compliance rule packs")
+    subparsers = parser.add_subparsers(dest="command", help="Commands")
+    subparsers.add_parser("build", help="Rebuild builtin-packs.json from the built-in YAML packs")
+
+    args = parser.parse_args()
+
+    if not args.command:
+        parser.print_help()
+        sys.exit(1)
+
+    if args.command == "build":
+        try:
+            counts = build_builtin_packs()
+        except ValueError as e:
+            print(f"Error: {e}")
+            sys.exit(1)
+        for name, rules in counts.items():
+            print(f"{name}: {rules} rules")
+        print(f"Wrote {BUILTIN_PACKS_PATH}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,403 @@
+#!/usr/bin/env python3
+"""Scan Cache - Persist per-file compliance analysis between scans.
+
+A manifest maps each scanned file's fingerprint (path, size, mtime and
+content hash) to the analysis the compliance scanner produced for it, under
+a rules version. Later scans reuse the stored analysis for every file whose
+fingerprint is unchanged and only re-read and re-match the rest. Any change
+to the rule set changes the rules version and discards the manifest.
+
+A blob store does the same across projects: it maps a content hash (plus
+the rules version and the inventory buckets the file was analyzed for) to
+its analysis in one SQLite file shared by every scan on the machine, so a
+vendored module or template copied into many client projects is matched
+once for the whole portfolio. The least recently used entries are evicted
+when the stored analyses outgrow a size budget.
+
+An audit cache keeps dependency audit results the same way, keyed by what
+they were computed from (package manager, lockfile contents, advisory
+database version), so re-auditing a project whose lockfiles have not
+changed costs no subprocess or network call until the entry's TTL runs out.
+
+Usage:
+    from scan_cache import BlobStore, ScanManifest
+
+    manifest = ScanManifest.load(path, rules_version)
+    analysis = manifest.lookup("src/app.py", size, mtime_ns)
+    manifest.record("src/app.py", size, mtime_ns, digest, analysis)
+    manifest.save()
+
+    blobs = BlobStore.open(BLOB_STORE_PATH, rules_version)
+    analysis = blobs.get(digest, ["code"])
+    blobs.put(digest, ["code"], analysis)
+    blobs.save()
+
+    audits = AuditCache.open(AUDIT_CACHE_PATH)
+    hit = audits.get(key)  # (result, age in seconds) or None
+    audits.put(key, result)
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+
+CACHE_DIR = Path.home() / ".smb-growth-agent"
+MANIFEST_DIR = CACHE_DIR / "scan_manifests"
+MANIFEST_FORMAT = 1
+BLOB_STORE_PATH = CACHE_DIR / "blob_store.sqlite"
+DEFAULT_BLOB_STORE_BYTES = 256 * 1024 * 1024
+AUDIT_CACHE_PATH = CACHE_DIR / "audit_cache.sqlite"
+DEFAULT_AUDIT_CACHE_BYTES = 32 * 1024 * 1024
+DEFAULT_AUDIT_CACHE_TTL = 24 * 3600
+
+
+def content_digest(content: bytes) -> str:
+    """Return the SHA-256 hex digest of raw file content (bytes or mmap)."""
+    return hashlib.sha256(content).hexdigest()
+
+
+def default_manifest_path(project_path: Path) -> Path:
+    """Return the manifest location for a project under ~/.smb-growth-agent."""
+    key = hashlib.sha256(str(project_path).encode("utf-8")).hexdigest()[:16]
+    return MANIFEST_DIR / f"{project_path.name}-{key}.json"
+
+
+class ScanManifest:
+    """Fingerprint -> analysis store for one project and rules version.
+
+    Entries not seen during a scan are dropped on save, so deleted files do
+    not accumulate.
+    """
+
+    def __init__(self, path: Path, rules_version: str, entries: Optional[Dict] = None):
+        self.path = path
+        self.rules_version = rules_version
+        self._previous: Dict[str, Dict] = entries or {}
+        self._current: Dict[str, Dict] = {}
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def load(cls, path: Path, rules_version: str) -> "ScanManifest":
+        """Load a manifest, starting empty if it is missing, unreadable or stale."""
+        entries = {}
+        try:
+            with open(path, "r") as f:
+                data = json.load(f)
+            if data.get("format") == MANIFEST_FORMAT and data.get("rules_version") == rules_version:
+                entries = data.get("files", {})
+        except (OSError, ValueError):
+            pass
+        return cls(path, rules_version, entries)
+
+    def lookup(self, rel_path: str, size: int, mtime_ns: int) -> Optional[Dict]:
+        """Return the stored analysis if size and mtime are unchanged."""
+        entry = self._previous.get(rel_path)
+        if entry and entry["size"] == size and entry["mtime_ns"] == mtime_ns:
+            self._current[rel_path] = entry
+            self.hits += 1
+            return entry["analysis"]
+        return None
+
+    def lookup_digest(self, rel_path: str, size: int, mtime_ns: int, digest: str) -> Optional[Dict]:
+        """Return the stored analysis if the content hash is unchanged.
+
+        Used after a file's mtime moved (e.g. a checkout or touch) to avoid
+        re-matching content that is byte-for-byte the same.
+        """
+        entry = self._previous.get(rel_path)
+        if entry and entry["sha256"] == digest:
+            self._store(rel_path, size, mtime_ns, digest, entry["analysis"])
+            self.hits += 1
+            return entry["analysis"]
+        return None
+
+    def seen(self, rel_path: str) -> bool:
+        """Return True if rel_path already has an entry from this scan."""
+        return rel_path in self._current
+
+    def forget(self, rel_path: str) -> None:
+        """Drop rel_path's entry from this scan, so a changed file is stored afresh."""
+        self._current.pop(rel_path, None)
+
+    def record(self, rel_path: str, size: int, mtime_ns: int, digest: str, analysis: Dict) -> None:
+        """Store a freshly computed analysis for a file fingerprint."""
+        self.misses += 1
+        self._store(rel_path, size, mtime_ns, digest, analysis)
+
+    def _store(self, rel_path: str, size: int, mtime_ns: int, digest: str, analysis: Dict) -> None:
+        self._current[rel_path] = {
+            "size": size,
+            "mtime_ns": mtime_ns,
+            "sha256": digest,
+            "analysis": analysis,
+        }
+
+    def save(self) -> None:
+        """Write the manifest atomically, keeping only files seen this scan."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        data = {
+            "format": MANIFEST_FORMAT,
+            "rules_version": self.rules_version,
+            "files": self._current,
+        }
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(data, f, separators=(",", ":"))
+        os.replace(tmp_path, self.path)
+
+    def stats(self) -> Dict:
+        """Return reuse counters for the current scan."""
+        return {
+            "path": str(self.path),
+            "reused": self.hits,
+            "rescanned": self.misses,
+            "entries": len(self._current),
+        }
+
+
+def evict_lru(db: sqlite3.Connection, table: str, max_bytes: int) -> int:
+    """Delete a store's least recently used rows until its sizes fit in max_bytes.
+
+    The table needs size and last_used columns; run inside the caller's
+    write transaction.
+
+    Returns:
+        Number of rows deleted
+    """
+    total = db.execute(f"SELECT COALESCE(SUM(size), 0) FROM {table}").fetchone()[0]
+    if total <= max_bytes:
+        return 0
+    doomed = []
+    for rowid, size in db.execute(f"SELECT rowid, size FROM {table} ORDER BY last_used"):
+        if total <= max_bytes:
+            break
+        doomed.append((rowid,))
+        total -= size
+    db.executemany(f"DELETE FROM {table} WHERE rowid = ?", doomed)
+    return len(doomed)
+
+
+class BlobStore:
+    """Content-addressed analysis store shared by every project on the machine.
+
+    Entries are keyed by (content SHA-256, rules version, buckets). Lookups
+    read SQLite directly; new entries and recency updates are buffered and
+    written in one transaction by save(), which then evicts the least
+    recently used entries until the stored analyses fit in max_bytes.
+    """
+
+    def __init__(
+        self,
+        connection: sqlite3.Connection,
+        path: Path,
+        rules_version: str,
+        max_bytes: int = DEFAULT_BLOB_STORE_BYTES
+    ):
+        self._db = connection
+        self.path = path
+        self.rules_version = rules_version
+        self.max_bytes = max_bytes
+        self._pending: Dict[Tuple[str, str], str] = {}
+        self._touched: Set[Tuple[str, str]] = set()
+        self.hits = 0
+        self.stored = 0
+        self.evicted = 0
+
+    @classmethod
+    def open(
+        cls,
+        path: Path,
+        rules_version: str,
+        max_bytes: int = DEFAULT_BLOB_STORE_BYTES,
+        read_only: bool = False
+    ) -> Optional["BlobStore"]:
+        """Open (creating if needed) the store at path.
+
+        A store that exists but cannot be written (e.g. in a read-only home
+        directory) is opened read-only instead: its analyses are reused and
+        new ones are not recorded.
+
+        Returns:
+            The store, or None if it cannot be opened (e.g. it does not
+            exist and cannot be created) - scans then simply run without it
+        """
+        try:
+            if read_only:
+                connection = sqlite3.connect(f"file:{path}?mode=ro", uri=True, timeout=30)
+            else:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                connection = sqlite3.connect(str(path), timeout=30)
+                connection.execute("PRAGMA journal_mode=WAL")
+                connection.execute(
+                    "CREATE TABLE IF NOT EXISTS blobs ("
+                    "digest TEXT NOT NULL, rules_version TEXT NOT NULL, buckets TEXT NOT NULL, "
+                    "analysis TEXT NOT NULL, size INTEGER NOT NULL, last_used INTEGER NOT NULL, "
+                    "PRIMARY KEY (digest, rules_version, buckets))"
+                )
+                connection.execute("CREATE INDEX IF NOT EXISTS blobs_last_used ON blobs (last_used)")
+                connection.commit()
+        except (OSError, sqlite3.Error):
+            if read_only:
+                return None
+            return cls.open(path, rules_version, max_bytes, read_only=True)
+        return cls(connection, path, rules_version, max_bytes)
+
+    def get(self, digest: str, buckets: List[str]) -> Optional[Dict]:
+        """Return the stored analysis for a blob, if any."""
+        key = (digest, ",".join(buckets))
+        if key in self._pending:
+            self.hits += 1
+            return json.loads(self._pending[key])
+        try:
+            row = self._db.execute(
+                "SELECT analysis FROM blobs WHERE digest = ? AND rules_version = ? AND buckets = ?",
+                (key[0], self.rules_version, key[1])
+            ).fetchone()
+        except sqlite3.Error:
+            return None
+        if row is None:
+            return None
+        self.hits += 1
+        self._touched.add(key)
+        return json.loads(row[0])
+
+    def touch(self, digest: str, buckets: List[str]) -> None:
+        """Mark an entry another process found as recently used."""
+        self.hits += 1
+        self._touched.add((digest, ",".join(buckets)))
+
+    def put(self, digest: str, buckets: List[str], analysis: Dict) -> None:
+        """Buffer a freshly computed analysis for a blob."""
+        self._pending[(digest, ",".join(buckets))] = json.dumps(analysis, separators=(",", ":"))
+
+    def save(self) -> None:
+        """Write buffered entries, refresh recency and evict down to max_bytes."""
+        now = time.time_ns()
+        try:
+            with self._db:
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO blobs VALUES (?, ?, ?, ?, ?, ?)",
+                    [(digest, self.rules_version, buckets, analysis, len(analysis), now)
+                     for (digest, buckets), analysis in self._pending.items()]
+                )
+                self._db.executemany(
+                    "UPDATE blobs SET last_used = ? WHERE digest = ? AND rules_version = ? AND buckets = ?",
+                    [(now, digest, self.rules_version, buckets) for digest, buckets in self._touched]
+                )
+                self.stored += len(self._pending)
+                self._pending.clear()
+                self._touched.clear()
+                self.evicted += evict_lru(self._db, "blobs", self.max_bytes)
+        except sqlite3.Error:
+            # The cache is an optimization; a locked or full disk only costs a re-match
+            pass
+
+    def close(self) -> None:
+        """Close the database connection."""
+        self._db.close()
+
+    def stats(self) -> Dict:
+        """Return hit, store and eviction counters plus the store's size."""
+        try:
+            entries, total = self._db.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM blobs").fetchone()
+        except sqlite3.Error:
+            entries, total = None, None
+        return {
+            "path": str(self.path),
+            "hits": self.hits,
+            "stored": self.stored,
+            "evicted": self.evicted,
+            "entries": entries,
+            "bytes": total,
+            "max_bytes": self.max_bytes,
+        }
+
+
+class AuditCache:
+    """Dependency audit results by cache key, expiring after a TTL.
+
+    Entries older than ttl seconds are never returned and are deleted by
+    the next put(), which also evicts the least recently used entries
+    until the stored results fit in max_bytes.
+    """
+
+    def __init__(
+        self,
+        connection: sqlite3.Connection,
+        path: Path,
+        ttl: float = DEFAULT_AUDIT_CACHE_TTL,
+        max_bytes: int = DEFAULT_AUDIT_CACHE_BYTES
+    ):
+        self._db = connection
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.evicted = 0
+
+    @classmethod
+    def open(
+        cls,
+        path: Path = AUDIT_CACHE_PATH,
+        ttl: float = DEFAULT_AUDIT_CACHE_TTL,
+        max_bytes: int = DEFAULT_AUDIT_CACHE_BYTES
+    ) -> Optional["AuditCache"]:
+        """Open (creating if needed) the cache at path.
+
+        Returns:
+            The cache, or None if it cannot be opened - audits then run
+            uncached
+        """
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            connection = sqlite3.connect(str(path), timeout=30)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS audits ("
+                "key TEXT PRIMARY KEY, result TEXT NOT NULL, size INTEGER NOT NULL, "
+                "created INTEGER NOT NULL, last_used INTEGER NOT NULL)"
+            )
+            connection.execute("CREATE INDEX IF NOT EXISTS audits_last_used ON audits (last_used)")
+            connection.commit()
+        except (OSError, sqlite3.Error):
+            return None
+        return cls(connection, path, ttl, max_bytes)
+
+    def get(self, key: str) -> Optional[Tuple[Dict, float]]:
+        """Return (result, age in seconds) for a fresh entry, else None."""
+        now = time.time_ns()
+        try:
+            row = self._db.execute(
+                "SELECT result, created FROM audits WHERE key = ? AND created >= ?",
+                (key, now - int(self.ttl * 1e9))
+            ).fetchone()
+            if row is None:
+                return None
+            with self._db:
+                self._db.execute("UPDATE audits SET last_used = ? WHERE key = ?", (now, key))
+        except sqlite3.Error:
+            return None
+        return json.loads(row[0]), (now - row[1]) / 1e9
+
+    def put(self, key: str, result: Dict) -> None:
+        """Store a result, drop expired entries and evict down to max_bytes."""
+        now = time.time_ns()
+        data = json.dumps(result, separators=(",", ":"))
+        try:
+            with self._db:
+                self._db.execute("INSERT OR REPLACE INTO audits VALUES (?, ?, ?, ?, ?)", (key, data, len(data), now, now))
+                expired = self._db.execute("DELETE FROM audits WHERE created < ?", (now - int(self.ttl * 1e9),))
+                self.evicted += expired.rowcount
+                self.evicted += evict_lru(self._db, "audits", self.max_bytes)
+        except sqlite3.Error:
+            # A locked or full disk only costs re-running the audit next time
+            pass
+
+    def close(self) -> None:
+        """Close the database connection."""
+        self._db.close()
@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""Secret Detector - Flag raw keys and tokens by their Shannon entropy.
+
+The HIPAA rule pack catches secrets assigned to telling names
+(``password = "..."``); this module catches the values themselves. String
+literals that look like tokens (no whitespace, long enough) are pulled out
+of a file with one regex pass, and their Shannon entropy is computed in
+batches: with NumPy, a whole batch becomes one byte histogram per token
+via a single bincount, otherwise a pure-Python Counter loop gives the
+same numbers more slowly.
+
+A token is flagged when its entropy, relative to the entropy a random
+token of the same length and alphabet is expected to have, reaches a
+threshold; tokens mostly made of word-like letter runs (identifiers,
+constant names) are left alone however varied they are. Tokens with a
+known secret prefix (AWS access key ids, Stripe live keys, JWTs) get a
+score boost and are labelled with their kind; they are matched unquoted
+too, so a key pasted into a config line is still caught.
+
+Usage:
+    from secret_detector import SecretDetector
+
+    detector = SecretDetector()
+    for offset, kind, entropy in detector.find(content_bytes):
+        print(offset, kind, entropy)
+"""
+
+import math
+import re
+from collections import Counter
+from functools import lru_cache
+from typing import List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+# Shortest and longest token considered (shorter strings cannot carry
+# enough entropy to tell a key from a word; longer ones are data blobs)
+MIN_TOKEN_LENGTH = 20
+MAX_TOKEN_LENGTH = 512
+
+# Share of a random token's expected entropy a token must reach to be flagged
+DEFAULT_THRESHOLD = 0.93
+
+# Added to the score of tokens with a known secret prefix
+PREFIX_BOOST = 0.25
+
+# Tokens with at least this share of characters in word-like letter runs
+# read as identifiers, not keys
+MAX_WORD_SHARE = 0.5
+
+# Tokens per NumPy histogram batch (memory is batch * 256 counters)
+ENTROPY_BATCH = 2048
+
+# Smaller batches are cheaper in pure Python than NumPy's per-call overhead
+NUMPY_MIN_BATCH = 64
+
+# Token-like string literals mixing letters and digits, as every key does
+# (the quotes are not part of the token); the lookaheads drop words and
+# identifiers inside the regex engine instead of in Python
+_TOKEN_CHAR = rb"[A-Za-z0-9+/=_.~-]"
+_QUOTED = re.compile(
+    rb"""["'`](?=%s*[0-9])(?=%s*[A-Za-z])(%s{%d,%d})["'`]"""
+    % (_TOKEN_CHAR, _TOKEN_CHAR, _TOKEN_CHAR, MIN_TOKEN_LENGTH, MAX_TOKEN_LENGTH)
+)
+
+# Known secret formats, checked in order against every candidate
+KNOWN_PREFIXES = [
+    ("aws-access-key", re.compile(rb"(?:AKIA|ASIA)[0-9A-Z]{16}")),
+    ("stripe-live-key", re.compile(rb"[rs]k_live_[0-9A-Za-z]{10,99}")),
+    ("jwt", re.compile(rb"eyJ[0-9A-Za-z_-]{8,}\.eyJ[0-9A-Za-z_-]{8,}\.[0-9A-Za-z_-]{8,}")),
+]
+_PREFIX_STARTS = (b"AKIA", b"ASIA", b"sk_live_", b"rk_live_", b"eyJ")
+
+# Known-format tokens anywhere (unquoted, or quoted without a digit),
+# searched only in content holding one of their literals
+_PREFIX_KEYWORDS = (b"AKIA", b"ASIA", b"k_live_", b"eyJ")
+_PREFIXED = re.compile(rb"\b(?:%s)\b" % b"|".join(pattern.pattern for _, pattern in KNOWN_PREFIXES))
+
+# Kind reported for tokens flagged on entropy alone
+GENERIC_KIND = "high-entropy-string"
+
+# Hash literals that are high-entropy by design and never secrets
+# (subresource integrity values, content digests)
+IGNORED_PREFIXES = (b"sha1-", b"sha256-", b"sha384-", b"sha512-")
+
+_HEX = re.compile(rb"[0-9a-fA-F]+")
+_WORD_RUN = re.compile(rb"[a-z]{4,}|[A-Z]{4,}|[A-Z][a-z]{3,}")
+
+
+def entropy_backend() -> str:
+    """Return 'numpy' if batched histograms are available, else 'python'."""
+    return "python" if np is None else "numpy"
+
+
+def entropy_scores(tokens: Sequence[bytes], use_numpy: Optional[bool] = None) -> Tuple[List[float], List[float]]:
+    """Return the Shannon entropy and the score of each token.
+
+    Entropy is in bits per byte. The score is the entropy as a share of
+    the entropy a uniformly random token of the same length and alphabet
+    (hex digits, or base64-like) is expected to have, so about 1.0 for a
+    random key whatever its length.
+
+    Args:
+        tokens: Non-empty byte strings
+        use_numpy: Force the NumPy (True) or pure-Python (False) path;
+            by default NumPy is used when installed and the batch is
+            large enough to pay for it
+
+    Returns:
+        (entropies, scores), one of each per token
+
+    Raises:
+        ValueError: If the NumPy path is forced but NumPy is not installed
+    """
+    if use_numpy is None:
+        use_numpy = np is not None and len(tokens) >= NUMPY_MIN_BATCH
+    if not use_numpy:
+        entropies = [_token_entropy(token) for token in tokens]
+        scores = [
+            entropy / expected_entropy(len(token), 16 if _HEX.fullmatch(token) else 64)
+            for token, entropy in zip(tokens, entropies)
+        ]
+        return entropies, scores
+    if np is None:
+        raise ValueError("NumPy required for batched entropy. Install with: pip install numpy")
+
+    entropies, scores = [], []
+    for start in range(0, len(tokens), ENTROPY_BATCH):
+        batch_entropies, batch_scores = _batch_scores(tokens[start:start + ENTROPY_BATCH])
+        entropies.extend(batch_entropies.tolist())
+        scores.extend(batch_scores.tolist())
+    return entropies, scores
+
+
+@lru_cache(maxsize=None)
+def expected_entropy(length: int, alphabet: int) -> float:
+    """Return the expected entropy of a uniformly random token.
+
+    A short token cannot use every symbol of its alphabet, so its measured
+    entropy falls well short of log2(alphabet) even when it is random;
+    this is the expectation of that measurement, from the binomial
+    distribution of each symbol's count.
+    """
+    p = 1 / alphabet
+    total = 0.0
+    for count in range(1, length + 1):
+        share = count / length
+        total += math.comb(length, count) * p ** count * (1 - p) ** (length - count) * share * math.log2(share)
+    return -alphabet * total
+
+
+def _token_entropy(token: bytes) -> float:
+    length = len(token)
+    return -sum(count / length * math.log2(count / length) for count in Counter(token).values())
+
+
+# 1 for every byte value that is not a hex digit
+_NON_HEX = None
+if np is not None:
+    _NON_HEX = np.ones(256)
+    _NON_HEX[list(b"0123456789abcdefABCDEF")] = 0
+
+
+def _batch_scores(tokens: Sequence[bytes]):
+    n = len(tokens)
+    lengths = np.fromiter(map(len, tokens), dtype=np.int64, count=n)
+    data = np.frombuffer(b"".join(tokens), dtype=np.uint8)
+    rows = np.repeat(np.arange(n, dtype=np.int64), lengths)
+
+    # One 256-bin histogram per token (byte b of token i lands in bin
+    # i*256+b); only the non-empty bins enter the entropy sum
+    counts = np.bincount((rows << 8) | data, minlength=n << 8)
+    bins = np.flatnonzero(counts)
+    row = bins >> 8
+    p = counts[bins] / lengths[row]
+    entropies = -np.bincount(row, weights=p * np.log2(p), minlength=n)
+
+    # Expected entropy per distinct (length, alphabet) pair in the batch
+    is_hex = np.bincount(rows, weights=_NON_HEX[data], minlength=n) == 0
+    keys, inverse = np.unique(lengths * 2 + is_hex, return_inverse=True)
+    expected = np.array([expected_entropy(key >> 1, 16 if key & 1 else 64) for key in keys.tolist()])
+    return entropies, entropies / expected[inverse]
+
+
+class SecretDetector:
+    """Finds high-entropy string literals and known-format keys in content."""
+
+    def __init__(
+        self,
+        threshold: float = DEFAULT_THRESHOLD,
+        use_numpy: Optional[bool] = None
+    ):
+        self.threshold = threshold
+        self.use_numpy = use_numpy
+        self.tokens_checked = 0
+
+    @staticmethod
+    def known_kind(token: bytes) -> Optional[str]:
+        """Return the kind of a token with a known secret format, else None."""
+        if not token.startswith(_PREFIX_STARTS):
+            return None
+        return next((name for name, pattern in KNOWN_PREFIXES if pattern.fullmatch(token)), None)
+
+    def candidates(self, content) -> List[Tuple[int, bytes]]:
+        """Return (offset, token) for every token worth scoring, in content order."""
+        found = [(match.start(1), match.group(1)) for match in _QUOTED.finditer(content)]
+        if any(content.find(keyword) != -1 for keyword in _PREFIX_KEYWORDS):
+            quoted = {offset for offset, _ in found}
+            unquoted = [
+                (match.start(), match.group())
+                for match in _PREFIXED.finditer(content)
+                if match.start() not in quoted
+            ]
+            if unquoted:
+                found = sorted(found + unquoted)
+        return found
+
+    def find(self, content) -> List[Tuple[int, str, float]]:
+        """Return (offset, kind, entropy) for each flagged token, in content order.
+
+        Entropy is in bits per byte, rounded to two decimals.
+        """
+        candidates = self.candidates(content)
+        if not candidates:
+            return []
+        self.tokens_checked += len(candidates)
+        entropies, scores = entropy_scores([token for _, token in candidates], self.use_numpy)
+
+        flagged = []
+        floor = self.threshold - PREFIX_BOOST
+        for (offset, token), entropy, score in zip(candidates, entropies, scores):
+            if score < floor:
+                continue
+            kind = self.known_kind(token)
+            if kind is not None:
+                score += PREFIX_BOOST
+            elif score < self.threshold or token.startswith(IGNORED_PREFIXES):
+                continue
+            elif sum(map(len, _WORD_RUN.findall(token))) >= MAX_WORD_SHARE * len(token):
+                # Varied, but mostly words: an identifier, not a key
+                continue
+            if score >= self.threshold:
+                flagged.append((offset, kind or GENERIC_KIND, round(entropy, 2)))
+        return flagged
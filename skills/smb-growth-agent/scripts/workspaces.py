@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""Workspaces - Find every dependency unit in a repository in one walk.
+
+A unit is a directory whose dependencies are audited together: an npm,
+yarn or pnpm project, or a Python project (pip, poetry, pipenv or uv). A
+repository with a Next.js frontend in web/ and a FastAPI backend in api/
+holds two units; a directory with both a package.json and a
+pyproject.toml holds one of each.
+
+The walk visits each directory once, top-down, pruning vendored and build
+directories and whatever the project's .gitignore files ignore.
+Workspaces share their root's lockfile, so their members are folded into
+the root's unit instead of being audited again: npm and yarn
+"workspaces" in package.json, pnpm-workspace.yaml and uv's
+[tool.uv.workspace] members. A member with a lockfile of its own stays a
+unit of its own.
+
+Usage:
+    from workspaces import discover_units
+
+    for unit in discover_units(Path("/path/to/repo")):
+        print(unit["path"], unit["package_manager"], unit["workspaces"])
+"""
+
+import json
+import os
+import re
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from ignore_rules import EXCLUDE_DIRS, IGNORE_FILE, project_ignore, translate_pattern
+
+try:
+    import tomllib
+except ImportError:
+    tomllib = None
+
+
+# Installed packages carry manifests of their own but are never units;
+# the compliance scan still reads them (hidden directories such as .tox
+# are skipped by the walk below anyway)
+UNIT_EXCLUDE_DIRS = EXCLUDE_DIRS | {"site-packages", "bower_components"}
+
+# Marker files per family, in the precedence detect_package_manager uses:
+# the first one present names the unit's package manager
+FAMILY_MARKERS = {
+    "npm": (
+        ("yarn.lock", "yarn"),
+        ("package-lock.json", "npm"),
+        ("pnpm-lock.yaml", "pnpm"),
+        ("package.json", "npm"),
+    ),
+    "pip": (
+        ("uv.lock", "uv"),
+        ("poetry.lock", "poetry"),
+        ("Pipfile.lock", "pipenv"),
+        ("requirements.txt", "pip"),
+        ("pyproject.toml", "pip"),
+    ),
+}
+
+# Lockfiles that make a workspace member a unit of its own
+FAMILY_LOCKFILES = {
+    "npm": {"yarn.lock", "package-lock.json", "npm-shrinkwrap.json", "pnpm-lock.yaml"},
+    "pip": {"uv.lock", "poetry.lock", "Pipfile.lock"},
+}
+
+_MARKERS = {name for markers in FAMILY_MARKERS.values() for name, _ in markers} | {"pnpm-workspace.yaml"}
+
+# A workspace: its root's relative path (with a trailing slash, "" at the
+# top), the unit its members fold into, and compiled member patterns
+# (regex, negate)
+Workspace = Tuple[str, Dict, List[Tuple["re.Pattern", bool]]]
+
+
+def _compile_members(patterns: List[str]) -> List[Tuple["re.Pattern", bool]]:
+    compiled = []
+    for pattern in patterns:
+        if not isinstance(pattern, str):
+            continue
+        negate = pattern.startswith("!")
+        pattern = pattern.lstrip("!").strip().strip("/")
+        if pattern.startswith("./"):
+            pattern = pattern[2:]
+        if pattern:
+            compiled.append((re.compile(translate_pattern(pattern), re.DOTALL), negate))
+    return compiled
+
+
+def _pnpm_workspace_patterns(path: Path) -> List[str]:
+    """Read the packages list of a pnpm-workspace.yaml, line by line."""
+    patterns = []
+    in_packages = False
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                stripped = line.split("#", 1)[0].rstrip()
+                if not stripped:
+                    continue
+                if not line[0].isspace():
+                    in_packages = stripped.startswith("packages:")
+                elif in_packages and stripped.lstrip().startswith("-"):
+                    patterns.append(stripped.lstrip()[1:].strip().strip("'\""))
+    except OSError:
+        pass
+    return patterns
+
+
+def workspace_patterns(directory: Path, family: str, names: set) -> List[str]:
+    """Return the workspace member globs a directory declares for a family."""
+    if family == "npm":
+        if "pnpm-workspace.yaml" in names:
+            return _pnpm_workspace_patterns(directory / "pnpm-workspace.yaml")
+        if "package.json" not in names:
+            return []
+        try:
+            with open(directory / "package.json", "r", encoding="utf-8") as f:
+                workspaces = json.load(f).get("workspaces")
+        except (OSError, ValueError, AttributeError):
+            return []
+        if isinstance(workspaces, dict):
+            workspaces = workspaces.get("packages")
+        return workspaces if isinstance(workspaces, list) else []
+
+    if "pyproject.toml" not in names or tomllib is None:
+        return []
+    try:
+        with open(directory / "pyproject.toml", "rb") as f:
+            workspace = ((tomllib.load(f).get("tool") or {}).get("uv") or {}).get("workspace") or {}
+    except (OSError, ValueError):
+        return []
+    patterns = list(workspace.get("members") or [])
+    patterns += [f"!{pattern}" for pattern in workspace.get("exclude") or [] if isinstance(pattern, str)]
+    return patterns
+
+
+def _member_of(workspaces: List[Workspace], rel_dir: str) -> Optional[Dict]:
+    """Return the unit of the innermost workspace listing rel_dir, if any."""
+    for root, unit, patterns in reversed(workspaces):
+        if not rel_dir.startswith(root):
+            continue
+        member = rel_dir[len(root):].rstrip("/")
+        included = False
+        for pattern, negate in patterns:
+            if pattern.fullmatch(member):
+                included = not negate
+        if included:
+            return unit
+    return None
+
+
+def discover_units(project_path: Path, exclude_dirs: set = UNIT_EXCLUDE_DIRS) -> List[Dict]:
+    """Find the dependency units under project_path.
+
+    Args:
+        project_path: Repository or project root
+        exclude_dirs: Directory names never descended into
+
+    Returns:
+        Units in walk order (the root's first), each a dict with the
+        directory's path relative to project_path ("." for the root), its
+        package manager, and the relative paths of the workspace members
+        folded into it
+    """
+    ignore = project_ignore(project_path)
+    units: List[Dict] = []
+    workspaces = {family: [] for family in FAMILY_MARKERS}
+    stack = [(str(project_path), "", ignore.prefix, ignore.root_chain())]
+    while stack:
+        current, rel_dir, ignore_prefix, chain = stack.pop()
+        try:
+            with os.scandir(current) as it:
+                entries = sorted(it, key=lambda e: e.name)
+        except OSError:
+            continue
+        if any(entry.name == IGNORE_FILE for entry in entries):
+            chain = ignore.extend(chain, current, ignore_prefix)
+
+        names = set()
+        subdirs = []
+        for entry in entries:
+            try:
+                is_dir = entry.is_dir(follow_symlinks=False)
+                if is_dir and (entry.name in exclude_dirs or entry.name.startswith(".")):
+                    continue
+                if chain and ignore.ignored(chain, ignore_prefix + entry.name, is_dir):
+                    continue
+                if is_dir:
+                    subdirs.append((entry.path, f"{rel_dir}{entry.name}/", f"{ignore_prefix}{entry.name}/", chain))
+                elif entry.name in _MARKERS and entry.is_file():
+                    names.add(entry.name)
+            except OSError:
+                continue
+
+        directory = Path(current)
+        for family, markers in FAMILY_MARKERS.items():
+            manager = next((manager for name, manager in markers if name in names), None)
+            if manager is None:
+                continue
+            owner = _member_of(workspaces[family], rel_dir)
+            if owner is not None and not names & FAMILY_LOCKFILES[family]:
+                owner["workspaces"].append(rel_dir.rstrip("/"))
+                continue
+            unit = {"path": rel_dir.rstrip("/") or ".", "package_manager": manager, "workspaces": []}
+            units.append(unit)
+            patterns = _compile_members(workspace_patterns(directory, family, names))
+            if patterns:
+                workspaces[family].append((rel_dir, unit, patterns))
+
+        # Reverse so the stack pops subdirectories in sorted order
+        stack.extend(reversed(subdirs))
+    return units